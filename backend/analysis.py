@@ -5,6 +5,8 @@ from pathlib import Path
 import numpy as np
 from PIL import Image
 
+from .images import SUPPORTED_EXTENSIONS, list_image_paths
+from .metrics import stage, timed
 from .models import (
     DetectedPart,
     ImageAnalysisMetrics,
@@ -12,19 +14,6 @@ from .models import (
     MaterialSuggestion,
 )
 
-SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
-
-
-def list_image_paths(root_dir: Path) -> list[Path]:
-    return sorted(
-        [
-            path
-            for path in root_dir.iterdir()
-            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
-    )
-
-
 def _rgb_to_hsv(rgb: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     # rgb is normalized [0, 1]
     r = rgb[..., 0]
@@ -55,9 +44,10 @@ def _rgb_to_hsv(rgb: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
 
 
 def _analyze_single_image(path: Path) -> dict[str, float]:
-    image = Image.open(path).convert("RGB")
-    # Downsample for speed and stable aggregate statistics
-    image.thumbnail((900, 900))
+    with stage("analysis.decode"):
+        image = Image.open(path).convert("RGB")
+        # Downsample for speed and stable aggregate statistics
+        image.thumbnail((900, 900))
     rgb = np.asarray(image, dtype=np.float32) / 255.0
 
     h, s, v = _rgb_to_hsv(rgb)
@@ -79,6 +69,7 @@ def _clamp(value: float, lo: float = 0.0, hi: float = 1.0) -> float:
     return max(lo, min(hi, value))
 
 
+@timed("analysis.images")
 def analyze_images(image_paths: list[Path]) -> ImageAnalysisResult:
     if not image_paths:
         zero_metrics = ImageAnalysisMetrics(
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .compression import available_codecs
+
+ASSET_URL_PREFIX = "/assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unhashed URLs and the page itself must be revalidated so a deploy is picked up.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+TEXT_SUFFIXES = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+MIN_COMPRESS_BYTES = 512
+HASH_LENGTH = 12
+ENTRY_PAGE = "index.html"
+
+# "/assets/<path>" in quotes or url(...), and relative specifiers in JS import/export statements.
+_ABSOLUTE_REF = re.compile(r"""(?P<q>["'(])/assets/(?P<path>[^"'()?#\s]+)""")
+_RELATIVE_IMPORT = re.compile(r"""(?P<lead>\b(?:from|import)\s*)(?P<q>["'])(?P<path>\.{1,2}/[^"']+)(?P=q)""")
+_MODULE_SCRIPT = re.compile(r"""<script\s+type="module"\s+src="/assets/(?P<path>[^"]+)"\s*>""")
+
+
+@dataclass(frozen=True)
+class Asset:
+    path: str
+    hashed_path: str
+    media_type: str
+    digest: str
+    # Coding ("identity", "gzip", "br") -> body.
+    variants: dict[str, bytes]
+    # Other assets this one imports as JS modules, for modulepreload hints.
+    module_deps: tuple[str, ...] = ()
+
+    @property
+    def url(self) -> str:
+        return ASSET_URL_PREFIX + self.hashed_path
+
+    def etag(self, coding: str) -> str:
+        return f'"{self.digest}"' if coding == "identity" else f'"{self.digest}-{coding}"'
+
+
+def _hashed_name(path: str, digest: str) -> str:
+    stem, suffix = posixpath.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{suffix}"
+
+
+@dataclass
+class _Build:
+    assets: dict[str, Asset] = field(default_factory=dict)
+    by_hashed: dict[str, Asset] = field(default_factory=dict)
+    page: Asset | None = None
+
+
+class AssetPipeline:
+    """Frontend files served under content-hashed URLs with precompressed variants.
+
+    References between assets (``/assets/...`` URLs and relative module
+    imports) are rewritten to the hashed names, dependencies first, so a
+    change anywhere gives every importer a new URL too. Compressed bodies
+    are kept in ``cache_dir`` by content hash; brotli at full quality is
+    slow, so each version is only compressed once per machine.
+    """
+
+    def __init__(self, source_dir: Path, cache_dir: Path | None) -> None:
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self._build: _Build | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._build is not None
+
+    def build(self) -> _Build:
+        with self._lock:
+            if self._build is None:
+                self._build = self._build_all()
+            return self._build
+
+    def _build_all(self) -> _Build:
+        build = _Build()
+        if not self.source_dir.exists():
+            return build
+        paths = sorted(
+            p.relative_to(self.source_dir).as_posix()
+            for p in self.source_dir.rglob("*")
+            if p.is_file() and p.name != ENTRY_PAGE and not p.name.startswith(".")
+        )
+        known = set(paths)
+        for path in paths:
+            self._process(path, known, build, ())
+        page_path = self.source_dir / ENTRY_PAGE
+        if page_path.exists():
+            build.page = self._page(page_path.read_text(encoding="utf-8"), known, build)
+        return build
+
+    def _rewrite(self, path: str, text: str, known: set[str], build: _Build, stack: tuple[str, ...]) -> tuple[str, list[str]]:
+        deps: list[str] = []
+
+        def absolute(match: re.Match) -> str:
+            target = match["path"]
+            if target not in known:
+                return match.group(0)
+            asset = self._process(target, known, build, stack)
+            if path.endswith((".js", ".mjs")) or path == ENTRY_PAGE:
+                deps.append(target)
+            return f"{match['q']}{asset.url}"
+
+        def relative(match: re.Match) -> str:
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(path), match["path"]))
+            if target not in known:
+                return match.group(0)
+            asset = self._process(target, known, build, stack)
+            deps.append(target)
+            spec = posixpath.relpath(asset.hashed_path, posixpath.dirname(path) or ".")
+            if not spec.startswith("."):
+                spec = f"./{spec}"
+            return f"{match['lead']}{match['q']}{spec}{match['q']}"
+
+        text = _ABSOLUTE_REF.sub(absolute, text)
+        if path.endswith((".js", ".mjs")):
+            text = _RELATIVE_IMPORT.sub(relative, text)
+        return text, deps
+
+    def _process(self, path: str, known: set[str], build: _Build, stack: tuple[str, ...]) -> Asset:
+        asset = build.assets.get(path)
+        if asset is not None:
+            return asset
+        if path in stack:
+            raise ValueError(f"Circular asset reference: {' -> '.join((*stack, path))}")
+
+        data = (self.source_dir / path).read_bytes()
+        suffix = posixpath.splitext(path)[1].lower()
+        deps: list[str] = []
+        if suffix in TEXT_SUFFIXES:
+            text, deps = self._rewrite(path, data.decode("utf-8"), known, build, (*stack, path))
+            data = text.encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()
+        module_deps = tuple(dict.fromkeys(d for dep in deps for d in (*build.assets[dep].module_deps, dep)))
+        asset = Asset(
+            path=path,
+            hashed_path=_hashed_name(path, digest),
+            media_type=self._media_type(path),
+            digest=digest,
+            variants=self._variants(data, digest, suffix),
+            module_deps=module_deps,
+        )
+        build.assets[path] = asset
+        build.by_hashed[asset.hashed_path] = asset
+        return asset
+
+    def _page(self, html: str, known: set[str], build: _Build) -> Asset:
+        html, _ = self._rewrite(ENTRY_PAGE, html, known, build, ())
+        # Preload the whole module graph so the browser fetches it in parallel, not import by import.
+        preload: list[str] = []
+        for match in _MODULE_SCRIPT.finditer(html):
+            entry = build.by_hashed.get(match["path"])
+            if entry is not None:
+                preload += [build.assets[dep].url for dep in entry.module_deps]
+        if preload:
+            links = "".join(f'    <link rel="modulepreload" href="{url}" />\n' for url in dict.fromkeys(preload))
+            html = html.replace("</head>", f"{links}  </head>", 1)
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        return Asset(ENTRY_PAGE, ENTRY_PAGE, "text/html; charset=utf-8", digest, self._variants(data, digest, ".html"))
+
+    @staticmethod
+    def _media_type(path: str) -> str:
+        suffix = posixpath.splitext(path)[1].lower()
+        if suffix in {".js", ".mjs"}:
+            media = "text/javascript"
+        else:
+            media = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return f"{media}; charset=utf-8" if suffix in TEXT_SUFFIXES else media
+
+    def _variants(self, data: bytes, digest: str, suffix: str) -> dict[str, bytes]:
+        variants = {"identity": data}
+        if suffix not in TEXT_SUFFIXES or len(data) < MIN_COMPRESS_BYTES:
+            return variants
+        for coding, compress in available_codecs().items():
+            body = self._cached(digest, coding)
+            if body is None:
+                body = compress(data)
+                self._store(digest, coding, body)
+            # Keep a variant only if it is actually smaller.
+            if len(body) < len(data):
+                variants[coding] = body
+        return variants
+
+    def _cached(self, digest: str, coding: str) -> bytes | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            return (self.cache_dir / f"{digest}.{coding}").read_bytes()
+        except OSError:
+            return None
+
+    def _store(self, digest: str, coding: str, body: bytes) -> None:
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self.cache_dir / f"{digest}.{coding}"
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, target)
+
+    def lookup(self, path: str) -> tuple[Asset, bool] | None:
+        """The asset for a hashed (immutable) or plain (revalidated) path."""
+        build = self.build()
+        asset = build.by_hashed.get(path)
+        if asset is not None:
+            return asset, True
+        asset = build.assets.get(path)
+        return (asset, False) if asset is not None else None
+
+    def page(self) -> Asset | None:
+        return self.build().page
+
+    def report(self) -> list[dict[str, object]]:
+        build = self.build()
+        assets = list(build.assets.values()) + ([build.page] if build.page else [])
+        return [
+            {
+                "path": asset.path,
+                "url": asset.url if asset.path != ENTRY_PAGE else "/",
+                "bytes": {coding: len(body) for coding, body in asset.variants.items()},
+            }
+            for asset in assets
+        ]
+
+
+def main() -> None:
+    """Prebuild the compressed variants at deploy time: ``python -m backend.assets``."""
+    root = Path(__file__).resolve().parent.parent
+    cache_dir = Path(os.environ.get("TEAPOT_CACHE_DIR", root / ".cache")) / "assets"
+    pipeline = AssetPipeline(root / "frontend", cache_dir)
+    for row in pipeline.report():
+        sizes = ", ".join(f"{coding} {size}" for coding, size in row["bytes"].items())
+        print(f"{row['url']}: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
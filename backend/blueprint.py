@@ -3,6 +3,8 @@ from __future__ import annotations
 import math
 from copy import deepcopy
 
+from .geometry import teapot_geometry
+from .metrics import timed
 from .models import BOMItem, Blueprint, Dimensions, MaterialSuggestion
 
 US_CUP_TO_ML = 236.588
@@ -70,38 +72,15 @@ def cups_to_ml(cups: float) -> float:
     return cups * US_CUP_TO_ML
 
 
-def _frustum_volume_mm3(r1: float, r2: float, h: float) -> float:
-    return math.pi * h * (r1 * r1 + r1 * r2 + r2 * r2) / 3.0
-
-
 def estimate_capacity_ml(dim: Dimensions) -> float:
+    geo = teapot_geometry(dim)
     t = dim.wall_thickness_mm
-    body_h = dim.body_height_mm
-
-    r_bottom = max((dim.body_bottom_diameter_mm * 0.5) - t, 1.0)
-    r_max = max((dim.body_max_diameter_mm * 0.5) - t, 1.0)
-    r_neck = max((dim.neck_diameter_mm * 0.5) - t, 1.0)
-    r_head = max((dim.head_top_diameter_mm * 0.5) - t, 1.0)
-
-    body_segments = [
-        (r_bottom, r_max, body_h * 0.30),
-        (r_max, r_max * 0.98, body_h * 0.38),
-        (r_max * 0.98, r_neck, body_h * 0.32),
-    ]
-
-    head_h = max(dim.head_height_mm - dim.head_neck_overlap_mm, 8.0)
-    head_segments = [
-        (r_neck, r_neck * 1.18, head_h * 0.45),
-        (r_neck * 1.18, r_head, head_h * 0.55),
-    ]
 
-    total_mm3 = 0.0
-    for r1, r2, h in body_segments + head_segments:
-        total_mm3 += _frustum_volume_mm3(r1, r2, h)
+    total_mm3 = sum(seg.volume_mm3 for seg in geo.cavity_segments)
 
     # Reduce by center filter intrusion estimate.
-    insert_r = max((dim.insert_outer_diameter_mm * 0.5) - t, 1.0)
-    insert_h = max(dim.insert_height_mm, 1.0)
+    insert_r = max(geo.insert.outer_r - t, 1.0)
+    insert_h = max(geo.insert.height, 1.0)
     intrusion_mm3 = math.pi * insert_r * insert_r * insert_h
 
     capacity_ml = (total_mm3 - intrusion_mm3) / 1000.0
@@ -177,48 +156,27 @@ def _materials_by_key(materials: list[MaterialSuggestion]) -> dict[str, str]:
     return out
 
 
-def _surface_area_frustum(r1: float, r2: float, h: float) -> float:
-    slant = math.sqrt((r1 - r2) ** 2 + h * h)
-    return math.pi * (r1 + r2) * slant
-
-
+@timed("blueprint.bom")
 def generate_bom(dim: Dimensions, materials: list[MaterialSuggestion]) -> list[BOMItem]:
     mats = _materials_by_key(materials)
     t = dim.wall_thickness_mm
 
-    r_bottom = dim.body_bottom_diameter_mm * 0.5
-    r_max = dim.body_max_diameter_mm * 0.5
-    r_neck = dim.neck_diameter_mm * 0.5
-    r_head = dim.head_top_diameter_mm * 0.5
+    geo = teapot_geometry(dim)
 
-    body_area = (
-        _surface_area_frustum(r_bottom, r_max, dim.body_height_mm * 0.30)
-        + _surface_area_frustum(r_max, r_max * 0.98, dim.body_height_mm * 0.38)
-        + _surface_area_frustum(r_max * 0.98, r_neck, dim.body_height_mm * 0.32)
-    )
+    body_area = sum(seg.lateral_area_mm2 for seg in geo.body_segments)
+    head_area = sum(seg.lateral_area_mm2 for seg in geo.head_segments)
 
-    head_h = max(dim.head_height_mm - dim.head_neck_overlap_mm, 8.0)
-    head_area = (
-        _surface_area_frustum(r_neck, r_neck * 1.18, head_h * 0.45)
-        + _surface_area_frustum(r_neck * 1.18, r_head, head_h * 0.55)
-    )
-
-    insert_ring_area = (
-        math.pi * (dim.insert_outer_diameter_mm**2 - dim.insert_inner_diameter_mm**2) / 4.0
-    )
-    insert_wall_area = (
-        math.pi * dim.insert_outer_diameter_mm * dim.insert_height_mm
-    )
+    insert = geo.insert
+    insert_ring_area = math.pi * (insert.outer_r**2 - insert.inner_r**2)
+    insert_wall_area = 2.0 * math.pi * insert.outer_r * insert.height
     insert_area = insert_ring_area + insert_wall_area
 
-    base_disc_area = math.pi * (dim.base_cap_diameter_mm**2) / 4.0
+    base_disc_area = math.pi * geo.base_cap_r * geo.base_cap_r
 
     handle_len = dim.handle_length_mm * 1.25
     handle_area = math.pi * dim.handle_thickness_mm * handle_len
 
-    gasket_major_r = dim.neck_diameter_mm * 0.5
-    gasket_minor_r = max(dim.gasket_cross_section_mm * 0.5, 0.5)
-    gasket_vol_mm3 = 2.0 * math.pi * math.pi * gasket_major_r * (gasket_minor_r**2)
+    gasket_vol_mm3 = 2.0 * math.pi * math.pi * geo.gasket.major_r * (geo.gasket.minor_r**2)
 
     def mass_from_shell(area_mm2: float, thickness_mm: float, material: str) -> float:
         density = _find_density_g_cm3(material)
@@ -332,6 +290,7 @@ def merge_materials(
     return merged
 
 
+@timed("blueprint.build")
 def build_blueprint(
     cups: float = 4.0,
     material_suggestions: list[MaterialSuggestion] | None = None,
@@ -349,6 +308,7 @@ def build_blueprint(
     )
 
 
+@timed("blueprint.refresh")
 def refresh_blueprint(blueprint: Blueprint) -> Blueprint:
     updated = blueprint.model_copy(deep=True)
     updated.dimensions.overall_height_mm = round(
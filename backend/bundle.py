@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from concurrent.futures import Executor, Future, as_completed
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+# Formats that are already deflate/PNG compressed gain nothing from a second pass.
+STORED_SUFFIXES = {".png", ".pptx", ".zip", ".webp", ".jpg", ".jpeg"}
+
+BundleJob = Callable[[], tuple[str, bytes]]
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def iter_zip_bundle(
+    jobs: dict[str, BundleJob],
+    executor: Executor,
+    manifest: dict[str, Any] | None = None,
+) -> Iterator[bytes]:
+    """Run ``jobs`` concurrently and stream a ZIP, adding members as they finish.
+
+    Each job returns ``(archive_name, data)``. A ``manifest.json`` listing the
+    members (plus any ``manifest`` fields) is appended last. The status line
+    has gone out by the time a job fails, so a failure is recorded in the
+    manifest (``complete: false`` plus an ``errors`` list) and the archive is
+    still finished rather than truncated.
+    """
+    stream = _ZipStream()
+    futures: dict[Future[tuple[str, bytes]], str] = {
+        executor.submit(job): label for label, job in jobs.items()
+    }
+    members: list[dict[str, Any]] = []
+    errors: list[dict[str, str]] = []
+    stamp = datetime.now().timetuple()[:6]
+
+    try:
+        with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures):
+                try:
+                    name, data = future.result()
+                except Exception as exc:
+                    errors.append({"label": futures[future], "error": f"{type(exc).__name__}: {exc}"})
+                    continue
+                info = zipfile.ZipInfo(name, date_time=stamp)
+                suffix = name[name.rfind(".") :].lower() if "." in name else ""
+                info.compress_type = zipfile.ZIP_STORED if suffix in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+                archive.writestr(info, data)
+                members.append({"label": futures[future], "name": name, "size_bytes": len(data)})
+                yield stream.drain()
+
+            body = dict(manifest or {})
+            body["files"] = members
+            body["complete"] = not errors
+            if errors:
+                body["errors"] = errors
+            info = zipfile.ZipInfo("manifest.json", date_time=stamp)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, json.dumps(body, indent=2))
+        yield stream.drain()
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from .models import Blueprint
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Bump when exporter output changes so stale disk entries are never served.
+EXPORT_CACHE_VERSION = "5"
+EXPORT_DISK_MAX_BYTES = int(float(os.environ.get("TEAPOT_EXPORT_CACHE_DISK_MB", "256")) * 1024 * 1024)
+
+
+def canonical_json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True).encode("ascii")
+
+
+def blueprint_hash(blueprint: Blueprint) -> str:
+    return hashlib.sha256(canonical_json(blueprint.model_dump())).hexdigest()
+
+
+def export_key(design_hash: str, file_format: str, options: dict[str, Any] | None = None) -> str:
+    material = f"{EXPORT_CACHE_VERSION}:{design_hash}:{file_format}:".encode("ascii")
+    material += canonical_json(options or {})
+    return hashlib.sha256(material).hexdigest()
+
+
+def strong_etag(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe LRU bounded by entry count and, optionally, total weight."""
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        max_weight: int | None = None,
+        weigher: Callable[[V], int] | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self._weigher = weigher
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _weigh(self, value: V) -> int:
+        return self._weigher(value) if self._weigher else 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._weight -= self._weigh(old)
+            self._data[key] = value
+            self._weight += self._weigh(value)
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_weight is not None and self._weight > self.max_weight)
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self._weight -= self._weigh(evicted)
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                self._weight -= self._weigh(value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+
+@dataclass(frozen=True)
+class CachedExport:
+    key: str
+    data: bytes
+    media_type: str
+    file_name: str
+    export_path: str = ""
+
+    @property
+    def etag(self) -> str:
+        return strong_etag(self.key)
+
+
+class ExportCache:
+    """Two-tier (memory LRU + disk) cache of rendered export payloads.
+
+    The disk tier is an LRU too: the index is built from file mtimes once, a
+    disk hit refreshes the mtime, and writes prune only when over budget.
+    """
+
+    def __init__(
+        self,
+        disk_dir: Path | None,
+        max_entries: int = 64,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_disk_entries: int = 512,
+        max_disk_bytes: int = EXPORT_DISK_MAX_BYTES,
+    ) -> None:
+        self.memory: LRUCache[str, CachedExport] = LRUCache(
+            maxsize=max_entries,
+            max_weight=max_bytes,
+            weigher=lambda entry: len(entry.data),
+        )
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        # key -> payload size, least recently used first.
+        self._disk_index: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.bin", self.disk_dir / f"{key}.json"
+
+    def _scan_disk(self) -> None:
+        assert self.disk_dir is not None
+        entries = []
+        for path in self.disk_dir.glob("*.bin"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.stem, st.st_size))
+        with self._disk_lock:
+            for _, key, size in sorted(entries):
+                self._disk_index[key] = size
+                self._disk_bytes += size
+            self._prune_disk()
+
+    @property
+    def disk_usage(self) -> tuple[int, int]:
+        """(entries, payload bytes) in the disk tier, as seen by this cache."""
+        return len(self._disk_index), self._disk_bytes
+
+    def get(self, key: str) -> CachedExport | None:
+        entry = self.memory.get(key)
+        if entry is not None or self.disk_dir is None:
+            return entry
+
+        data_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            data = data_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(data_path)
+        except OSError:
+            pass
+
+        entry = CachedExport(key=key, data=data, **meta)
+        self.memory.put(key, entry)
+        self.disk_hits += 1
+        with self._disk_lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+            else:
+                self._disk_index[key] = len(data)
+                self._disk_bytes += len(data)
+        return entry
+
+    def put(self, entry: CachedExport) -> CachedExport:
+        self.memory.put(entry.key, entry)
+        if self.disk_dir is None:
+            return entry
+
+        data_path, meta_path = self._paths(entry.key)
+        meta = {
+            "media_type": entry.media_type,
+            "file_name": entry.file_name,
+            "export_path": entry.export_path,
+        }
+        with self._disk_lock:
+            # Payload first, then metadata, each swapped in whole.
+            _write_atomic(data_path, entry.data)
+            _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._disk_bytes += len(entry.data) - self._disk_index.pop(entry.key, 0)
+            self._disk_index[entry.key] = len(entry.data)
+            self._prune_disk()
+        return entry
+
+    def _prune_disk(self) -> None:
+        # Another process sharing the directory may already have removed a file.
+        while self._disk_index and (
+            len(self._disk_index) > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes
+        ):
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            data_path, meta_path = self._paths(key)
+            data_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
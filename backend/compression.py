@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import gzip
+import os
+import zlib
+from typing import Any, Callable
+
+# Server preference when the client weights several codings equally.
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+GZIP_LEVEL = int(os.environ.get("TEAPOT_GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.environ.get("TEAPOT_BROTLI_QUALITY", "11"))
+# API responses are compressed on the request path, so they trade a little ratio for speed.
+RESPONSE_GZIP_LEVEL = int(os.environ.get("TEAPOT_RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get("TEAPOT_RESPONSE_BROTLI_QUALITY", "5"))
+MIN_RESPONSE_BYTES = int(os.environ.get("TEAPOT_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/dxf",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "model/obj",
+}
+
+_BROTLI: Any = None
+_BROTLI_CHECKED = False
+
+
+def brotli_module() -> Any:
+    """The ``brotli`` module, or ``None`` when it is not installed (gzip is served instead)."""
+    global _BROTLI, _BROTLI_CHECKED
+    if not _BROTLI_CHECKED:
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        _BROTLI, _BROTLI_CHECKED = brotli, True
+    return _BROTLI
+
+
+def gzip_bytes(data: bytes, level: int = GZIP_LEVEL) -> bytes:
+    # mtime=0 keeps the output, and so its hash and ETag, reproducible.
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_bytes(data: bytes, quality: int = BROTLI_QUALITY) -> bytes:
+    return brotli_module().compress(data, quality=quality)
+
+
+def available_codecs() -> dict[str, Callable[[bytes], bytes]]:
+    codecs: dict[str, Callable[[bytes], bytes]] = {"gzip": gzip_bytes}
+    if brotli_module() is not None:
+        codecs["br"] = brotli_bytes
+    return codecs
+
+
+def parse_accept_encoding(header: str | None) -> dict[str, float]:
+    """Coding -> q-value. A missing header means identity only."""
+    weights: dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+    return weights
+
+
+def negotiate(header: str | None, available: tuple[str, ...] | list[str]) -> str:
+    """Best of ``available`` for an ``Accept-Encoding`` header; ``identity`` is always acceptable."""
+    weights = parse_accept_encoding(header)
+    wildcard = weights.get("*", 0.0)
+    best, best_q = "identity", -1.0
+    for coding in ENCODING_PREFERENCE:
+        if coding != "identity" and coding not in available:
+            continue
+        q = weights.get(coding, 1.0 if coding == "identity" else wildcard)
+        if q > best_q + 1e-9 and q > 0.0:
+            best, best_q = coding, q
+    return best
+
+
+def compressible(media_type: str | None) -> bool:
+    """Text-like payloads. PNG, PPTX, ZIP and the binary mesh are already dense and are left alone."""
+    if not media_type:
+        return False
+    media = media_type.split(";", 1)[0].strip().lower()
+    return media.startswith("text/") or media in COMPRESSIBLE_TYPES or media.endswith(("+json", "+xml"))
+
+
+def encode(data: bytes, coding: str) -> bytes:
+    """One-shot compression at the response levels."""
+    if coding == "gzip":
+        return gzip_bytes(data, RESPONSE_GZIP_LEVEL)
+    if coding == "br":
+        return brotli_bytes(data, RESPONSE_BROTLI_QUALITY)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+def weak_etag(etag: str) -> str:
+    """An encoded body shares its identity ETag only weakly (RFC 9110 8.8.3)."""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class StreamEncoder:
+    """Incremental gzip or brotli, for bodies that arrive in chunks."""
+
+    def __init__(self, coding: str) -> None:
+        if coding == "gzip":
+            # wbits 31: gzip framing; the header's mtime is zero.
+            compressor = zlib.compressobj(RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._process, self._finish = compressor.compress, compressor.flush
+        elif coding == "br":
+            compressor = brotli_module().Compressor(quality=RESPONSE_BROTLI_QUALITY)
+            self._process, self._finish = compressor.process, compressor.finish
+        else:
+            raise ValueError(f"Unsupported content coding: {coding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._process(chunk) if chunk else b""
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def _header(headers: list[tuple[bytes, bytes]], name: bytes) -> str | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing text responses with the best coding the client accepts.
+
+    Responses that already carry ``Content-Encoding`` (precompressed assets
+    and cached export variants) pass through untouched. Small one-part
+    bodies are sent as they are; streamed bodies are compressed chunk by
+    chunk without being buffered.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = MIN_RESPONSE_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(_header(scope["headers"], b"accept-encoding"), tuple(available_codecs()))
+        if coding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start: dict | None = None
+        encoder: StreamEncoder | None = None
+
+        async def send_compressed(message: dict) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether compression is worth it.
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                message_start, start = start, None
+                headers = list(message_start.get("headers", []))
+                eligible = (
+                    message_start["status"] not in (204, 304)
+                    and _header(headers, b"content-encoding") is None
+                    and compressible(_header(headers, b"content-type"))
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if not eligible:
+                    await send(message_start)
+                    await send(message)
+                    return
+
+                encoder = StreamEncoder(coding)
+                headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                vary = _header(headers, b"vary")
+                headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+                headers.append((b"vary", f"{vary}, Accept-Encoding".encode("latin-1") if vary else b"Accept-Encoding"))
+                headers.append((b"content-encoding", coding.encode("ascii")))
+                etag = _header(headers, b"etag")
+                if etag is not None:
+                    headers = [(k, v) for k, v in headers if k.lower() != b"etag"]
+                    headers.append((b"etag", weak_etag(etag).encode("latin-1")))
+                data = encoder.compress(body)
+                if not more_body:
+                    data += encoder.finish()
+                    headers.append((b"content-length", str(len(data)).encode("ascii")))
+                await send({**message_start, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            if encoder is None:
+                await send(message)
+                return
+            data = encoder.compress(body)
+            if not more_body:
+                data += encoder.finish()
+            # Chunks the compressor is still holding go out with a later one.
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
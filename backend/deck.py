@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import copy
+import io
+import struct
+import zipfile
+from dataclasses import dataclass
+from functools import lru_cache
+
+from lxml import etree
+from PIL import Image
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import qn
+from pptx.shapes.autoshape import Shape
+from pptx.slide import Slide
+from pptx.text.text import _Run
+from pptx.util import Inches, Pt
+
+from .geometry import teapot_geometry
+from .metrics import timed
+from .models import Blueprint
+
+BRAND_DARK = RGBColor(20, 76, 96)
+BRAND_LIGHT = RGBColor(227, 237, 241)
+BRAND_LINE = RGBColor(13, 84, 103)
+BRAND_TEXT = RGBColor(245, 250, 252)
+
+# Rows pre-built in the template tables; requests with a different count
+# clone or drop <a:tr> elements instead of rebuilding the table.
+TEMPLATE_TABLE_ROWS = 6
+NOTE_LIMIT = 6
+SUMMARY_LINES = 6
+OUTLINE_POINTS = 12
+
+MATERIAL_HEADERS = ["Part", "Selected Material", "Recommended", "Confidence", "Notes"]
+BOM_HEADERS = ["Part", "Material", "Process", "Thk (mm)", "Qty", "Mass (g)"]
+
+DRAWING_LEFT = Inches(7.05)
+DRAWING_TOP = Inches(1.25)
+DRAWING_HEIGHT = Inches(2.3)
+DRAWING_WIDTH = Inches(2.6)
+
+RENDER_LEFT = Inches(0.4)
+RENDER_TOP = Inches(1.15)
+RENDER_WIDTH = Inches(9.2)
+RENDER_PLACEHOLDER_SIZE = (1860, 1120)
+
+OVERVIEW_PART = "ppt/slides/slide1.xml"
+MATERIALS_PART = "ppt/slides/slide2.xml"
+BOM_PART = "ppt/slides/slide3.xml"
+RENDER_PART = "ppt/slides/slide4.xml"
+SLIDE_PARTS = (OVERVIEW_PART, MATERIALS_PART, BOM_PART, RENDER_PART)
+
+_A_T = qn("a:t")
+_A_P = qn("a:p")
+_A_R = qn("a:r")
+_A_TR = qn("a:tr")
+_A_TC = qn("a:tc")
+_A_OFF = qn("a:off")
+_A_EXT = qn("a:ext")
+_A_PT = qn("a:pt")
+_A_PATH = qn("a:path")
+_A_TBL = qn("a:tbl")
+_P_CNVPR = qn("p:cNvPr")
+_P_SP_TREE = qn("p:spTree")
+
+
+# Template construction: python-pptx, runs once per template variant.
+
+
+def _style_run(run: _Run, size: int, bold: bool = False, color: RGBColor | None = None) -> None:
+    run.font.size = Pt(size)
+    run.font.bold = bold
+    if color is not None:
+        run.font.color.rgb = color
+
+
+def _add_textbox(
+    slide: Slide,
+    name: str,
+    left: int,
+    top: int,
+    width: int,
+    height: int,
+    styles: list[tuple[int, bool]],
+    color: RGBColor | None = None,
+) -> Shape:
+    box = slide.shapes.add_textbox(left, top, width, height)
+    box.name = name
+    tf = box.text_frame
+    tf.word_wrap = True
+    for idx, (size, bold) in enumerate(styles):
+        paragraph = tf.paragraphs[0] if idx == 0 else tf.add_paragraph()
+        _style_run(paragraph.add_run(), size, bold=bold, color=color)
+    return box
+
+
+def _add_banner(slide: Slide, title: str) -> None:
+    band = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, Inches(10), Inches(0.95))
+    band.name = "tp-band"
+    band.fill.solid()
+    band.fill.fore_color.rgb = BRAND_DARK
+    band.line.fill.background()
+    box = _add_textbox(
+        slide,
+        "tp-title",
+        Inches(0.6),
+        Inches(0.18),
+        Inches(9.0),
+        Inches(0.6),
+        [(26, True)],
+        BRAND_TEXT,
+    )
+    box.text_frame.paragraphs[0].runs[0].text = title
+
+
+def _add_table(slide: Slide, headers: list[str], left: int, top: int, width: int, height: int) -> None:
+    shape = slide.shapes.add_table(TEMPLATE_TABLE_ROWS + 1, len(headers), left, top, width, height)
+    shape.name = "tp-table"
+    table = shape.table
+    for col, text in enumerate(headers):
+        table.cell(0, col).text = text
+    for row in range(1, TEMPLATE_TABLE_ROWS + 1):
+        for col in range(len(headers)):
+            # Give every cell a run so per-request filling only swaps text.
+            table.cell(row, col).text_frame.paragraphs[0].add_run()
+
+
+def _add_drawing_shapes(slide: Slide) -> None:
+    # Placeholder geometry; every request rewrites offsets, extents and points.
+    builder = slide.shapes.build_freeform(DRAWING_LEFT, DRAWING_TOP)
+    builder.add_line_segments(
+        [(DRAWING_LEFT + i * 1000, DRAWING_TOP + (i % 2) * 1000) for i in range(1, OUTLINE_POINTS)],
+        close=True,
+    )
+    side = builder.convert_to_shape()
+    side.name = "tp-side-view"
+    side.fill.solid()
+    side.fill.fore_color.rgb = BRAND_LIGHT
+    side.line.color.rgb = BRAND_LINE
+    side.line.width = Pt(1.5)
+
+    for idx in range(4):
+        circle = slide.shapes.add_shape(MSO_SHAPE.OVAL, DRAWING_LEFT, DRAWING_TOP, 1000, 1000)
+        circle.name = f"tp-top-view-{idx}"
+        circle.fill.background()
+        circle.line.color.rgb = BRAND_LINE
+        circle.line.width = Pt(1.5 if idx == 0 else 1.0)
+
+
+def _placeholder_png() -> bytes:
+    stream = io.BytesIO()
+    Image.new("RGB", RENDER_PLACEHOLDER_SIZE, (238, 243, 245)).save(stream, format="PNG")
+    return stream.getvalue()
+
+
+def _build_template_package(with_render: bool) -> bytes:
+    prs = Presentation()
+    blank = prs.slide_layouts[6]
+
+    # Unused layouts would be carried (and re-compressed) in every deck, so
+    # the template keeps only the one it uses.
+    for layout in list(prs.slide_layouts):
+        if layout is not blank:
+            prs.slide_layouts.remove(layout)
+
+    overview = prs.slides.add_slide(blank)
+    _add_banner(overview, "Curved-Head Teapot Blueprint")
+    _add_textbox(
+        overview,
+        "tp-summary",
+        Inches(0.6),
+        Inches(1.2),
+        Inches(6.3),
+        Inches(2.2),
+        [(16, False)] * SUMMARY_LINES,
+    )
+    notes = _add_textbox(
+        overview,
+        "tp-notes",
+        Inches(0.6),
+        Inches(3.9),
+        Inches(9.2),
+        Inches(2.6),
+        [(16, True)] + [(16, False)] * NOTE_LIMIT,
+    )
+    notes.text_frame.paragraphs[0].runs[0].text = "Design Notes"
+    _add_drawing_shapes(overview)
+
+    materials = prs.slides.add_slide(blank)
+    _add_banner(materials, "Material Suggestions")
+    _add_table(materials, MATERIAL_HEADERS, Inches(0.5), Inches(1.2), Inches(9.2), Inches(5.6))
+
+    bom = prs.slides.add_slide(blank)
+    _add_banner(bom, "Manufacturing Bill of Materials")
+    _add_table(bom, BOM_HEADERS, Inches(0.4), Inches(1.2), Inches(9.4), Inches(5.7))
+
+    if with_render:
+        render = prs.slides.add_slide(blank)
+        _add_banner(render, "Prototype Render")
+        picture = render.shapes.add_picture(
+            io.BytesIO(_placeholder_png()),
+            RENDER_LEFT,
+            RENDER_TOP,
+            width=RENDER_WIDTH,
+        )
+        picture.name = "tp-render"
+
+    stream = io.BytesIO()
+    prs.save(stream)
+    return stream.getvalue()
+
+
+@dataclass(frozen=True)
+class DeckTemplate:
+    """A pre-built deck split into raw zip members and parsed slide trees."""
+
+    members: tuple[tuple[str, bytes], ...]
+    slides: dict[str, etree._Element]
+    media_part: str | None
+
+
+@lru_cache(maxsize=2)
+def deck_template(with_render: bool = False) -> DeckTemplate:
+    package = zipfile.ZipFile(io.BytesIO(_build_template_package(with_render)))
+    members: list[tuple[str, bytes]] = []
+    slides: dict[str, etree._Element] = {}
+    media_part = None
+    for name in package.namelist():
+        data = package.read(name)
+        members.append((name, data))
+        if name in SLIDE_PARTS:
+            slides[name] = etree.fromstring(data)
+        elif name.startswith("ppt/media/"):
+            media_part = name
+    return DeckTemplate(members=tuple(members), slides=slides, media_part=media_part)
+
+
+def warm_template() -> None:
+    deck_template(False)
+    deck_template(True)
+
+
+# Per-request filling: plain lxml edits on copies of the cached slide trees.
+
+
+def _named_shape(slide: etree._Element, name: str) -> etree._Element:
+    for c_nv_pr in slide.iter(_P_CNVPR):
+        if c_nv_pr.get("name") == name:
+            # cNvPr -> nvSpPr / nvGraphicFramePr / nvPicPr -> shape element
+            return c_nv_pr.getparent().getparent()
+    raise KeyError(name)
+
+
+def _set_xfrm(shape: etree._Element, x: int, y: int, cx: int, cy: int) -> None:
+    off = next(shape.iter(_A_OFF))
+    ext = next(shape.iter(_A_EXT))
+    off.set("x", str(int(x)))
+    off.set("y", str(int(y)))
+    ext.set("cx", str(max(int(cx), 1)))
+    ext.set("cy", str(max(int(cy), 1)))
+
+
+def _fill_paragraphs(shape: etree._Element, lines: list[str]) -> None:
+    paragraphs = list(shape.iter(_A_P))
+    for paragraph, line in zip(paragraphs, lines):
+        paragraph.find(_A_R).find(_A_T).text = line
+    for paragraph in paragraphs[len(lines) :]:
+        paragraph.getparent().remove(paragraph)
+
+
+def _fill_table(slide: etree._Element, rows: list[list[str]]) -> None:
+    tbl = next(_named_shape(slide, "tp-table").iter(_A_TBL))
+    body_rows = tbl.findall(_A_TR)[1:]
+    wanted = max(len(rows), 1)
+
+    for extra in body_rows[wanted:]:
+        tbl.remove(extra)
+    del body_rows[wanted:]
+    while len(body_rows) < wanted:
+        clone = copy.deepcopy(body_rows[-1])
+        tbl.append(clone)
+        body_rows.append(clone)
+
+    for tr, values in zip(body_rows, rows):
+        for tc, value in zip(tr.iter(_A_TC), values):
+            next(tc.iter(_A_T)).text = value
+
+
+def _fill_drawing(slide: etree._Element, blueprint: Blueprint) -> None:
+    geo = teapot_geometry(blueprint.dimensions)
+    half_w = DRAWING_WIDTH // 2
+
+    # Side view: closed silhouette from the shared outline.
+    scale = min(half_w / (geo.max_radius * 2.2), DRAWING_HEIGHT / (geo.overall_h * 1.05))
+    axis_x = DRAWING_LEFT + half_w // 2
+    base_y = DRAWING_TOP + DRAWING_HEIGHT
+    outline = list(geo.outline) + [(-r, y) for r, y in reversed(geo.outline)]
+    points = [(axis_x + r * scale, base_y - y * scale) for r, y in outline]
+    left = min(x for x, _ in points)
+    top = min(y for _, y in points)
+    width = max(x for x, _ in points) - left
+    height = max(y for _, y in points) - top
+
+    side = _named_shape(slide, "tp-side-view")
+    _set_xfrm(side, left, top, width, height)
+    path = next(side.iter(_A_PATH))
+    path.set("w", str(max(int(width), 1)))
+    path.set("h", str(max(int(height), 1)))
+    for pt, (x, y) in zip(path.iter(_A_PT), points):
+        pt.set("x", str(int(x - left)))
+        pt.set("y", str(int(y - top)))
+
+    # Top view: concentric circles.
+    cx = DRAWING_LEFT + half_w + half_w // 2
+    cy = DRAWING_TOP + DRAWING_HEIGHT // 2
+    top_scale = half_w / (geo.r_head * 2.2)
+    for idx, radius in enumerate(geo.top_circles):
+        r = int(radius * top_scale)
+        _set_xfrm(_named_shape(slide, f"tp-top-view-{idx}"), cx - r, cy - r, 2 * r, 2 * r)
+
+
+def _remove_drawing(slide: etree._Element) -> None:
+    tree = next(slide.iter(_P_SP_TREE))
+    for name in ["tp-side-view"] + [f"tp-top-view-{idx}" for idx in range(4)]:
+        tree.remove(_named_shape(slide, name))
+
+
+def _png_size(data: bytes) -> tuple[int, int]:
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return RENDER_PLACEHOLDER_SIZE
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def _fill_render(slide: etree._Element, prototype_png: bytes) -> None:
+    width, height = _png_size(prototype_png)
+    picture = _named_shape(slide, "tp-render")
+    _set_xfrm(picture, RENDER_LEFT, RENDER_TOP, RENDER_WIDTH, RENDER_WIDTH * height // max(width, 1))
+
+
+def _serialize(root: etree._Element) -> bytes:
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+@timed("pptx.deck")
+def build_deck(
+    blueprint: Blueprint,
+    prototype_png: bytes | None = None,
+    include_drawing: bool = True,
+) -> bytes:
+    d = blueprint.dimensions
+    template = deck_template(prototype_png is not None)
+    slides = {name: copy.deepcopy(root) for name, root in template.slides.items()}
+
+    overview = slides[OVERVIEW_PART]
+    _fill_paragraphs(_named_shape(overview, "tp-title"), [blueprint.title])
+    _fill_paragraphs(
+        _named_shape(overview, "tp-summary"),
+        [
+            f"Target: {d.cups_target:.1f} cups ({d.capacity_target_ml:.0f} ml)",
+            f"Estimated Capacity: {d.estimated_capacity_ml:.0f} ml",
+            f"Overall Height: {d.overall_height_mm:.1f} mm ({d.overall_height_mm / 25.4:.2f} in)",
+            f"Body Max Dia: {d.body_max_diameter_mm:.1f} mm ({d.body_max_diameter_mm / 25.4:.2f} in)",
+            f"Head Top Dia: {d.head_top_diameter_mm:.1f} mm ({d.head_top_diameter_mm / 25.4:.2f} in)",
+            "Material Baseline: Stainless Steel 304 + nylon handle + silicone gasket",
+        ],
+    )
+    notes = ["Design Notes"] + [f"- {note}" for note in blueprint.analysis_notes[:NOTE_LIMIT]]
+    _fill_paragraphs(_named_shape(overview, "tp-notes"), notes)
+
+    if include_drawing:
+        _fill_drawing(overview, blueprint)
+    else:
+        _remove_drawing(overview)
+
+    _fill_table(
+        slides[MATERIALS_PART],
+        [
+            [
+                mat.part_name,
+                mat.selected or mat.recommended,
+                mat.recommended,
+                f"{mat.confidence * 100:.0f}%",
+                mat.notes,
+            ]
+            for mat in blueprint.materials
+        ],
+    )
+    _fill_table(
+        slides[BOM_PART],
+        [
+            [
+                item.part_name,
+                item.material,
+                item.process,
+                f"{item.thickness_mm:.2f}",
+                str(item.quantity),
+                f"{item.mass_estimate_g:.1f}",
+            ]
+            for item in blueprint.bom
+        ],
+    )
+
+    if prototype_png is not None:
+        _fill_render(slides[RENDER_PART], prototype_png)
+
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as package:
+        for name, data in template.members:
+            if name in slides:
+                package.writestr(name, _serialize(slides[name]))
+            elif name == template.media_part and prototype_png is not None:
+                package.writestr(name, prototype_png, compress_type=zipfile.ZIP_STORED)
+            else:
+                package.writestr(name, data)
+    return stream.getvalue()
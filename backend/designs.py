@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import LRUCache, blueprint_hash
+from .models import Blueprint
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS designs (
+    design_id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    created_at REAL NOT NULL,
+    touched_at REAL NOT NULL,
+    blueprint TEXT NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class DesignRecord:
+    design_id: str
+    blueprint: Blueprint
+    parent_id: str | None
+    created_at: float
+
+
+class DesignStore:
+    """Saved blueprint versions addressed by content id.
+
+    ``design_id`` is the blueprint hash of the refreshed design, so the
+    export cache and the hash-addressed endpoints share the same key.
+    Recent versions live in a memory LRU with a sliding TTL; when
+    ``db_path`` is set every version is also written to SQLite and
+    survives restarts until it has been idle for ``disk_ttl_seconds``.
+
+    ``save`` only touches memory: new rows and last-use times are queued
+    and written in one transaction by ``flush``, which the maintenance
+    thread runs every ``flush_interval_s`` along with the expiry sweep.
+    A slider drag therefore costs no SQLite work on the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | None,
+        max_entries: int = 256,
+        ttl_seconds: float = 6 * 3600.0,
+        disk_ttl_seconds: float = 30 * 24 * 3600.0,
+    ) -> None:
+        self.memory: LRUCache[str, tuple[DesignRecord, float]] = LRUCache(maxsize=max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self.db_path = db_path
+        self.disk_hits = 0
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        # Queued for the next flush: new rows by id, and ids used since the last flush.
+        self._pending_lock = threading.Lock()
+        self._pending: dict[str, DesignRecord] = {}
+        self._touched: dict[str, float] = {}
+        self._maintenance_thread: threading.Thread | None = None
+        self._maintenance_stop = threading.Event()
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+
+    @classmethod
+    def from_env(cls, cache_dir: Path) -> DesignStore:
+        raw = os.environ.get("TEAPOT_DESIGN_DB", "").strip()
+        if raw.lower() in {"off", "none", "memory"}:
+            db_path = None
+        else:
+            db_path = Path(raw) if raw else cache_dir / "designs.sqlite3"
+        ttl = float(os.environ.get("TEAPOT_DESIGN_TTL_S", "21600"))
+        return cls(db_path, ttl_seconds=ttl)
+
+    def _remember(self, record: DesignRecord) -> DesignRecord:
+        self.memory.put(record.design_id, (record, time.monotonic() + self.ttl_seconds))
+        if self._db is not None:
+            with self._pending_lock:
+                self._touched[record.design_id] = time.time()
+        return record
+
+    def save(self, blueprint: Blueprint, parent_id: str | None = None) -> DesignRecord:
+        """Store an already refreshed blueprint; saving an existing version keeps its history."""
+        design_id = blueprint_hash(blueprint)
+        # Memory and the write queue only: a version that is just on disk is
+        # re-queued and the INSERT OR IGNORE keeps its original history there.
+        existing = self._get_queued(design_id)
+        if existing is not None:
+            return existing
+
+        record = DesignRecord(design_id, blueprint, parent_id, time.time())
+        if self._db is not None:
+            with self._pending_lock:
+                self._pending[design_id] = record
+        return self._remember(record)
+
+    def _get_queued(self, design_id: str) -> DesignRecord | None:
+        cached = self.memory.get(design_id)
+        if cached is not None:
+            record, expires_at = cached
+            if time.monotonic() < expires_at:
+                return self._remember(record)
+            self.memory.pop(design_id)
+        with self._pending_lock:
+            record = self._pending.get(design_id)
+        return self._remember(record) if record is not None else None
+
+    def get(self, design_id: str) -> DesignRecord | None:
+        record = self._get_queued(design_id)
+        if record is not None or self._db is None:
+            return record
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT parent_id, created_at, blueprint FROM designs WHERE design_id = ?",
+                (design_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        self.disk_hits += 1
+        parent_id, created_at, payload = row
+        return self._remember(DesignRecord(design_id, Blueprint.model_validate_json(payload), parent_id, created_at))
+
+    def history(self, design_id: str, limit: int = 50) -> list[DesignRecord]:
+        """The version and its ancestors, newest first."""
+        records: list[DesignRecord] = []
+        current: str | None = design_id
+        while current is not None and len(records) < limit:
+            record = self.get(current)
+            if record is None:
+                break
+            records.append(record)
+            current = record.parent_id
+        return records
+
+    def flush(self) -> int:
+        """Write queued versions and last-use times in one transaction; returns the rows inserted."""
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            touched, self._touched = self._touched, {}
+        if not pending and not touched:
+            return 0
+        # Serialised here rather than in ``save`` to keep it off the caller's thread.
+        rows = [
+            (r.design_id, r.parent_id, r.created_at, touched.get(r.design_id, r.created_at), r.blueprint.model_dump_json())
+            for r in pending
+        ]
+        with self._db_lock:
+            if self._db is None:
+                return 0
+            with self._db:
+                self._db.execute("BEGIN")
+                self._db.executemany("INSERT OR IGNORE INTO designs VALUES (?, ?, ?, ?, ?)", rows)
+                self._db.executemany(
+                    "UPDATE designs SET touched_at = MAX(touched_at, ?) WHERE design_id = ?",
+                    [(stamp, design_id) for design_id, stamp in touched.items()],
+                )
+        # Dropped only once committed, so ``get`` finds a version either queued or on disk.
+        with self._pending_lock:
+            for record in pending:
+                if self._pending.get(record.design_id) is record:
+                    del self._pending[record.design_id]
+        return len(rows)
+
+    def collect_expired(self, now: float | None = None) -> int:
+        if self._db is None:
+            return 0
+        self.flush()
+        cutoff = (time.time() if now is None else now) - self.disk_ttl_seconds
+        with self._db_lock:
+            if self._db is None:
+                return 0
+            return self._db.execute("DELETE FROM designs WHERE touched_at < ?", (cutoff,)).rowcount
+
+    def start_maintenance(self, flush_interval_s: float = 0.5, expire_interval_s: float = 3600.0) -> None:
+        """Flush queued writes every ``flush_interval_s`` and sweep expired rows every ``expire_interval_s``."""
+        if self._db is None or (self._maintenance_thread is not None and self._maintenance_thread.is_alive()):
+            return
+        self._maintenance_stop.clear()
+
+        def loop() -> None:
+            next_sweep = time.monotonic()
+            while not self._maintenance_stop.wait(flush_interval_s):
+                try:
+                    if time.monotonic() >= next_sweep:
+                        self.collect_expired()
+                        next_sweep = time.monotonic() + expire_interval_s
+                    else:
+                        self.flush()
+                except sqlite3.Error:
+                    pass
+
+        self._maintenance_thread = threading.Thread(target=loop, name="design-store-maintenance", daemon=True)
+        self._maintenance_thread.start()
+
+    def close(self) -> None:
+        self._maintenance_stop.set()
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join(timeout=5.0)
+            self._maintenance_thread = None
+        if self._db is not None:
+            self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
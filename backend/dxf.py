@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import math
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator, TextIO
+
+from .geometry import Point2
+
+DXF_VERSION = "AC1009"
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def format_number(value: float, precision: int = 4) -> str:
+    """Shortest fixed-point form: 12.5000 -> 12.5, 3.0 -> 3, -0.0 -> 0."""
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def _unicode_escape(match: re.Match[str]) -> str:
+    # The escape has four hex digits, so characters beyond the BMP cannot be written.
+    code = ord(match.group())
+    return f"\\U+{code:04X}" if code <= 0xFFFF else "?"
+
+
+def encode_dxf(text: str) -> bytes:
+    """R12 files are ASCII; other characters become the ``\\U+XXXX`` escapes CAD readers decode."""
+    return _NON_ASCII.sub(_unicode_escape, text).encode("ascii")
+
+
+@dataclass(frozen=True)
+class Layer:
+    name: str
+    color: int = 7
+    linetype: str = "CONTINUOUS"
+
+
+DEFAULT_LAYERS = (
+    Layer("0", 7),
+    Layer("SIDE", 7),
+    Layer("TOP", 5),
+    Layer("CENTER", 1, "CENTER"),
+    Layer("DIM", 3),
+    Layer("ANNOT", 2),
+)
+
+
+@dataclass(frozen=True)
+class LinearDimension:
+    """Rotated linear dimension between ``p1`` and ``p2``; ``line_at`` lies on the dimension line."""
+
+    p1: Point2
+    p2: Point2
+    line_at: Point2
+    angle_deg: float = 0.0
+    text: str = ""
+
+    def resolve(self) -> tuple[Point2, Point2, Point2, float]:
+        """Return the two dimension-line ends, the text midpoint and the measured length."""
+        a = math.radians(self.angle_deg)
+        ux, uy = math.cos(a), math.sin(a)
+        lx, ly = self.line_at
+
+        def project(p: Point2) -> Point2:
+            t = (p[0] - lx) * ux + (p[1] - ly) * uy
+            return (lx + ux * t, ly + uy * t)
+
+        d1 = project(self.p1)
+        d2 = project(self.p2)
+        mid = ((d1[0] + d2[0]) * 0.5, (d1[1] + d2[1]) * 0.5)
+        measurement = abs((self.p2[0] - self.p1[0]) * ux + (self.p2[1] - self.p1[1]) * uy)
+        return d1, d2, mid, measurement
+
+    def layout(self, tick: float = 1.25, gap: float = 1.5) -> DimensionLayout:
+        """Dimension line, extension lines, end ticks and label placement, shared by the DXF and SVG writers."""
+        d1, d2, mid, measurement = self.resolve()
+        a = math.radians(self.angle_deg)
+        ux, uy = math.cos(a), math.sin(a)
+        nx, ny = -uy, ux
+
+        lines: list[tuple[Point2, Point2]] = [(d1, d2)]
+        for p, d in ((self.p1, d1), (self.p2, d2)):
+            ex, ey = d[0] - p[0], d[1] - p[1]
+            length = math.hypot(ex, ey)
+            if length > 1e-9:
+                over = 2.0 / length
+                lines.append((p, (d[0] + ex * over, d[1] + ey * over)))
+            tx, ty = (ux + nx) * tick, (uy + ny) * tick
+            lines.append(((d[0] - tx, d[1] - ty), (d[0] + tx, d[1] + ty)))
+
+        return DimensionLayout(
+            lines=tuple(lines),
+            text_at=(mid[0] + nx * gap, mid[1] + ny * gap),
+            label=self.text or format_number(measurement, 1),
+            angle_deg=self.angle_deg,
+        )
+
+
+@dataclass(frozen=True)
+class DimensionLayout:
+    lines: tuple[tuple[Point2, Point2], ...]
+    text_at: Point2
+    label: str
+    angle_deg: float
+
+
+class DxfWriter:
+    """Streaming DXF R12 encoder; each call writes group-code pairs straight to ``stream``.
+
+    R12 needs no handles, owner links or OBJECTS section, so a file written
+    in one pass is complete and opens without recovery in strict readers.
+    """
+
+    def __init__(self, stream: TextIO, precision: int = 4) -> None:
+        self.stream = stream
+        self.precision = precision
+
+    def group(self, code: int, value: str | int) -> None:
+        self.stream.write(f"{code}\n{value}\n")
+
+    def number(self, code: int, value: float) -> None:
+        self.stream.write(f"{code}\n{format_number(value, self.precision)}\n")
+
+    def point(self, code: int, x: float, y: float, z: float | None = None) -> None:
+        fmt = format_number
+        p = self.precision
+        if z is None:
+            self.stream.write(f"{code}\n{fmt(x, p)}\n{code + 10}\n{fmt(y, p)}\n")
+        else:
+            self.stream.write(f"{code}\n{fmt(x, p)}\n{code + 10}\n{fmt(y, p)}\n{code + 20}\n{fmt(z, p)}\n")
+
+    def _entity(self, kind: str, layer: str) -> None:
+        self.stream.write(f"0\n{kind}\n8\n{layer}\n")
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        self.stream.write(f"0\nSECTION\n2\n{name}\n")
+        yield
+        self.stream.write("0\nENDSEC\n")
+
+    @contextmanager
+    def table(self, name: str, count: int) -> Iterator[None]:
+        self.stream.write(f"0\nTABLE\n2\n{name}\n70\n{count}\n")
+        yield
+        self.stream.write("0\nENDTAB\n")
+
+    def header(self, extents: tuple[float, float, float, float] | None = None) -> None:
+        with self.section("HEADER"):
+            self.group(9, "$ACADVER")
+            self.group(1, DXF_VERSION)
+            self.group(9, "$INSBASE")
+            self.point(10, 0.0, 0.0, 0.0)
+            if extents is not None:
+                x0, y0, x1, y1 = extents
+                self.group(9, "$EXTMIN")
+                self.point(10, x0, y0, 0.0)
+                self.group(9, "$EXTMAX")
+                self.point(10, x1, y1, 0.0)
+
+    def tables(self, layers: Iterable[Layer] = DEFAULT_LAYERS) -> None:
+        layers = list(layers)
+        with self.section("TABLES"):
+            with self.table("LTYPE", 2):
+                for name, text, pattern in (
+                    ("CONTINUOUS", "Solid line", ()),
+                    ("CENTER", "Center ____ _ ____ _", (12.7, -2.54, 2.54, -2.54)),
+                ):
+                    self.stream.write(f"0\nLTYPE\n2\n{name}\n70\n0\n3\n{text}\n72\n65\n73\n{len(pattern)}\n")
+                    self.number(40, sum(abs(v) for v in pattern))
+                    for dash in pattern:
+                        self.number(49, dash)
+            with self.table("LAYER", len(layers)):
+                for layer in layers:
+                    self.stream.write(
+                        f"0\nLAYER\n2\n{layer.name}\n70\n0\n62\n{layer.color}\n6\n{layer.linetype}\n"
+                    )
+            with self.table("STYLE", 1):
+                self.stream.write("0\nSTYLE\n2\nSTANDARD\n70\n0\n40\n0\n41\n1\n50\n0\n71\n0\n42\n2.5\n3\ntxt\n4\n\n")
+            with self.table("APPID", 1):
+                self.stream.write("0\nAPPID\n2\nACAD\n70\n0\n")
+            with self.table("DIMSTYLE", 1):
+                self.stream.write(
+                    "0\nDIMSTYLE\n2\nSTANDARD\n70\n0\n40\n1\n41\n2.5\n42\n0.625\n"
+                    "43\n3.75\n44\n1.25\n140\n2.5\n141\n2.5\n147\n0.625\n"
+                )
+
+    def _block(self, name: str, flags: int, layer: str) -> None:
+        self.stream.write(
+            f"0\nBLOCK\n8\n{layer}\n2\n{name}\n70\n{flags}\n10\n0\n20\n0\n30\n0\n3\n{name}\n1\n\n"
+        )
+
+    def _end_block(self, layer: str) -> None:
+        self.stream.write(f"0\nENDBLK\n8\n{layer}\n")
+
+    def dimension_blocks(self, dimensions: Iterable[LinearDimension], layer: str = "DIM") -> list[str]:
+        """Write the anonymous ``*D`` geometry blocks CAD readers draw dimensions from."""
+        names: list[str] = []
+        with self.section("BLOCKS"):
+            for name in ("$MODEL_SPACE", "$PAPER_SPACE"):
+                self._block(name, 0, "0")
+                self._end_block("0")
+            for index, dim in enumerate(dimensions, start=1):
+                name = f"*D{index}"
+                names.append(name)
+                self._block(name, 1, layer)
+                self._dimension_geometry(dim, layer)
+                self._end_block(layer)
+        return names
+
+    def _dimension_geometry(self, dim: LinearDimension, layer: str) -> None:
+        layout = dim.layout()
+        for start, end in layout.lines:
+            self.line(start, end, layer)
+        text_at = layout.text_at
+        self._entity("TEXT", layer)
+        self.point(10, text_at[0], text_at[1], 0.0)
+        self.number(40, 2.5)
+        self.group(1, layout.label)
+        self.number(50, layout.angle_deg)
+        self.group(72, 1)
+        self.point(11, text_at[0], text_at[1], 0.0)
+
+    def line(self, start: Point2, end: Point2, layer: str = "0") -> None:
+        self._entity("LINE", layer)
+        self.point(10, start[0], start[1], 0.0)
+        self.point(11, end[0], end[1], 0.0)
+
+    def circle(self, center: Point2, radius: float, layer: str = "0") -> None:
+        self._entity("CIRCLE", layer)
+        self.point(10, center[0], center[1], 0.0)
+        self.number(40, radius)
+
+    def text(self, insert: Point2, value: str, height: float = 3.2, layer: str = "ANNOT") -> None:
+        self._entity("TEXT", layer)
+        self.point(10, insert[0], insert[1], 0.0)
+        self.number(40, height)
+        self.group(1, value)
+
+    def polyline(self, points: Iterable[Point2], layer: str = "0", closed: bool = False) -> None:
+        self._entity("POLYLINE", layer)
+        self.stream.write(f"66\n1\n70\n{1 if closed else 0}\n10\n0\n20\n0\n30\n0\n")
+        p = self.precision
+        write = self.stream.write
+        for x, y in points:
+            write(f"0\nVERTEX\n8\n{layer}\n10\n{format_number(x, p)}\n20\n{format_number(y, p)}\n")
+        self._entity("SEQEND", layer)
+
+    def dimension(self, dim: LinearDimension, block: str, layer: str = "DIM") -> None:
+        d1, _, mid, _ = dim.resolve()
+        self._entity("DIMENSION", layer)
+        self.group(2, block)
+        self.point(10, d1[0], d1[1], 0.0)
+        self.point(11, mid[0], mid[1], 0.0)
+        self.group(70, 0)
+        self.group(1, dim.text)
+        self.group(3, "STANDARD")
+        self.point(13, dim.p1[0], dim.p1[1], 0.0)
+        self.point(14, dim.p2[0], dim.p2[1], 0.0)
+        self.number(50, dim.angle_deg)
+
+    @contextmanager
+    def entities(self) -> Iterator[None]:
+        with self.section("ENTITIES"):
+            yield
+
+    def close(self) -> None:
+        self.stream.write("0\nEOF\n")
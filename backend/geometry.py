@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .models import Dimensions
+
+Point2 = tuple[float, float]
+Point3 = tuple[float, float, float]
+
+MIN_VISIBLE_HEAD_MM = 8.0
+
+
+@dataclass(frozen=True)
+class Frustum:
+    r1: float
+    r2: float
+    h: float
+
+    @property
+    def volume_mm3(self) -> float:
+        return math.pi * self.h * (self.r1 * self.r1 + self.r1 * self.r2 + self.r2 * self.r2) / 3.0
+
+    @property
+    def lateral_area_mm2(self) -> float:
+        slant = math.sqrt((self.r1 - self.r2) ** 2 + self.h * self.h)
+        return math.pi * (self.r1 + self.r2) * slant
+
+
+@dataclass(frozen=True)
+class InsertGeometry:
+    outer_r: float
+    inner_r: float
+    height: float
+    y0: float
+    top_y: float
+
+
+@dataclass(frozen=True)
+class HandleGeometry:
+    anchor_x: float
+    points: tuple[Point3, ...]
+    radius: float
+
+
+@dataclass(frozen=True)
+class GasketGeometry:
+    major_r: float
+    minor_r: float
+    y: float
+
+
+@dataclass(frozen=True)
+class TeapotGeometry:
+    """Canonical parametric description of one teapot design.
+
+    Profiles are (radius, height) pairs measured from the base, with the
+    revolution axis at radius 0. ``outline`` is the visible silhouette used by
+    2D drawings; ``body_profile``/``head_profile`` are the separately formed
+    parts used by meshes.
+    """
+
+    wall_thickness: float
+    body_h: float
+    head_start: float
+    head_visible_h: float
+    overall_h: float
+
+    r_bottom: float
+    r_max: float
+    r_neck: float
+    r_head: float
+
+    outline: tuple[Point2, ...]
+    body_profile: tuple[Point2, ...]
+    head_profile: tuple[Point2, ...]
+
+    body_segments: tuple[Frustum, ...]
+    head_segments: tuple[Frustum, ...]
+    cavity_segments: tuple[Frustum, ...]
+
+    insert: InsertGeometry
+    handle: HandleGeometry
+    gasket: GasketGeometry
+
+    base_cap_r: float
+    base_cap_h: float
+
+    @property
+    def top_circles(self) -> tuple[float, ...]:
+        """Concentric radii seen from above, outermost first."""
+        return (self.r_head, self.r_neck, self.insert.outer_r, self.insert.inner_r)
+
+    @property
+    def max_radius(self) -> float:
+        return max(self.r_head, self.r_max)
+
+
+# The fields the geometry is built from. Derived and target values
+# (capacity, overall height, cups, tolerance) are left out, so a blueprint
+# whose capacity has just been recomputed still hits the same entry.
+GEOMETRY_FIELDS = (
+    "wall_thickness_mm",
+    "body_height_mm",
+    "body_max_diameter_mm",
+    "body_bottom_diameter_mm",
+    "neck_diameter_mm",
+    "head_height_mm",
+    "head_top_diameter_mm",
+    "head_neck_overlap_mm",
+    "handle_length_mm",
+    "handle_drop_mm",
+    "handle_offset_mm",
+    "handle_thickness_mm",
+    "insert_outer_diameter_mm",
+    "insert_inner_diameter_mm",
+    "insert_height_mm",
+    "gasket_cross_section_mm",
+    "base_cap_height_mm",
+    "base_cap_diameter_mm",
+)
+
+
+def dimensions_key(dim: Dimensions) -> tuple[float, ...]:
+    return tuple(float(getattr(dim, name)) for name in GEOMETRY_FIELDS)
+
+
+def _segments(profile: tuple[Point2, ...]) -> tuple[Frustum, ...]:
+    return tuple(
+        Frustum(r1, r2, y2 - y1)
+        for (r1, y1), (r2, y2) in zip(profile, profile[1:])
+    )
+
+
+def _vessel_outline(
+    r_bottom: float,
+    r_max: float,
+    r_neck: float,
+    r_head: float,
+    body_h: float,
+    head_visible_h: float,
+) -> tuple[Point2, ...]:
+    return (
+        (r_bottom, 0.0),
+        (r_max, body_h * 0.30),
+        (r_max * 0.98, body_h * 0.68),
+        (r_neck, body_h),
+        (r_neck * 1.18, body_h + head_visible_h * 0.45),
+        (r_head, body_h + head_visible_h),
+    )
+
+
+@lru_cache(maxsize=256)
+def _geometry_for_key(key: tuple[float, ...]) -> TeapotGeometry:
+    d = Dimensions.model_construct(**dict(zip(GEOMETRY_FIELDS, key)))
+
+    body_h = d.body_height_mm
+    head_visible_h = max(d.head_height_mm - d.head_neck_overlap_mm, MIN_VISIBLE_HEAD_MM)
+    overall_h = body_h + head_visible_h
+    head_start = body_h - d.head_neck_overlap_mm
+
+    r_bottom = d.body_bottom_diameter_mm * 0.5
+    r_max = d.body_max_diameter_mm * 0.5
+    r_neck = d.neck_diameter_mm * 0.5
+    r_head = d.head_top_diameter_mm * 0.5
+
+    outline = _vessel_outline(r_bottom, r_max, r_neck, r_head, body_h, head_visible_h)
+    body_profile = outline[:4]
+    head_profile = ((r_neck, head_start),) + outline[4:]
+
+    # Capacity is measured against the inner wall, so the shape factors are
+    # applied to the thickness-reduced radii rather than offset afterwards.
+    t = d.wall_thickness_mm
+    cavity = _vessel_outline(
+        max(r_bottom - t, 1.0),
+        max(r_max - t, 1.0),
+        max(r_neck - t, 1.0),
+        max(r_head - t, 1.0),
+        body_h,
+        head_visible_h,
+    )
+
+    insert_h = d.insert_height_mm
+    insert = InsertGeometry(
+        outer_r=d.insert_outer_diameter_mm * 0.5,
+        inner_r=d.insert_inner_diameter_mm * 0.5,
+        height=insert_h,
+        y0=overall_h - insert_h,
+        top_y=overall_h,
+    )
+
+    anchor_x = r_head + d.handle_offset_mm
+    handle = HandleGeometry(
+        anchor_x=anchor_x,
+        points=(
+            (anchor_x, overall_h * 0.84, 0.0),
+            (anchor_x + d.handle_length_mm * 0.45, overall_h * 0.72, 0.0),
+            (anchor_x + d.handle_length_mm * 0.38, overall_h * 0.46, 0.0),
+            (anchor_x + d.handle_length_mm * 0.12, overall_h * 0.34 - d.handle_drop_mm * 0.08, 0.0),
+        ),
+        radius=max(d.handle_thickness_mm * 0.5, 1.5),
+    )
+
+    gasket = GasketGeometry(
+        major_r=r_neck,
+        minor_r=max(d.gasket_cross_section_mm * 0.5, 0.5),
+        y=body_h,
+    )
+
+    return TeapotGeometry(
+        wall_thickness=d.wall_thickness_mm,
+        body_h=body_h,
+        head_start=head_start,
+        head_visible_h=head_visible_h,
+        overall_h=overall_h,
+        r_bottom=r_bottom,
+        r_max=r_max,
+        r_neck=r_neck,
+        r_head=r_head,
+        outline=outline,
+        body_profile=body_profile,
+        head_profile=head_profile,
+        body_segments=_segments(outline[:4]),
+        head_segments=_segments(outline[3:]),
+        cavity_segments=_segments(cavity),
+        insert=insert,
+        handle=handle,
+        gasket=gasket,
+        base_cap_r=d.base_cap_diameter_mm * 0.5,
+        base_cap_h=d.base_cap_height_mm,
+    )
+
+
+def teapot_geometry(dim: Dimensions) -> TeapotGeometry:
+    return _geometry_for_key(dimensions_key(dim))
+
+
+# Exposed for cache hit/miss metrics.
+GEOMETRY_CACHE = _geometry_for_key
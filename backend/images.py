@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+# Image discovery and file naming. Kept free of numpy and Pillow so the app
+# can import it at start-up; the heavy modules re-export these names.
+
+SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+
+
+def list_image_paths(root_dir: Path) -> list[Path]:
+    return sorted(
+        [
+            path
+            for path in root_dir.iterdir()
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+        ]
+    )
+
+
+def image_set_key(image_paths: list[Path]) -> tuple[tuple[str, int, int], ...]:
+    """Identity of an image set: path, mtime and size of every file."""
+    key = []
+    for path in image_paths:
+        try:
+            st = path.stat()
+        except OSError:
+            key.append((str(path), -1, -1))
+            continue
+        key.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(key)
+
+
+# format name -> (Pillow format, media type, file suffix)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png", ".png"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+}
+LATEST_PROTOTYPE_STEM = "prototype_v1_latest"
+LATEST_PROTOTYPE_NAME = f"{LATEST_PROTOTYPE_STEM}.png"
+LATEST_PROTOTYPE_NAMES = tuple(f"{LATEST_PROTOTYPE_STEM}{suffix}" for _, _, suffix in IMAGE_FORMATS.values())
+MAX_THUMBNAIL_EDGE = 2048
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from typing import Any
+
+# Module name -> seconds its deferred import took, in load order.
+LOADED: dict[str, float] = {}
+_LOCK = threading.Lock()
+_MODULES: list[LazyModule] = []
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Keeps numpy, Pillow and python-pptx out of process start-up; each
+    subsystem pays for its dependencies the first time it is used.
+    """
+
+    def __init__(self, name: str, package: str | None = None) -> None:
+        self._name = importlib.util.resolve_name(name, package) if name.startswith(".") else name
+        self._module: Any = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    with _LOCK:
+                        LOADED[module.__name__] = round(time.perf_counter() - start, 4)
+                    self._module = module
+                module = self._module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        # Other code may have imported the module directly in the meantime.
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str, package: str | None = None) -> Any:
+    module = LazyModule(name, package)
+    with _LOCK:
+        _MODULES.append(module)
+    return module
+
+
+def import_report() -> dict[str, Any]:
+    """Deferred modules loaded so far (with their import time) and those still pending."""
+    with _LOCK:
+        loaded = dict(LOADED)
+        pending = sorted({m._name for m in _MODULES if not m.loaded})
+    return {"loaded": loaded, "pending": pending}
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from .blueprint import estimate_capacity_ml, generate_bom, merge_materials
+from .models import Blueprint, BOMItem, Dimensions
+from .pools import PoolSaturated
+
+# Dimension fields the server owns; edits to them are ignored.
+DERIVED_DIMENSIONS = ("overall_height_mm", "estimated_capacity_ml")
+# Unapplied non-mergeable messages a client may queue before it is disconnected.
+MAX_PENDING_MESSAGES = 32
+
+# Called with each new design state and the id of the one it replaced.
+LinksFn = Callable[[Blueprint, str | None], dict[str, str]]
+LoadFn = Callable[[str], Blueprint | None]
+# Recomputes the derived values; the app runs it on its compute pool.
+DeriveFn = Callable[[Blueprint, Dimensions], Blueprint]
+
+
+class LiveEditError(ValueError):
+    pass
+
+
+def derive_blueprint(blueprint: Blueprint, dimensions: Dimensions) -> Blueprint:
+    dimensions.overall_height_mm = round(
+        dimensions.body_height_mm + dimensions.head_height_mm - dimensions.head_neck_overlap_mm,
+        2,
+    )
+    dimensions.estimated_capacity_ml = estimate_capacity_ml(dimensions)
+    # Shallow update: every snapshot gets fresh dimensions and BOM, and
+    # unchanged sub-objects are shared but never mutated afterwards.
+    return blueprint.model_copy(
+        update={"dimensions": dimensions, "bom": generate_bom(dimensions, blueprint.materials)}
+    )
+
+
+class LiveSession:
+    """Design state for one live-edit connection.
+
+    Edits are applied to the held blueprint field by field, so only the
+    changed dimensions are validated and nothing is deep-copied.
+    """
+
+    def __init__(self, blueprint: Blueprint, derive: DeriveFn = derive_blueprint) -> None:
+        self.design_id: str | None = None
+        self._derive = derive
+        materials = merge_materials(blueprint.materials)
+        self.blueprint = derive(
+            blueprint.model_copy(update={"materials": materials}),
+            blueprint.dimensions.model_copy(),
+        )
+
+    def apply(self, dimensions: dict[str, Any], materials: dict[str, str]) -> dict[str, Any]:
+        """Apply field edits and return only the derived values that changed."""
+        unknown = set(dimensions) - set(Dimensions.model_fields)
+        if unknown:
+            raise LiveEditError(f"Unknown dimension fields: {', '.join(sorted(unknown))}")
+        current = self.blueprint
+
+        values = current.dimensions.model_dump()
+        values.update({k: v for k, v in dimensions.items() if k not in DERIVED_DIMENSIONS})
+        try:
+            next_dimensions = Dimensions.model_validate(values)
+        except ValidationError as exc:
+            raise LiveEditError(str(exc)) from exc
+
+        next_blueprint = current
+        if materials:
+            by_key = {item.part_key: item for item in current.materials}
+            missing = set(materials) - set(by_key)
+            if missing:
+                raise LiveEditError(f"Unknown material parts: {', '.join(sorted(missing))}")
+            if not all(isinstance(value, str) and value.strip() for value in materials.values()):
+                raise LiveEditError("Material selections must be non-empty strings")
+            next_blueprint = current.model_copy(
+                update={
+                    "materials": [
+                        item.model_copy(update={"selected": materials[item.part_key].strip()})
+                        if item.part_key in materials
+                        else item
+                        for item in current.materials
+                    ]
+                }
+            )
+
+        self.blueprint = self._derive(next_blueprint, next_dimensions)
+        return self._changes(current, self.blueprint)
+
+    @staticmethod
+    def _changes(before: Blueprint, after: Blueprint) -> dict[str, Any]:
+        changes: dict[str, Any] = {}
+        dims = {
+            name: getattr(after.dimensions, name)
+            for name in DERIVED_DIMENSIONS
+            if getattr(after.dimensions, name) != getattr(before.dimensions, name)
+        }
+        if dims:
+            changes["dimensions"] = dims
+        previous: dict[str, BOMItem] = {item.part_key: item for item in before.bom}
+        bom = [item.model_dump() for item in after.bom if previous.get(item.part_key) != item]
+        if bom:
+            changes["bom"] = bom
+        return changes
+
+
+class PendingEdits:
+    """Messages received but not yet applied.
+
+    Consecutive ``set`` messages merge into one, so a slider burst that
+    arrives while an update is in flight is applied as a single edit.
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[dict[str, Any]] = []
+        self.ready = asyncio.Event()
+
+    def add(self, message: dict[str, Any]) -> None:
+        dimensions = message.get("dimensions") or {}
+        materials = message.get("materials") or {}
+        mergeable = message.get("type") == "set" and isinstance(dimensions, dict) and isinstance(materials, dict)
+        last = self.messages[-1] if self.messages else None
+        if mergeable and last is not None and "merged" in last:
+            last["dimensions"].update(dimensions)
+            last["materials"].update(materials)
+            last["seq"] = message.get("seq", last["seq"])
+            last["merged"] += 1
+        else:
+            if len(self.messages) >= MAX_PENDING_MESSAGES:
+                raise LiveEditError("Too many pending messages")
+            if mergeable:
+                message = {
+                    "type": "set",
+                    "seq": message.get("seq"),
+                    "dimensions": dict(dimensions),
+                    "materials": dict(materials),
+                    "merged": 1,
+                }
+            self.messages.append(message)
+        self.ready.set()
+
+    def take(self) -> list[dict[str, Any]]:
+        messages, self.messages = self.messages, []
+        self.ready.clear()
+        return messages
+
+
+def _initial_blueprint(message: dict[str, Any], load: LoadFn) -> Blueprint:
+    if message.get("design_id"):
+        blueprint = load(str(message["design_id"]))
+        if blueprint is None:
+            raise LiveEditError("Unknown design id")
+        return blueprint
+    try:
+        return Blueprint.model_validate(message.get("blueprint"))
+    except ValidationError as exc:
+        raise LiveEditError(str(exc)) from exc
+
+
+def _handle(
+    session: LiveSession | None,
+    message: dict[str, Any],
+    links: LinksFn,
+    load: LoadFn,
+    derive: DeriveFn,
+) -> tuple[LiveSession | None, dict[str, Any]]:
+    kind = message.get("type")
+    reply: dict[str, Any] = {"type": kind, "seq": message.get("seq")}
+    if kind == "init":
+        session = LiveSession(_initial_blueprint(message, load), derive)
+        reply.update(type="ready", blueprint=session.blueprint.model_dump())
+    elif session is None:
+        raise LiveEditError("Send an init message first")
+    elif kind == "snapshot":
+        reply["blueprint"] = session.blueprint.model_dump()
+    elif kind == "set":
+        if "merged" not in message:
+            raise LiveEditError("set expects dimensions and materials objects")
+        changes = session.apply(message["dimensions"], message["materials"])
+        reply.update(type="delta", merged=message["merged"], changes=changes)
+    else:
+        raise LiveEditError(f"Unknown message type: {kind!r}")
+    design_links = links(session.blueprint, session.design_id)
+    session.design_id = design_links.get("design_id")
+    reply.update(design_links)
+    return session, reply
+
+
+async def serve_live_edits(
+    websocket: WebSocket,
+    links: LinksFn,
+    load: LoadFn,
+    derive: DeriveFn = derive_blueprint,
+) -> None:
+    """Run the live-edit protocol until the client disconnects.
+
+    Client messages: ``init`` (full blueprint or a stored ``design_id``), ``set`` (``dimensions`` and
+    ``materials`` field maps) and ``snapshot``. Replies echo the latest
+    ``seq`` and carry ``ready``/``snapshot`` blueprints or a ``delta`` of
+    derived values; failures reply ``error`` and leave the state unchanged.
+    Only receiving and merging run on the event loop; each update is
+    validated, recomputed and stored on a worker thread.
+    """
+    await websocket.accept()
+    pending = PendingEdits()
+
+    async def receive() -> None:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                message = None
+            pending.add(message if isinstance(message, dict) else {"type": None})
+
+    receiver = asyncio.create_task(receive())
+    session: LiveSession | None = None
+    try:
+        while True:
+            waiter = asyncio.create_task(pending.ready.wait())
+            await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if receiver.done():
+                break
+            for message in pending.take():
+                try:
+                    session, reply = await run_in_threadpool(_handle, session, message, links, load, derive)
+                except (LiveEditError, PoolSaturated) as exc:
+                    reply = {"type": "error", "seq": message.get("seq"), "message": str(exc)}
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        try:
+            await receiver
+        except LiveEditError as exc:
+            await websocket.close(code=1008, reason=str(exc))
+        except (asyncio.CancelledError, WebSocketDisconnect):
+            pass
@@ -1,33 +1,346 @@
 from __future__ import annotations
 
+import os
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
 from urllib.parse import quote
 
-from fastapi import Body, FastAPI, HTTPException, Query
+from fastapi import Body, FastAPI, Header, HTTPException, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, Response
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 
-from .analysis import SUPPORTED_EXTENSIONS, analyze_images, list_image_paths
+from .assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, Asset, AssetPipeline
 from .blueprint import build_blueprint, refresh_blueprint
+from .bundle import iter_zip_bundle
+from .cache import (
+    CachedExport,
+    ExportCache,
+    LRUCache,
+    etag_matches,
+    export_key,
+    strong_etag,
+)
+from .compression import (
+    MIN_RESPONSE_BYTES,
+    CompressionMiddleware,
+    available_codecs,
+    compressible,
+    encode,
+    negotiate,
+    weak_etag,
+)
+from .designs import DesignRecord, DesignStore
 from .exporters import (
     export_dxf_bytes,
     export_json_bytes,
     export_obj_bytes,
     export_pptx_bytes,
+    export_svg_bytes,
+)
+from .geometry import GEOMETRY_CACHE, teapot_geometry
+from .images import (
+    LATEST_PROTOTYPE_NAMES,
+    MAX_THUMBNAIL_EDGE,
+    SUPPORTED_EXTENSIONS,
+    image_set_key,
+    list_image_paths,
 )
-from .models import Blueprint, ExportRequest
-from .prototype import render_prototype_v1
+from .lazy import import_report, lazy_import
+from .live import derive_blueprint, serve_live_edits
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    Family,
+    RequestMetricsMiddleware,
+    cache_families,
+)
+from .mesh import build_viewer_parts, encode_mesh_parts
+from .models import Blueprint, ExportRequest, ImageAnalysisResult
+from .pools import PoolSaturated, WorkloadPool
+from .profiling import Profiler, ProfilingMiddleware
+from .singleflight import SingleFlight
+from .store import ContentStore, RetentionPolicy
+from .warmup import Warmup
+
+if TYPE_CHECKING:
+    from .thumbnails import ThumbnailCache
+
+# numpy, Pillow and python-pptx load on first use of the subsystem that needs them.
+analysis = lazy_import(".analysis", __package__)
+deck = lazy_import(".deck", __package__)
+prototype = lazy_import(".prototype", __package__)
+thumbnails = lazy_import(".thumbnails", __package__)
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = ROOT_DIR / "frontend"
-EXPORT_DIR = ROOT_DIR / "exports"
+EXPORT_DIR = Path(os.environ.get("TEAPOT_EXPORT_DIR", ROOT_DIR / "exports"))
+CACHE_DIR = Path(os.environ.get("TEAPOT_CACHE_DIR", ROOT_DIR / ".cache"))
 
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title="Curved Head Teapot Blueprint Tool", version="1.0.0")
+EXPORT_CACHE = ExportCache(disk_dir=CACHE_DIR / "exports")
+EXPORT_STORE = ContentStore(
+    EXPORT_DIR,
+    policy=RetentionPolicy.from_env(),
+    pinned=LATEST_PROTOTYPE_NAMES,
+)
+DESIGNS = DesignStore.from_env(CACHE_DIR)
+PROFILER = Profiler.from_env(CACHE_DIR)
+EXPORT_GC_INTERVAL_S = float(os.environ.get("TEAPOT_EXPORT_GC_INTERVAL_S", "600"))
+DESIGN_FLUSH_INTERVAL_S = float(os.environ.get("TEAPOT_DESIGN_FLUSH_MS", "500")) / 1000.0
+DESIGN_GC_INTERVAL_S = float(os.environ.get("TEAPOT_DESIGN_GC_INTERVAL_S", "3600"))
+WARMUP_ENABLED = os.environ.get("TEAPOT_WARMUP", "1").strip().lower() not in {"0", "false", "no", "off"}
+WARM_PPTX = os.environ.get("TEAPOT_WARM_PPTX", "0").strip().lower() in {"1", "true", "yes", "on"}
+WARM_CUPS = tuple(float(c) for c in os.environ.get("TEAPOT_WARM_CUPS", "2,4,6,8").split(",") if c.strip())
+WARMUP = Warmup()
+THUMBNAIL_DIR = CACHE_DIR / "thumbs"
+ASSETS = AssetPipeline(FRONTEND_DIR, CACHE_DIR / "assets")
+
+# Workload classes. Analysis and prototype renders go to the compute pool
+# (processes when there is more than one core), exports and derived artifacts
+# to the export threads, and light blueprint math runs inline on the event
+# loop. Each class admits a bounded number of requests and answers 503 with
+# Retry-After beyond that, so a render burst cannot starve interactive calls.
+COMPUTE_POOL = WorkloadPool.from_env(
+    "compute",
+    default_workers=min(2, os.cpu_count() or 1),
+    default_queue=8,
+    default_kind="auto",
+)
+EXPORT_POOL = WorkloadPool.from_env(
+    "export",
+    default_workers=int(os.environ.get("TEAPOT_BUNDLE_WORKERS", "4")),
+    default_queue=16,
+)
+
+
+ExportFn = Callable[[Blueprint, dict[str, Any]], bytes]
+
+
+def _thumbnails() -> ThumbnailCache:
+    return thumbnails.shared_thumbnail_cache(THUMBNAIL_DIR)
+
+
+def _export_pptx(blueprint: Blueprint, options: dict[str, Any]) -> bytes:
+    prototype_png = None
+    if options.get("include_prototype"):
+        # Admitted and rendered on the compute pool like /api/prototype/v1, as bytes only:
+        # the deck is the artifact, so no prototype file is saved beside it.
+        prototype_png = COMPUTE_POOL.call(
+            prototype.render_prototype_job,
+            blueprint,
+            list_image_paths(ROOT_DIR),
+            THUMBNAIL_DIR,
+            prototype.DEFAULT_ENCODING,
+            prototype.FULL_TIER.name,
+        )
+    return export_pptx_bytes(
+        blueprint,
+        prototype_png=prototype_png,
+        include_drawing=bool(options.get("include_drawing", True)),
+    )
+
+
+EXPORT_FORMATS: dict[str, tuple[ExportFn, str, str]] = {
+    "json": (lambda blueprint, _options: export_json_bytes(blueprint), "json", "application/json"),
+    "dxf": (lambda blueprint, _options: export_dxf_bytes(blueprint), "dxf", "application/dxf"),
+    "obj": (lambda blueprint, _options: export_obj_bytes(blueprint), "obj", "text/plain"),
+    "svg": (lambda blueprint, _options: export_svg_bytes(blueprint), "svg", "image/svg+xml"),
+    "pptx": (
+        _export_pptx,
+        "pptx",
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ),
+}
+
+HASH_ADDRESSED_CACHE_CONTROL = "public, max-age=86400"
+# Identical concurrent analyze/default requests share one computation.
+SINGLE_FLIGHT: SingleFlight[Any] = SingleFlight()
+# Keyed by image set (and cups); results are shared and must not be mutated.
+ANALYSIS_CACHE: LRUCache[tuple, ImageAnalysisResult] = LRUCache(maxsize=8)
+DEFAULT_PAYLOADS: LRUCache[tuple, dict] = LRUCache(maxsize=32)
+
+
+def _analyze(image_paths: list[Path]) -> ImageAnalysisResult:
+    key = ("analyze", image_set_key(image_paths))
+    result = ANALYSIS_CACHE.get(key)
+    if result is None:
+        # Admitted before joining the flight, so waiting followers count against the queue too.
+        with COMPUTE_POOL.admit():
+            result = SINGLE_FLIGHT.do(
+                key,
+                lambda: COMPUTE_POOL.submit(analysis.analyze_images, image_paths).result(),
+                cache=ANALYSIS_CACHE,
+            )
+    return result
+
+
+def _default_payload(cups: float, image_paths: list[Path]) -> dict:
+    key = ("default", cups, image_set_key(image_paths))
+    cached = DEFAULT_PAYLOADS.get(key)
+    # The lookup also refreshes the design's TTL so the cached links stay valid.
+    if cached is not None:
+        if DESIGNS.get(cached["design_id"]) is not None:
+            return cached
+        DEFAULT_PAYLOADS.pop(key)
+
+    def build() -> dict:
+        image_analysis = _analyze(image_paths)
+        blueprint = build_blueprint(
+            cups=cups,
+            material_suggestions=image_analysis.material_suggestions,
+            analysis_notes=image_analysis.notes,
+        )
+        design_hash = _remember(blueprint)
+        return {
+            "blueprint": blueprint.model_dump(),
+            "analysis": image_analysis.model_dump(),
+            **_design_links(design_hash),
+        }
+
+    with COMPUTE_POOL.admit():
+        return SINGLE_FLIGHT.do(key, build, cache=DEFAULT_PAYLOADS)
+
+
+def _remember(blueprint: Blueprint, parent_id: str | None = None) -> str:
+    return DESIGNS.save(blueprint, parent_id=parent_id).design_id
+
+
+def _load_design(design_id: str) -> DesignRecord:
+    record = DESIGNS.get(design_id)
+    if record is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Unknown design id. Recompute or save the design first.",
+        )
+    return record
+
+
+def _resolve_design(payload: ExportRequest) -> tuple[Blueprint, str]:
+    """Refreshed blueprint and its id, from a stored ``design_id`` or an inline blueprint."""
+    if payload.design_id:
+        return _load_design(payload.design_id).blueprint, payload.design_id
+    blueprint = refresh_blueprint(payload.blueprint)
+    return blueprint, _remember(blueprint)
+
+
+def _design_links(design_hash: str) -> dict[str, str]:
+    return {
+        "design_id": design_hash,
+        "blueprint_hash": design_hash,
+        "drawing_url": f"/api/drawing/{design_hash}.svg",
+        "mesh_url": f"/api/mesh/{design_hash}.bin",
+    }
+
+
+BUNDLE_OPTION_KEYS = {"formats", "include_prototype"}
+
+
+def _warm_up() -> None:
+    image_paths = list_image_paths(ROOT_DIR)
 
+    def default_blueprints() -> None:
+        for cups in WARM_CUPS:
+            _default_payload(cups, image_paths)
+
+    def prototype_layers() -> None:
+        # With a process pool this primes one worker; the others warm on first use.
+        blueprint = _load_design(_default_payload(4.0, image_paths)["design_id"]).blueprint
+        COMPUTE_POOL.submit(prototype.warm_prototype_job, blueprint, image_paths, THUMBNAIL_DIR).result()
+
+    def default_mesh() -> None:
+        design_hash = _default_payload(4.0, image_paths)["design_id"]
+        key = export_key(design_hash, "mesh")
+        if EXPORT_CACHE.get(key) is None:
+            _build_mesh(_load_design(design_hash).blueprint, design_hash, key)
+
+    WARMUP.run(
+        [
+            ("static_assets", ASSETS.build),
+            ("analysis", lambda: _analyze(image_paths)),
+            ("default_blueprints", default_blueprints),
+            ("prototype_layers", prototype_layers),
+            ("default_mesh", default_mesh),
+        ]
+        + ([("deck_template", deck.warm_template)] if WARM_PPTX else [])
+    )
+
+
+def _collect_metrics() -> list[Family]:
+    caches: dict[str, Any] = {
+        "export": EXPORT_CACHE.memory,
+        "analysis": ANALYSIS_CACHE,
+        "default_payload": DEFAULT_PAYLOADS,
+        "design": DESIGNS.memory,
+        "geometry": GEOMETRY_CACHE,
+    }
+    disk_hits = {"export": EXPORT_CACHE.disk_hits, "design": DESIGNS.disk_hits}
+    # Report on the imaging caches only once they exist; a scrape must not import Pillow.
+    if thumbnails.loaded:
+        cache = _thumbnails()
+        caches["thumbnail_tiles"] = cache.memory
+        caches["thumbnail_png"] = cache.encoded
+        disk_hits["thumbnail"] = cache.disk_hits
+    if prototype.loaded:
+        caches.update(prototype.LAYER_CACHES)
+    if deck.loaded:
+        caches["deck_template"] = deck.deck_template
+
+    pools = {pool.name: pool.stats() for pool in (COMPUTE_POOL, EXPORT_POOL)}
+    return cache_families(caches, disk_hits) + [
+        (
+            "teapot_pool_admitted",
+            "gauge",
+            "Requests admitted to a pool and not yet finished.",
+            [({"pool": name}, stats["admitted"]) for name, stats in pools.items()],
+        ),
+        (
+            "teapot_pool_capacity",
+            "gauge",
+            "Workers plus queue slots; admissions beyond this are rejected.",
+            [({"pool": name}, stats["max_workers"] + stats["max_queue"]) for name, stats in pools.items()],
+        ),
+        (
+            "teapot_single_flight_total",
+            "counter",
+            "Coalesced computations by role.",
+            [({"role": "leader"}, SINGLE_FLIGHT.leaders), ({"role": "shared"}, SINGLE_FLIGHT.shared)],
+        ),
+        ("teapot_ready", "gauge", "1 once the startup warm-up has finished.", [({}, float(WARMUP.ready))]),
+    ]
+
+
+REGISTRY.add_collector(_collect_metrics)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    EXPORT_STORE.start_gc(EXPORT_GC_INTERVAL_S)
+    DESIGNS.start_maintenance(DESIGN_FLUSH_INTERVAL_S, DESIGN_GC_INTERVAL_S)
+    if WARMUP_ENABLED:
+        # Runs in the background; /api/health/ready reports 503 until it finishes.
+        EXPORT_POOL.submit(_warm_up)
+    else:
+        WARMUP.mark_ready()
+    try:
+        yield
+    finally:
+        EXPORT_STORE.stop_gc()
+        EXPORT_STORE.flush()
+        EXPORT_POOL.shutdown(wait=False, cancel_futures=True)
+        COMPUTE_POOL.shutdown(wait=False, cancel_futures=True)
+        DESIGNS.close()
+
+
+app = FastAPI(title="Curved Head Teapot Blueprint Tool", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware, profiler=PROFILER)
+app.add_middleware(RequestMetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -36,21 +349,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-if FRONTEND_DIR.exists():
-    app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIR)), name="assets")
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(_request: Request, exc: PoolSaturated) -> JSONResponse:
+    return JSONResponse(
+        {"detail": str(exc), "pool": exc.pool},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _asset_response(
+    asset: Asset,
+    cache_control: str,
+    accept_encoding: str | None,
+    if_none_match: str | None,
+) -> Response:
+    coding = negotiate(accept_encoding, tuple(asset.variants))
+    etag = asset.etag(coding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=asset.variants[coding], media_type=asset.media_type, headers=headers)
 
 
 @app.get("/", response_class=HTMLResponse)
-def index() -> FileResponse:
-    file_path = FRONTEND_DIR / "index.html"
-    if not file_path.exists():
+def index(
+    accept_encoding: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    page = ASSETS.page()
+    if page is None:
         raise HTTPException(status_code=404, detail="Frontend not found")
-    return FileResponse(file_path)
+    return _asset_response(page, REVALIDATE_CACHE_CONTROL, accept_encoding, if_none_match)
+
+
+@app.get("/assets/{asset_path:path}")
+def static_asset(
+    asset_path: str,
+    accept_encoding: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    found = ASSETS.lookup(asset_path)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    asset, hashed = found
+    # Hashed URLs never change content; plain ones keep working for old pages and external links.
+    cache_control = IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL
+    return _asset_response(asset, cache_control, accept_encoding, if_none_match)
 
 
 @app.get("/api/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> dict[str, Any]:
+    """Liveness: the process is serving requests, warm or not."""
+    return {"status": "ok", "ready": WARMUP.ready}
+
+
+@app.get("/api/health/ready")
+async def health_ready() -> JSONResponse:
+    """Readiness: 503 until the startup warm-up has primed the caches."""
+    status = WARMUP.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/api/metrics")
+async def api_metrics() -> Response:
+    """Prometheus text exposition: stage and request histograms, cache and pool counters."""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _require_profile_token(supplied: str | None) -> None:
+    if PROFILER.token is None:
+        raise HTTPException(status_code=404, detail="Profiling reports are not enabled.")
+    if not PROFILER.authorized(supplied):
+        raise HTTPException(status_code=403, detail="Missing or invalid profile token.")
+
+
+@app.get("/api/profiles")
+def api_profiles(
+    x_profile_token: str | None = Header(default=None),
+    token: str | None = Query(default=None),
+) -> dict[str, Any]:
+    """Stored profiling reports, newest first. Needs ``TEAPOT_PROFILE_TOKEN``."""
+    _require_profile_token(x_profile_token or token)
+    return {"profiles": PROFILER.reports()}
+
+
+@app.get("/api/profiles/{profile_id}")
+def api_profile_download(
+    profile_id: str,
+    x_profile_token: str | None = Header(default=None),
+    token: str | None = Query(default=None),
+) -> FileResponse:
+    """Collapsed stacks (``frame;frame;leaf count`` per line) for flamegraph.pl or speedscope."""
+    _require_profile_token(x_profile_token or token)
+    path = PROFILER.report_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
+
+
+@app.get("/api/debug/imports")
+def debug_imports() -> dict[str, Any]:
+    """Deferred subsystem imports: which have loaded, how long each took, which are still pending."""
+    return import_report()
+
+
+@app.get("/api/debug/pools")
+async def debug_pools() -> dict[str, Any]:
+    """Per workload class: limits, current load, rejections and queue-wait timings."""
+    return {
+        "compute": COMPUTE_POOL.stats(),
+        "export": EXPORT_POOL.stats(),
+        "single_flight_in_flight": SINGLE_FLIGHT.in_flight(),
+    }
 
 
 @app.get("/api/images")
@@ -68,110 +482,396 @@ def api_images() -> dict[str, list[dict[str, str]]]:
 
 
 @app.get("/api/image/{filename}")
-def api_image(filename: str) -> FileResponse:
+def api_image(
+    filename: str,
+    w: int | None = Query(default=None, ge=1, le=MAX_THUMBNAIL_EDGE),
+    h: int | None = Query(default=None, ge=1, le=MAX_THUMBNAIL_EDGE),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
     safe_name = Path(filename).name
     path = ROOT_DIR / safe_name
     if not path.exists() or path.suffix.lower() not in SUPPORTED_EXTENSIONS:
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(path)
+    if w is None and h is None:
+        return FileResponse(path)
+
+    # Both edges crop to fill; a single edge scales proportionally.
+    crop = w is not None and h is not None
+    size = (w or MAX_THUMBNAIL_EDGE, h or MAX_THUMBNAIL_EDGE)
+    etag = strong_etag(thumbnails.ThumbnailKey.for_file(path, size, crop).digest)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    # Resizing and PNG encoding are CPU work; keep them off the request thread.
+    key, data = COMPUTE_POOL.call(thumbnails.thumbnail_png_job, THUMBNAIL_DIR, path, size, crop)
+    headers["ETag"] = strong_etag(key.digest)
+    return Response(content=data, media_type="image/png", headers=headers)
 
 
 @app.post("/api/analyze")
 def api_analyze() -> dict:
     image_paths = list_image_paths(ROOT_DIR)
-    analysis = analyze_images(image_paths)
-    return analysis.model_dump()
+    return _analyze(image_paths).model_dump()
 
 
 @app.get("/api/blueprint/default")
 def api_blueprint_default(
     cups: float = Query(default=4.0, ge=1.0, le=12.0),
 ) -> dict:
-    image_paths = list_image_paths(ROOT_DIR)
-    analysis = analyze_images(image_paths)
-    blueprint = build_blueprint(
-        cups=cups,
-        material_suggestions=analysis.material_suggestions,
-        analysis_notes=analysis.notes,
+    return _default_payload(cups, list_image_paths(ROOT_DIR))
+
+
+@app.post("/api/blueprint/recompute")
+async def api_blueprint_recompute(
+    blueprint: Blueprint,
+    parent_id: str | None = Query(default=None, max_length=64),
+) -> dict:
+    updated = refresh_blueprint(blueprint)
+    design_hash = _remember(updated, parent_id)
+    return {
+        "blueprint": updated.model_dump(),
+        **_design_links(design_hash),
+    }
+
+
+@app.websocket("/api/ws/blueprint")
+async def ws_blueprint(websocket: WebSocket) -> None:
+    def load(design_id: str) -> Blueprint | None:
+        record = DESIGNS.get(design_id)
+        return record.blueprint if record is not None else None
+
+    await serve_live_edits(
+        websocket,
+        links=lambda blueprint, parent_id: _design_links(_remember(blueprint, parent_id)),
+        load=load,
+        derive=lambda blueprint, dimensions: COMPUTE_POOL.call(derive_blueprint, blueprint, dimensions),
     )
+
+
+def _design_payload(record: DesignRecord) -> dict:
     return {
-        "blueprint": blueprint.model_dump(),
-        "analysis": analysis.model_dump(),
+        "blueprint": record.blueprint.model_dump(),
+        "parent_id": record.parent_id,
+        "created_at": datetime.fromtimestamp(record.created_at).isoformat(timespec="seconds"),
+        **_design_links(record.design_id),
     }
 
 
-@app.post("/api/blueprint/recompute")
-def api_blueprint_recompute(blueprint: Blueprint) -> dict:
-    updated = refresh_blueprint(blueprint)
-    return {"blueprint": updated.model_dump()}
+@app.post("/api/designs")
+def api_design_save(
+    blueprint: Blueprint,
+    parent_id: str | None = Query(default=None, max_length=64),
+) -> dict:
+    return _design_payload(DESIGNS.save(refresh_blueprint(blueprint), parent_id=parent_id))
+
+
+@app.get("/api/designs/{design_id}")
+def api_design_get(design_id: str) -> dict:
+    return _design_payload(_load_design(design_id))
+
+
+@app.get("/api/designs/{design_id}/history")
+def api_design_history(design_id: str, limit: int = Query(default=20, ge=1, le=200)) -> dict:
+    _load_design(design_id)
+    return {
+        "versions": [
+            {
+                "design_id": record.design_id,
+                "parent_id": record.parent_id,
+                "created_at": datetime.fromtimestamp(record.created_at).isoformat(timespec="seconds"),
+            }
+            for record in DESIGNS.history(design_id, limit=limit)
+        ]
+    }
 
 
 @app.post("/api/prototype/v1")
-def api_prototype_v1(payload: dict | None = Body(default=None)) -> Response:
+def api_prototype_v1(
+    payload: dict | None = Body(default=None),
+    tier: str = Query(default="full", pattern="^(full|preview)$"),
+    image_format: str | None = Query(default=None, alias="format", pattern="^(png|webp|jpe?g)$"),
+    quality: int | None = Query(default=None, ge=1, le=100),
+    compress_level: int | None = Query(default=None, ge=0, le=9),
+) -> Response:
+    render_tier = prototype.RENDER_TIERS[tier]
+    encoding = render_tier.encoding
+    if image_format is not None or quality is not None or compress_level is not None:
+        encoding = prototype.ImageEncoding.parse(
+            image_format or encoding.format,
+            quality=quality,
+            compress_level=compress_level,
+        )
     blueprint_payload = payload.get("blueprint") if payload else None
+    design_id = payload.get("design_id") if payload else None
 
-    if blueprint_payload is None:
-        image_paths = list_image_paths(ROOT_DIR)
-        analysis = analyze_images(image_paths)
-        blueprint = build_blueprint(
-            cups=4.0,
-            material_suggestions=analysis.material_suggestions,
-            analysis_notes=analysis.notes,
-        )
+    image_paths = list_image_paths(ROOT_DIR)
+    if blueprint_payload is None and not design_id:
+        design_id = _default_payload(4.0, image_paths)["design_id"]
+
+    if design_id:
+        blueprint = _load_design(str(design_id)).blueprint
     else:
         blueprint = refresh_blueprint(Blueprint.model_validate(blueprint_payload))
-        image_paths = list_image_paths(ROOT_DIR)
 
-    data, saved_path = render_prototype_v1(
-        blueprint=blueprint,
-        image_paths=image_paths,
-        save_dir=EXPORT_DIR,
+    data = COMPUTE_POOL.call(prototype.render_prototype_job, blueprint, image_paths, THUMBNAIL_DIR, encoding, tier)
+    saved_path = prototype.save_prototype(EXPORT_STORE, data, encoding) if render_tier.persist else None
+
+    if saved_path is None:
+        headers = {
+            "Content-Disposition": f'inline; filename="prototype_v1_{tier}{encoding.suffix}"',
+            "Cache-Control": "no-store",
+        }
+    else:
+        headers = {
+            "Content-Disposition": f'inline; filename="{saved_path.name}"',
+            "X-Prototype-Path": str(saved_path),
+        }
+    headers["X-Render-Tier"] = tier
+    return Response(content=data, media_type=encoding.media_type, headers=headers)
+
+
+def _export_spec(file_format: str) -> tuple[ExportFn, str, str]:
+    spec = EXPORT_FORMATS.get(file_format)
+    if spec is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format. Use {', '.join(EXPORT_FORMATS)}.",
+        )
+    return spec
+
+
+def _build_export(
+    blueprint: Blueprint,
+    key: str,
+    file_format: str,
+    options: dict[str, Any],
+) -> CachedExport:
+    entry = EXPORT_CACHE.get(key)
+    if entry is not None:
+        return entry
+
+    exporter, suffix, media = _export_spec(file_format)
+    data = exporter(blueprint, options)
+
+    # The key prefix keeps two designs exported in the same second from sharing a name.
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    file_name = f"teapot_blueprint_{timestamp}_{key[:12]}.{suffix}"
+    stored = EXPORT_STORE.put(data, file_name)
+
+    return EXPORT_CACHE.put(
+        CachedExport(
+            key=key,
+            data=data,
+            media_type=media,
+            file_name=file_name,
+            export_path=str(stored.path),
+        )
     )
 
+
+def _ensure_stored(entry: CachedExport) -> CachedExport:
+    """Re-link a cached export whose file the store's GC has removed since it was cached."""
+    if not entry.export_path or Path(entry.export_path).exists():
+        return entry
+    stored = EXPORT_STORE.put(entry.data, entry.file_name)
+    return EXPORT_CACHE.put(replace(entry, export_path=str(stored.path)))
+
+
+@app.post("/api/export/bundle")
+def api_export_bundle(payload: ExportRequest) -> StreamingResponse:
+    options = payload.options
+    formats = [str(fmt).lower().strip() for fmt in options.get("formats") or EXPORT_FORMATS]
+    for file_format in formats:
+        _export_spec(file_format)
+    include_prototype = bool(options.get("include_prototype", True))
+    format_options = {k: v for k, v in options.items() if k not in BUNDLE_OPTION_KEYS}
+
+    blueprint, design_hash = _resolve_design(payload)
+
+    def export_job(file_format: str):
+        def run() -> tuple[str, bytes]:
+            key = export_key(design_hash, file_format, format_options)
+            entry = _build_export(blueprint, key, file_format, format_options)
+            return entry.file_name, entry.data
+
+        return run
+
+    def prototype_job() -> tuple[str, bytes]:
+        # The render goes to the compute pool like /api/prototype/v1; this export thread only waits and stores.
+        encoding = prototype.FULL_TIER.encoding
+        data = COMPUTE_POOL.submit(
+            prototype.render_prototype_job,
+            blueprint,
+            list_image_paths(ROOT_DIR),
+            THUMBNAIL_DIR,
+            encoding,
+            prototype.FULL_TIER.name,
+        ).result()
+        return prototype.save_prototype(EXPORT_STORE, data, encoding).name, data
+
+    jobs = {file_format: export_job(file_format) for file_format in dict.fromkeys(formats)}
+    if include_prototype:
+        jobs["prototype"] = prototype_job
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     headers = {
-        "Content-Disposition": f'inline; filename="{saved_path.name}"',
-        "X-Prototype-Path": str(saved_path),
+        "Content-Disposition": f'attachment; filename="teapot_bundle_{timestamp}.zip"',
+        "X-Blueprint-Hash": design_hash,
     }
-    return Response(content=data, media_type="image/png", headers=headers)
+    # Admissions are held until the archive has been streamed (or dropped).
+    releases = [EXPORT_POOL.reserve()]
+    if include_prototype:
+        try:
+            releases.append(COMPUTE_POOL.reserve())
+        except PoolSaturated:
+            releases[0]()
+            raise
+
+    def release() -> None:
+        for release_one in releases:
+            release_one()
+
+    def stream():
+        try:
+            yield from iter_zip_bundle(
+                jobs,
+                EXPORT_POOL,
+                manifest={
+                    "title": blueprint.title,
+                    "design_version": blueprint.design_version,
+                    "blueprint_hash": design_hash,
+                },
+            )
+        finally:
+            release()
+
+    body = stream()
+    weakref.finalize(body, release)
+    return StreamingResponse(body, media_type="application/zip", headers=headers)
 
 
 @app.post("/api/export/{file_format}")
-def api_export(file_format: str, payload: ExportRequest) -> Response:
-    blueprint = refresh_blueprint(payload.blueprint)
-
+def api_export(
+    file_format: str,
+    payload: ExportRequest,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+) -> Response:
     file_format = file_format.lower().strip()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_name = f"teapot_blueprint_{timestamp}"
-
-    if file_format == "json":
-        data = export_json_bytes(blueprint)
-        suffix = "json"
-        media = "application/json"
-    elif file_format == "dxf":
-        data = export_dxf_bytes(blueprint)
-        suffix = "dxf"
-        media = "application/dxf"
-    elif file_format == "obj":
-        data = export_obj_bytes(blueprint)
-        suffix = "obj"
-        media = "text/plain"
-    elif file_format == "pptx":
-        data = export_pptx_bytes(blueprint)
-        suffix = "pptx"
-        media = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail="Unsupported format. Use json, dxf, obj, or pptx.",
-        )
+    _export_spec(file_format)
 
-    file_name = f"{base_name}.{suffix}"
-    saved_path = EXPORT_DIR / file_name
-    saved_path.write_bytes(data)
+    blueprint, design_hash = _resolve_design(payload)
+    key = export_key(design_hash, file_format, payload.options)
+    entry = EXPORT_CACHE.get(key)
+    if entry is None:
+        entry = EXPORT_POOL.call(_build_export, blueprint, key, file_format, payload.options)
+    entry = _ensure_stored(entry)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{entry.file_name}"',
+        "X-Export-Path": entry.export_path,
+        "ETag": entry.etag,
+        "X-Blueprint-Hash": design_hash,
+    }
+    return _export_response(entry, headers, accept_encoding, if_none_match)
+
+
+def _build_encoded_export(entry: CachedExport, key: str, coding: str) -> CachedExport:
+    encoded = EXPORT_CACHE.get(key)
+    if encoded is None:
+        encoded = EXPORT_CACHE.put(replace(entry, key=key, data=encode(entry.data, coding)))
+    return encoded
+
+
+def _export_response(
+    entry: CachedExport,
+    headers: dict[str, str],
+    accept_encoding: str | None,
+    if_none_match: str | None = None,
+) -> Response:
+    """Send a cached export, compressed if the client accepts it, or 304 if the client has it.
+
+    The coding is negotiated first so a 304 carries the same ETag and Vary
+    as the 200 would. Compressed variants are cached beside the export, so a
+    repeat download costs no compression; the middleware leaves them alone.
+    """
+    coding = "identity"
+    if compressible(entry.media_type) and len(entry.data) >= MIN_RESPONSE_BYTES:
+        headers = {**headers, "Vary": "Accept-Encoding"}
+        coding = negotiate(accept_encoding, tuple(available_codecs()))
+        if coding != "identity":
+            headers["ETag"] = weak_etag(headers["ETag"])
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        key = f"{entry.key}.{coding}"
+        entry = EXPORT_CACHE.get(key) or EXPORT_POOL.call(_build_encoded_export, entry, key, coding)
+        headers["Content-Encoding"] = coding
+    return Response(content=entry.data, media_type=entry.media_type, headers=headers)
+
+
+def _hash_addressed_response(
+    design_hash: str,
+    kind: str,
+    if_none_match: str | None,
+    build: Callable[[Blueprint, str], CachedExport],
+    accept_encoding: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> Response:
+    """Serve an artifact derived from a remembered blueprint, by hash, with HTTP caching."""
+    key = export_key(design_hash, kind, options)
+    entry = EXPORT_CACHE.get(key)
+    if entry is None:
+        entry = EXPORT_POOL.call(build, _load_design(design_hash).blueprint, key)
 
     headers = {
-        "Content-Disposition": f'attachment; filename="{file_name}"',
-        "X-Export-Path": str(saved_path),
+        "ETag": entry.etag,
+        "Cache-Control": HASH_ADDRESSED_CACHE_CONTROL,
+        "Content-Disposition": f'inline; filename="{entry.file_name}"',
     }
+    return _export_response(entry, headers, accept_encoding, if_none_match)
+
+
+@app.get("/api/drawing/{design_hash}.svg")
+def api_drawing(
+    design_hash: str,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+) -> Response:
+    return _hash_addressed_response(
+        design_hash,
+        "svg",
+        if_none_match,
+        lambda blueprint, key: _build_export(blueprint, key, "svg", {}),
+        accept_encoding,
+    )
+
+
+def _build_mesh(blueprint: Blueprint, design_hash: str, key: str, curvature_pct: int = 100) -> CachedExport:
+    parts = build_viewer_parts(teapot_geometry(blueprint.dimensions), head_curvature=curvature_pct / 100.0)
+    data = encode_mesh_parts(parts, {"blueprint_hash": design_hash})
+    return EXPORT_CACHE.put(
+        CachedExport(
+            key=key,
+            data=data,
+            media_type="application/octet-stream",
+            file_name=f"teapot_mesh_{design_hash[:12]}.bin",
+        )
+    )
 
-    return Response(content=data, media_type=media, headers=headers)
+
+@app.get("/api/mesh/{design_hash}.bin")
+def api_mesh(
+    design_hash: str,
+    curvature: int = Query(default=100, ge=40, le=170),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    # The default head keeps the plain key, so the warmed mesh is the one served.
+    return _hash_addressed_response(
+        design_hash,
+        "mesh",
+        if_none_match,
+        lambda blueprint, key: _build_mesh(blueprint, design_hash, key, curvature),
+        options={"curvature": curvature} if curvature != 100 else None,
+    )
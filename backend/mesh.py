@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+from dataclasses import dataclass, field
+from typing import Any
+
+from .geometry import Point2, Point3, TeapotGeometry
+from .lazy import lazy_import
+from .metrics import timed
+
+# Only the array helpers need numpy; OBJ export never touches it.
+np = lazy_import("numpy")
+
+MESH_MAGIC = b"TPM1"
+MESH_FORMAT_VERSION = 1
+# Interleaved float32 position (3) + normal (3) per vertex.
+MESH_VERTEX_STRIDE = 24
+# Sample counts of the local lathes in frontend/app.js ``buildTeapotGroup``.
+VIEWER_BODY_SAMPLES = 52
+VIEWER_HEAD_SAMPLES = 34
+VIEWER_LATHE_SEGMENTS = 96
+
+
+@dataclass
+class MeshBuilder:
+    """Triangle mesh with OBJ-style 1-based face indices."""
+
+    vertices: list[tuple[float, float, float]] = field(default_factory=list)
+    faces: list[tuple[int, int, int]] = field(default_factory=list)
+
+    def add_vertex(self, x: float, y: float, z: float) -> int:
+        self.vertices.append((x, y, z))
+        return len(self.vertices)
+
+    def add_face(self, a: int, b: int, c: int) -> None:
+        self.faces.append((a, b, c))
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Vertices as float64 ``(N, 3)`` and zero-based faces as int64 ``(M, 3)``."""
+        vertices = np.asarray(self.vertices, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(self.faces, dtype=np.int64).reshape(-1, 3) - 1
+        return vertices, faces
+
+    def vertex_normals(self) -> np.ndarray:
+        """Area-weighted smooth normals, ``(N, 3)``; degenerate faces contribute nothing."""
+        vertices, faces = self.to_arrays()
+        tris = vertices[faces]
+        face_normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        normals = np.zeros_like(vertices)
+        for corner in range(3):
+            np.add.at(normals, faces[:, corner], face_normals)
+        lengths = np.linalg.norm(normals, axis=1)
+        return normals / np.maximum(lengths, 1e-12)[:, None]
+
+    def add_lathe(
+        self,
+        profile: list[tuple[float, float]],
+        segments: int = 56,
+        close_bottom: bool = False,
+        close_top: bool = False,
+    ) -> None:
+        if len(profile) < 2:
+            return
+
+        rings: list[list[int]] = []
+        for r, y in profile:
+            ring: list[int] = []
+            for i in range(segments):
+                theta = (2.0 * math.pi * i) / segments
+                x = r * math.cos(theta)
+                z = r * math.sin(theta)
+                ring.append(self.add_vertex(x, y, z))
+            rings.append(ring)
+
+        for j in range(len(rings) - 1):
+            cur = rings[j]
+            nxt = rings[j + 1]
+            for i in range(segments):
+                i2 = (i + 1) % segments
+                a = cur[i]
+                b = nxt[i]
+                c = nxt[i2]
+                d = cur[i2]
+                self.add_face(a, b, c)
+                self.add_face(a, c, d)
+
+        if close_bottom:
+            center = self.add_vertex(0.0, profile[0][1], 0.0)
+            bottom_ring = rings[0]
+            for i in range(segments):
+                i2 = (i + 1) % segments
+                self.add_face(center, bottom_ring[i2], bottom_ring[i])
+
+        if close_top:
+            center = self.add_vertex(0.0, profile[-1][1], 0.0)
+            top_ring = rings[-1]
+            for i in range(segments):
+                i2 = (i + 1) % segments
+                self.add_face(center, top_ring[i], top_ring[i2])
+
+    def add_cylinder(
+        self,
+        radius: float,
+        height: float,
+        y0: float,
+        segments: int = 40,
+        close_bottom: bool = False,
+        close_top: bool = False,
+    ) -> None:
+        self.add_lathe(
+            [(radius, y0), (radius, y0 + height)],
+            segments=segments,
+            close_bottom=close_bottom,
+            close_top=close_top,
+        )
+
+    def add_torus(
+        self,
+        major_r: float,
+        minor_r: float,
+        y: float,
+        segments: int = 90,
+        tube_segments: int = 16,
+    ) -> None:
+        profile = [
+            (
+                major_r + minor_r * math.cos(2.0 * math.pi * i / tube_segments),
+                y + minor_r * math.sin(2.0 * math.pi * i / tube_segments),
+            )
+            for i in range(tube_segments + 1)
+        ]
+        self.add_lathe(profile, segments=segments)
+
+    def add_tube_path(
+        self,
+        points: list[tuple[float, float, float]],
+        radius: float,
+        radial_segments: int = 14,
+    ) -> None:
+        if len(points) < 2:
+            return
+
+        rings: list[list[int]] = []
+        for idx, point in enumerate(points):
+            x, y, z = point
+            if idx == 0:
+                tx = points[idx + 1][0] - x
+                ty = points[idx + 1][1] - y
+                tz = points[idx + 1][2] - z
+            elif idx == len(points) - 1:
+                tx = x - points[idx - 1][0]
+                ty = y - points[idx - 1][1]
+                tz = z - points[idx - 1][2]
+            else:
+                tx = points[idx + 1][0] - points[idx - 1][0]
+                ty = points[idx + 1][1] - points[idx - 1][1]
+                tz = points[idx + 1][2] - points[idx - 1][2]
+
+            t_len = math.sqrt(tx * tx + ty * ty + tz * tz) or 1.0
+            tx, ty, tz = tx / t_len, ty / t_len, tz / t_len
+
+            # Build an orthonormal frame around the tangent.
+            ux, uy, uz = (0.0, 0.0, 1.0)
+            if abs(tz) > 0.92:
+                ux, uy, uz = (0.0, 1.0, 0.0)
+
+            nx = ty * uz - tz * uy
+            ny = tz * ux - tx * uz
+            nz = tx * uy - ty * ux
+            n_len = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0
+            nx, ny, nz = nx / n_len, ny / n_len, nz / n_len
+
+            bx = ty * nz - tz * ny
+            by = tz * nx - tx * nz
+            bz = tx * ny - ty * nx
+
+            ring: list[int] = []
+            for i in range(radial_segments):
+                theta = (2.0 * math.pi * i) / radial_segments
+                rx = radius * (math.cos(theta) * nx + math.sin(theta) * bx)
+                ry = radius * (math.cos(theta) * ny + math.sin(theta) * by)
+                rz = radius * (math.cos(theta) * nz + math.sin(theta) * bz)
+                ring.append(self.add_vertex(x + rx, y + ry, z + rz))
+            rings.append(ring)
+
+        for j in range(len(rings) - 1):
+            cur = rings[j]
+            nxt = rings[j + 1]
+            for i in range(radial_segments):
+                i2 = (i + 1) % radial_segments
+                a = cur[i]
+                b = nxt[i]
+                c = nxt[i2]
+                d = cur[i2]
+                self.add_face(a, b, c)
+                self.add_face(a, c, d)
+
+
+def build_teapot_mesh(geo: TeapotGeometry) -> MeshBuilder:
+    mesh = MeshBuilder()
+
+    mesh.add_lathe(list(geo.body_profile), segments=64, close_bottom=True, close_top=False)
+    mesh.add_lathe(list(geo.head_profile), segments=64, close_bottom=False, close_top=False)
+
+    # Insert/filter collar
+    insert = geo.insert
+    mesh.add_cylinder(insert.outer_r, insert.height, insert.y0, segments=44, close_bottom=False, close_top=False)
+    mesh.add_cylinder(insert.inner_r, insert.height, insert.y0, segments=44, close_bottom=False, close_top=False)
+
+    # Simple annular top face for insert
+    ring_profile = [
+        (insert.inner_r, insert.top_y),
+        (insert.outer_r, insert.top_y),
+    ]
+    mesh.add_lathe(ring_profile, segments=44, close_bottom=False, close_top=False)
+
+    # Handle as tube path
+    mesh.add_tube_path(list(geo.handle.points), radius=geo.handle.radius, radial_segments=14)
+    return mesh
+
+
+def _creased(profile: list[Point2]) -> list[Point2]:
+    """Repeat interior profile points so smooth normals keep a hard edge there."""
+    out = [profile[0]]
+    for point in profile[1:-1]:
+        out.extend((point, point))
+    out.append(profile[-1])
+    return out
+
+
+def _catmull_rom(points: tuple[Point3, ...], samples: int) -> list[Point3]:
+    """Uniform Catmull-Rom through ``points`` with clamped end tangents."""
+    if len(points) < 3:
+        return list(points)
+    pts = [points[0], *points, points[-1]]
+    spans = len(points) - 1
+    out: list[Point3] = []
+    for k in range(samples + 1):
+        u = k / samples * spans
+        i = min(int(u), spans - 1)
+        t = u - i
+        p0, p1, p2, p3 = pts[i], pts[i + 1], pts[i + 2], pts[i + 3]
+        t2 = t * t
+        t3 = t2 * t
+        out.append(
+            tuple(
+                0.5
+                * (
+                    2.0 * p1[c]
+                    + (p2[c] - p0[c]) * t
+                    + (2.0 * p0[c] - 5.0 * p1[c] + 4.0 * p2[c] - p3[c]) * t2
+                    + (3.0 * p1[c] - p0[c] - 3.0 * p2[c] + p3[c]) * t3
+                )
+                for c in range(3)
+            )
+        )
+    return out
+
+
+def _smoothstep01(t: float) -> float:
+    x = min(max(t, 0.0), 1.0)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def viewer_body_profile(geo: TeapotGeometry, samples: int = VIEWER_BODY_SAMPLES) -> list[Point2]:
+    """The viewer's smooth body curve; mirrors ``buildBodyProfilePoints`` in frontend/app.js."""
+    body_h, r_bottom, r_max, r_neck = geo.body_h, geo.r_bottom, geo.r_max, geo.r_neck
+    bulge_y = body_h * 0.42
+    points: list[Point2] = []
+    for i in range(samples + 1):
+        y = body_h * i / samples
+        if y <= bulge_y:
+            t = _smoothstep01(y / max(bulge_y, 1.0))
+            soft_bulge = math.sin(math.pi * t) * (r_max - r_bottom) * 0.06
+            r = r_bottom + (r_max - r_bottom) * t + soft_bulge
+        else:
+            t = _smoothstep01((y - bulge_y) / max(body_h - bulge_y, 1.0))
+            shoulder = math.sin(math.pi * t) * (r_max - r_neck) * 0.05
+            r = r_max + (r_neck - r_max) * t + shoulder * (1.0 - t * 0.5)
+        points.append((max(r, 4.0), y))
+    return points
+
+
+def viewer_head_profile(
+    geo: TeapotGeometry,
+    samples: int = VIEWER_HEAD_SAMPLES,
+    curvature_scale: float = 1.0,
+) -> list[Point2]:
+    """The viewer's curved-flare head; mirrors ``buildHeadProfilePoints`` in frontend/app.js."""
+    curvature_scale = min(max(curvature_scale, 0.4), 1.7)
+    start = min(max(geo.head_start, 0.0), geo.overall_h - 1.0)
+    span = max(geo.overall_h - start, 1.0)
+    r_neck, r_head = geo.r_neck, geo.r_head
+    points: list[Point2] = []
+    for i in range(samples + 1):
+        t = _smoothstep01(i / samples)
+        curved_t = min(max(t ** (1.0 / curvature_scale), 0.0), 1.0)
+        flare = math.sin(math.pi * curved_t) * (r_head - r_neck) * (0.1 * curvature_scale)
+        r = r_neck + (r_head - r_neck) * curved_t + flare * (1.0 - curved_t * 0.35)
+        points.append((max(r, 4.0), start + span * t))
+    return points
+
+
+@timed("mesh.build")
+def build_viewer_parts(geo: TeapotGeometry, head_curvature: float = 1.0) -> dict[str, MeshBuilder]:
+    """Named parts for the 3D viewer, in world coordinates, matching the three.js object names.
+
+    ``head_curvature`` is the viewer's head-curvature slider as a scale (1.0 is 100%).
+    """
+    names = ("body_shell", "curved_head", "insert_filter", "gasket", "base_cap", "handle")
+    parts = {name: MeshBuilder() for name in names}
+
+    # The same curves as the 2D drawings, so the views agree on the silhouette.
+    parts["body_shell"].add_lathe(viewer_body_profile(geo), segments=VIEWER_LATHE_SEGMENTS, close_bottom=True)
+    parts["curved_head"].add_lathe(
+        viewer_head_profile(geo, curvature_scale=head_curvature), segments=VIEWER_LATHE_SEGMENTS
+    )
+
+    insert = geo.insert
+    parts["insert_filter"].add_lathe(
+        _creased(
+            [
+                (insert.outer_r, insert.top_y),
+                (insert.outer_r, insert.y0),
+                (insert.inner_r, insert.y0),
+                (insert.inner_r, insert.top_y),
+            ]
+        ),
+        segments=64,
+    )
+
+    gasket = geo.gasket
+    parts["gasket"].add_torus(gasket.major_r, max(gasket.minor_r, 1.0), gasket.y + 1.0)
+
+    cap_r, cap_h = geo.base_cap_r, geo.base_cap_h
+    parts["base_cap"].add_lathe(_creased([(0.0, 0.0), (cap_r, 0.0), (cap_r, cap_h), (0.0, cap_h)]), segments=60)
+
+    handle_r = max(geo.handle.radius, 2.0)
+    parts["handle"].add_tube_path(_catmull_rom(geo.handle.points, 48), radius=handle_r, radial_segments=16)
+    return parts
+
+
+def _align(size: int, alignment: int = 4) -> int:
+    return (size + alignment - 1) // alignment * alignment
+
+
+@timed("mesh.encode")
+def encode_mesh_parts(parts: dict[str, MeshBuilder], metadata: dict[str, Any] | None = None) -> bytes:
+    """Pack parts as ``TPM1`` + uint32 header length + JSON directory + aligned buffers.
+
+    Each part stores interleaved little-endian float32 position/normal data
+    followed by a uint32 index buffer; every offset is 4-byte aligned so the
+    client can wrap the payload in typed-array views without copying.
+    """
+    blobs: list[tuple[bytes, bytes]] = []
+    directory: list[dict[str, Any]] = []
+    for name, mesh in parts.items():
+        vertices, faces = mesh.to_arrays()
+        interleaved = np.hstack([vertices, mesh.vertex_normals()]).astype("<f4")
+        indices = faces.astype("<u4")
+        blobs.append((interleaved.tobytes(), indices.tobytes()))
+        directory.append(
+            {
+                "name": name,
+                "vertex_count": len(vertices),
+                "index_count": int(indices.size),
+                "bounds": [vertices.min(axis=0).round(3).tolist(), vertices.max(axis=0).round(3).tolist()],
+            }
+        )
+
+    def header_bytes(entries: list[dict[str, Any]]) -> bytes:
+        body = {
+            "version": MESH_FORMAT_VERSION,
+            "stride": MESH_VERTEX_STRIDE,
+            "index_type": "uint32",
+            **(metadata or {}),
+            "parts": entries,
+        }
+        raw = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        return raw + b" " * (_align(len(raw)) - len(raw))
+
+    # Offsets depend on the header length, which depends on the offsets; size
+    # the header with over-long placeholders, then pad the real one to match.
+    for entry in directory:
+        entry["vertex_offset"] = entry["index_offset"] = 10**12
+    header_size = len(header_bytes(directory))
+    offset = 8 + header_size
+    for entry, (vertex_blob, index_blob) in zip(directory, blobs):
+        entry["vertex_offset"] = offset
+        offset += _align(len(vertex_blob))
+        entry["index_offset"] = offset
+        offset += _align(len(index_blob))
+
+    header = header_bytes(directory)
+    header += b" " * (header_size - len(header))
+
+    out = bytearray(MESH_MAGIC)
+    out += struct.pack("<I", len(header))
+    out += header
+    for vertex_blob, index_blob in blobs:
+        out += vertex_blob + b"\0" * (_align(len(vertex_blob)) - len(vertex_blob))
+        out += index_blob + b"\0" * (_align(len(index_blob)) - len(index_blob))
+    return bytes(out)
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import functools
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Iterable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENABLED = os.environ.get("TEAPOT_METRICS", "1").strip().lower() not in {"0", "false", "no", "off"}
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers sub-millisecond blueprint math up to multi-second PPTX builds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A collected family: (name, type, help, [(labels, value), ...]).
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+Collector = Callable[[], Iterable[Family]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def drain(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict[tuple[str, ...], float]) -> None:
+        with self._lock:
+            for labels, amount in values.items():
+                self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_labels(dict(zip(self.label_names, labels)))} {_number(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observing is a bisect and two additions under a lock."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def drain(self) -> dict[tuple[str, ...], tuple[list[int], float]]:
+        with self._lock:
+            series, self._series = self._series, {}
+        return {labels: (counts, total[0]) for labels, (counts, total) in series.items()}
+
+    def merge(self, series: dict[tuple[str, ...], tuple[list[int], float]]) -> None:
+        with self._lock:
+            for labels, (counts, total) in series.items():
+                mine = self._series.get(labels)
+                if mine is None:
+                    mine = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+                for index, count in enumerate(counts):
+                    mine[0][index] += count
+                mine[1][0] += total
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total[0]) for labels, (counts, total) in self._series.items())
+        lines = []
+        for labels, counts, total in snapshot:
+            base = dict(zip(self.label_names, labels))
+            running = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                running += count
+                lines.append(f"{self.name}_bucket{_labels({**base, 'le': _number(bound)})} {running}")
+            lines.append(f"{self.name}_sum{_labels(base)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(base)} {running}")
+        return lines
+
+
+class Registry:
+    """Metrics recorded as they happen plus collectors sampled at scrape time.
+
+    Collectors read counters the caches and pools already keep, so nothing
+    extra runs on the request path for them.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, label_names)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, label_names, buckets)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def drain(self) -> dict[str, Any]:
+        """Take and reset every recorded series, by metric name."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return {metric.name: series for metric in metrics if (series := metric.drain())}
+
+    def merge(self, drained: dict[str, Any]) -> None:
+        """Add series drained from another process's registry."""
+        with self._lock:
+            by_name = {metric.name: metric for metric in self._metrics}
+        for name, series in drained.items():
+            metric = by_name.get(name)
+            if metric is not None:
+                metric.merge(series)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines: list[str] = []
+        for metric in metrics:
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {kind}", *metric.render()]
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "teapot_stage_seconds",
+    "Wall time of instrumented pipeline stages.",
+    ("stage",),
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "teapot_http_request_seconds",
+    "HTTP request latency, including streamed bodies.",
+    ("route", "method", "status"),
+)
+
+
+def stage(name: str) -> ContextManager[None]:
+    """Time a block as pipeline stage ``name``."""
+    return STAGE_SECONDS.time(name) if ENABLED else nullcontext()
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`stage`; a no-op when metrics are disabled."""
+
+    def decorate(fn: F) -> F:
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, name)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def cache_counts(cache: Any) -> tuple[int, int, int]:
+    """Hits, misses and size of an :class:`~backend.cache.LRUCache` or ``functools.lru_cache`` wrapper."""
+    if hasattr(cache, "cache_info"):
+        info = cache.cache_info()
+        return info.hits, info.misses, info.currsize
+    return cache.hits, cache.misses, len(cache)
+
+
+# Process-pool workers keep their own caches and registry. After each job a
+# worker drains what it recorded and the parent merges it, so /api/metrics
+# covers work done in any process.
+
+# Returns (caches, disk_hits) for one process, in the form cache_families takes.
+CacheSource = Callable[[], tuple[dict[str, Any], dict[str, int]]]
+
+
+@dataclass(frozen=True)
+class WorkerMetrics:
+    pid: int
+    series: dict[str, Any]
+    # Counts since the previous report: cache name -> (hits, misses), and disk-tier hits.
+    cache_deltas: dict[str, tuple[int, int]]
+    disk_hit_deltas: dict[str, int]
+    cache_sizes: dict[str, int]
+
+
+_cache_sources: list[CacheSource] = []
+_reported: dict[str, tuple[int, ...]] = {}
+_worker_lock = threading.Lock()
+# Parent side: summed worker counts, and the last size each worker reported.
+_worker_counts: dict[str, list[int]] = {}
+_worker_disk_hits: dict[str, int] = {}
+_worker_sizes: dict[tuple[int, str], int] = {}
+
+
+def track_worker_caches(source: CacheSource) -> None:
+    """Include a module's caches in the reports pool workers send back."""
+    _cache_sources.append(source)
+
+
+def worker_report() -> WorkerMetrics:
+    """Drain this worker's registry and its cache counts since the last report."""
+    counts: dict[str, list[int]] = {}
+    disk_hits: dict[str, int] = {}
+    for source in _cache_sources:
+        caches, disk = source()
+        for name, cache in caches.items():
+            row = counts.setdefault(name, [0, 0, 0])
+            for index, value in enumerate(cache_counts(cache)):
+                row[index] += value
+        for name, hits in disk.items():
+            disk_hits[name] = disk_hits.get(name, 0) + hits
+
+    def delta(key: str, now: tuple[int, ...]) -> tuple[int, ...]:
+        last = _reported.get(key, (0,) * len(now))
+        _reported[key] = now
+        return tuple(a - b for a, b in zip(now, last))
+
+    return WorkerMetrics(
+        pid=os.getpid(),
+        series=REGISTRY.drain(),
+        cache_deltas={name: delta(f"cache:{name}", (row[0], row[1])) for name, row in counts.items()},
+        disk_hit_deltas={name: delta(f"disk:{name}", (hits,))[0] for name, hits in disk_hits.items()},
+        cache_sizes={name: row[2] for name, row in counts.items()},
+    )
+
+
+def merge_worker_report(report: WorkerMetrics) -> None:
+    REGISTRY.merge(report.series)
+    with _worker_lock:
+        for name, (hits, misses) in report.cache_deltas.items():
+            row = _worker_counts.setdefault(name, [0, 0])
+            row[0] += hits
+            row[1] += misses
+        for name, hits in report.disk_hit_deltas.items():
+            _worker_disk_hits[name] = _worker_disk_hits.get(name, 0) + hits
+        for name, size in report.cache_sizes.items():
+            _worker_sizes[(report.pid, name)] = size
+
+
+def cache_families(caches: dict[str, Any], disk_hits: dict[str, int] | None = None) -> list[Family]:
+    """Hit/miss/size samples for named in-memory caches, including pool workers' copies.
+
+    Accepts :class:`~backend.cache.LRUCache` instances (``hits``/``misses``)
+    and ``functools.lru_cache`` wrappers (``cache_info()``). ``disk_hits``
+    adds the second-tier hits of the memory-plus-disk caches.
+    """
+    counts = {name: list(cache_counts(cache)) for name, cache in caches.items()}
+    disk = dict(disk_hits or {})
+    with _worker_lock:
+        for name, (hits, misses) in _worker_counts.items():
+            row = counts.setdefault(name, [0, 0, 0])
+            row[0] += hits
+            row[1] += misses
+        for (_, name), size in _worker_sizes.items():
+            counts.setdefault(name, [0, 0, 0])[2] += size
+        for name, hits in _worker_disk_hits.items():
+            disk[name] = disk.get(name, 0) + hits
+    requests: list[tuple[dict[str, str], float]] = []
+    entries: list[tuple[dict[str, str], float]] = []
+    for name, (hits, misses, size) in counts.items():
+        requests.append(({"cache": name, "result": "hit"}, hits))
+        requests.append(({"cache": name, "result": "miss"}, misses))
+        entries.append(({"cache": name}, size))
+    return [
+        ("teapot_cache_requests_total", "counter", "In-memory cache lookups by result.", requests),
+        ("teapot_cache_entries", "gauge", "Entries currently held in memory.", entries),
+        (
+            "teapot_cache_disk_hits_total",
+            "counter",
+            "Memory misses served from the disk tier.",
+            [({"cache": name}, hits) for name, hits in disk.items()],
+        ),
+    ]
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing HTTP requests by route template, method and status.
+
+    Unrouted paths (static files, 404s) share one ``route`` label so the
+    series count stays bounded.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_SECONDS.observe(
+                time.perf_counter() - start,
+                getattr(route, "path", "other"),
+                scope["method"],
+                str(status),
+            )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class Dimensions(BaseModel):
@@ -92,5 +92,12 @@ class ImageAnalysisResult(BaseModel):
 
 
 class ExportRequest(BaseModel):
-    blueprint: Blueprint
+    blueprint: Blueprint | None = None
+    design_id: str | None = None
     options: dict[str, Any] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _require_design(self) -> ExportRequest:
+        if self.blueprint is None and not self.design_id:
+            raise ValueError("Provide either blueprint or design_id.")
+        return self
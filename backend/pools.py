@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+from .metrics import REGISTRY, WorkerMetrics, merge_worker_report, worker_report
+
+T = TypeVar("T")
+
+POOL_KINDS = ("thread", "process")
+MAX_RETRY_AFTER_S = 60
+
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "teapot_pool_queue_wait_seconds",
+    "Time jobs spent queued before a worker picked them up.",
+    ("pool",),
+)
+JOB_SECONDS = REGISTRY.histogram(
+    "teapot_pool_job_seconds",
+    "Time jobs spent running on a worker.",
+    ("pool", "job"),
+)
+REJECTED = REGISTRY.counter(
+    "teapot_pool_rejected_total",
+    "Requests turned away with 503 because the pool was saturated.",
+    ("pool",),
+)
+
+
+# Set while a request is profiled: process pools run its jobs on threads, where
+# the in-process stack sampler can see them.
+_THREADS_ONLY: contextvars.ContextVar[bool] = contextvars.ContextVar("teapot_pool_threads_only", default=False)
+
+
+@contextmanager
+def threads_only() -> Iterator[None]:
+    token = _THREADS_ONLY.set(True)
+    try:
+        yield
+    finally:
+        _THREADS_ONLY.reset(token)
+
+
+class PoolSaturated(RuntimeError):
+    """A workload class is at its queue limit; the caller should retry later."""
+
+    def __init__(self, pool: str, retry_after: int) -> None:
+        super().__init__(f"The {pool} pool is busy. Retry in {retry_after} s.")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable[..., T], args: tuple, kwargs: dict) -> tuple[float, float, T]:
+    # Wall clock, so the start time is comparable across worker processes.
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+def _reporting_call(fn: Callable[..., T], args: tuple, kwargs: dict) -> tuple[float, float, T, WorkerMetrics]:
+    # Process workers send back the stage timings and cache counts recorded since
+    # their last report, which would otherwise stay in the worker's own registry.
+    # A failed job's share goes out with the worker's next successful one.
+    started, finished, result = _timed_call(fn, args, kwargs)
+    return started, finished, result, worker_report()
+
+
+def resolve_pool_kind(raw: str, cpu_count: int | None = None) -> str:
+    """``auto`` picks processes only when there is more than one core to spread over."""
+    kind = raw.strip().lower() or "auto"
+    if kind == "auto":
+        return "process" if (cpu_count or os.cpu_count() or 1) > 1 else "thread"
+    if kind not in POOL_KINDS:
+        raise ValueError(f"Unknown pool kind {raw!r}. Use auto, {', '.join(POOL_KINDS)}.")
+    return kind
+
+
+class WorkloadPool(Executor):
+    """Bounded executor for one workload class, with admission control.
+
+    ``admit()`` guards a request: at most ``max_workers + max_queue`` requests
+    of the class are admitted at once and the rest fail fast with
+    :class:`PoolSaturated`. ``submit()`` records how long each job queued and
+    ran. Process pools need picklable, module-level callables.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "thread") -> None:
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown pool kind {kind!r}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        if kind == "process":
+            # spawn: never fork a process that already runs writer and GC threads.
+            self._executor: Executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=name)
+        self._thread_executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._admitted = 0
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_wait_total_s = 0.0
+        self.queue_wait_max_s = 0.0
+        self.run_total_s = 0.0
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        default_workers: int,
+        default_queue: int,
+        default_kind: str = "thread",
+    ) -> WorkloadPool:
+        prefix = f"TEAPOT_{name.upper()}"
+        workers = int(os.environ.get(f"{prefix}_WORKERS", str(default_workers)))
+        queue = int(os.environ.get(f"{prefix}_QUEUE", str(default_queue)))
+        kind = resolve_pool_kind(os.environ.get(f"{prefix}_POOL", default_kind))
+        return cls(name, workers, queue, kind)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the mean run time and the backlog."""
+        with self._lock:
+            mean_run = self.run_total_s / self.completed if self.completed else 1.0
+            backlog = max(1, self._admitted - self.max_workers + 1)
+        return min(MAX_RETRY_AFTER_S, max(1, math.ceil(mean_run * backlog / self.max_workers)))
+
+    def _acquire(self) -> None:
+        with self._lock:
+            full = self._admitted >= self.capacity
+            if full:
+                self.rejected += 1
+            else:
+                self._admitted += 1
+        if full:
+            REJECTED.inc(self.name)
+            raise PoolSaturated(self.name, self.retry_after())
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        # Re-entrant per thread: a request that is already admitted is not counted twice.
+        depth = getattr(self._local, "depth", 0)
+        if not depth:
+            self._acquire()
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if not depth:
+                self._release()
+
+    def reserve(self) -> Callable[[], None]:
+        """Admit work that outlives the calling thread, such as a streamed response.
+
+        Returns an idempotent release callback.
+        """
+        self._acquire()
+        released = threading.Event()
+
+        def release() -> None:
+            with self._lock:
+                if released.is_set():
+                    return
+                released.set()
+                self._admitted -= 1
+
+        return release
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        submitted_at = time.time()
+        job_name = getattr(fn, "__name__", type(fn).__name__)
+        outer: Future[T] = Future()
+        with self._lock:
+            self.submitted += 1
+            self._pending += 1
+        if self.kind == "process" and not _THREADS_ONLY.get():
+            inner = self._executor.submit(_reporting_call, fn, args, kwargs)
+        else:
+            # The caller's context goes along, so jobs that submit jobs stay on threads too.
+            inner = self._threads().submit(contextvars.copy_context().run, _timed_call, fn, args, kwargs)
+
+        def finish(done: Future) -> None:
+            try:
+                started_at, finished_at, result, *report = done.result()
+            except BaseException as exc:
+                with self._lock:
+                    self._pending -= 1
+                    self.failed += 1
+                if not outer.cancelled():
+                    outer.set_exception(exc)
+                return
+            if report:
+                merge_worker_report(report[0])
+            wait = max(0.0, started_at - submitted_at)
+            run = max(0.0, finished_at - started_at)
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self.queue_wait_total_s += wait
+                self.queue_wait_max_s = max(self.queue_wait_max_s, wait)
+                self.run_total_s += run
+            QUEUE_WAIT_SECONDS.observe(wait, self.name)
+            JOB_SECONDS.observe(run, self.name, job_name)
+            if not outer.cancelled():
+                outer.set_result(result)
+
+        inner.add_done_callback(finish)
+        outer.add_done_callback(lambda f: inner.cancel() if f.cancelled() else None)
+        return outer
+
+    def _threads(self) -> Executor:
+        if self.kind == "thread":
+            return self._executor
+        with self._lock:
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"{self.name}-thread")
+            return self._thread_executor
+
+    def call(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Admit, run on the pool and block for the result."""
+        with self.admit():
+            return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            finished = self.completed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "pending_jobs": self._pending,
+                "submitted": self.submitted,
+                "completed": finished,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait_mean_ms": round(self.queue_wait_total_s / finished * 1000.0, 3) if finished else None,
+                "queue_wait_max_ms": round(self.queue_wait_max_s * 1000.0, 3),
+                "run_mean_ms": round(self.run_total_s / finished * 1000.0, 3) if finished else None,
+            }
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.concurrency import run_in_threadpool
+
+from .pools import threads_only
+
+BACKEND_DIR = str(Path(__file__).resolve().parent)
+PROFILE_HEADER = b"x-profile"
+# Endpoints that are never profiled: probes, scrapes and the report download itself.
+SKIP_PREFIXES = ("/api/health", "/api/metrics", "/api/profiles")
+MAX_STACK_DEPTH = 96
+# Leaf frames of threads that are parked rather than working (pool waits, GC sleeps).
+IDLE_LEAVES = frozenset({"threading:Condition.wait", "threading:Event.wait", "threading:Thread.join"})
+
+
+def _frame_label(code: Any) -> str:
+    return f"{Path(code.co_filename).stem}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval into collapsed-stack counts.
+
+    Work for one request spans the endpoint thread and the pool workers, so
+    the sampler looks at all threads and keeps the stacks that pass through
+    the backend package. Other requests running at the same time show up
+    too; the report is a picture of the process while the request ran.
+    """
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                labels: list[str] = []
+                in_backend = False
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    in_backend = in_backend or code.co_filename.startswith(BACKEND_DIR)
+                    labels.append(_frame_label(code))
+                    frame = frame.f_back
+                if in_backend and labels[0] not in IDLE_LEAVES:
+                    self.samples[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+@dataclass
+class ProfileReport:
+    profile_id: str
+    method: str
+    path: str
+    reason: str
+    status: int
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    created_at: str
+
+
+class Profiler:
+    """Opt-in request profiling with reports written to ``profile_dir``.
+
+    A request is profiled when it carries ``X-Profile: <token>`` (or
+    ``?profile=<token>``), or at random with probability ``sample_rate``.
+    Only one request is profiled at a time; others run normally.
+    """
+
+    def __init__(
+        self,
+        profile_dir: Path,
+        token: str | None = None,
+        sample_rate: float = 0.0,
+        interval_s: float = 0.005,
+        max_reports: int = 100,
+    ) -> None:
+        self.profile_dir = profile_dir
+        self.token = token or None
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.interval_s = interval_s
+        self.max_reports = max_reports
+        self._busy = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, cache_dir: Path) -> Profiler:
+        return cls(
+            Path(os.environ.get("TEAPOT_PROFILE_DIR", cache_dir / "profiles")),
+            token=os.environ.get("TEAPOT_PROFILE_TOKEN", "").strip() or None,
+            sample_rate=float(os.environ.get("TEAPOT_PROFILE_SAMPLE_RATE", "0")),
+            interval_s=float(os.environ.get("TEAPOT_PROFILE_INTERVAL_MS", "5")) / 1000.0,
+            max_reports=int(os.environ.get("TEAPOT_PROFILE_MAX_REPORTS", "100")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.sample_rate > 0.0
+
+    def authorized(self, supplied: str | None) -> bool:
+        return self.token is not None and supplied is not None and hmac.compare_digest(supplied, self.token)
+
+    def _reason(self, scope: dict) -> str | None:
+        path = scope["path"]
+        if not path.startswith("/api/") or path.startswith(SKIP_PREFIXES):
+            return None
+        if self.token is not None:
+            supplied = dict(scope["headers"]).get(PROFILE_HEADER)
+            if supplied is None:
+                supplied = (parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile") or [None])[0]
+            elif isinstance(supplied, bytes):
+                supplied = supplied.decode("latin-1")
+            if self.authorized(supplied):
+                return "requested"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def begin(self, scope: dict) -> str | None:
+        """Why this request should be profiled, or ``None``; a reason must be paired with :meth:`finish`."""
+        reason = self._reason(scope)
+        if reason is None or not self._busy.acquire(blocking=False):
+            return None
+        return reason
+
+    def finish(self, report: ProfileReport, samples: Counter[str]) -> None:
+        self._busy.release()
+        self._save(report, samples)
+
+    def _report_paths(self, profile_id: str) -> tuple[Path, Path]:
+        return self.profile_dir / f"{profile_id}.collapsed", self.profile_dir / f"{profile_id}.json"
+
+    def _save(self, report: ProfileReport, samples: Counter[str]) -> None:
+        stacks_path, meta_path = self._report_paths(report.profile_id)
+        with self._write_lock:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            stacks_path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in samples.most_common()),
+                encoding="utf-8",
+            )
+            meta_path.write_text(json.dumps(report.__dict__), encoding="utf-8")
+            self._prune()
+
+    def _prune(self) -> None:
+        metas = sorted(self.profile_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta in metas[self.max_reports :]:
+            for path in self._report_paths(meta.stem):
+                path.unlink(missing_ok=True)
+
+    def reports(self) -> list[dict[str, Any]]:
+        if not self.profile_dir.exists():
+            return []
+        out = []
+        for meta in self.profile_dir.glob("*.json"):
+            try:
+                out.append(json.loads(meta.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return sorted(out, key=lambda r: r["created_at"], reverse=True)
+
+    def report_path(self, profile_id: str) -> Path | None:
+        # Ids are uuid hex; anything else cannot name a report.
+        if not profile_id.isalnum():
+            return None
+        stacks_path, _ = self._report_paths(profile_id)
+        return stacks_path if stacks_path.exists() else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that runs selected requests under :class:`StackSampler`.
+
+    Profiled responses carry ``X-Profile-Id``; the report is written once the
+    response body has been sent. Jobs the request sends to a process-based
+    pool run on that pool's fallback threads instead, where the sampler can
+    see them.
+    """
+
+    def __init__(self, app: Any, profiler: Profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+        reason = profiler.begin(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_id(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(profiler.interval_s)
+        start = time.perf_counter()
+
+        def complete() -> None:
+            # Joins the sampler and writes the report, so it runs off the event loop.
+            samples = sampler.stop()
+            report = ProfileReport(
+                profile_id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                reason=reason,
+                status=status,
+                duration_ms=round((time.perf_counter() - start) * 1000.0, 3),
+                samples=sum(samples.values()),
+                interval_ms=profiler.interval_s * 1000.0,
+                created_at=datetime.now().isoformat(timespec="milliseconds"),
+            )
+            profiler.finish(report, samples)
+
+        sampler.start()
+        try:
+            # The sampler only sees this process, so the request's compute jobs run on threads.
+            with threads_only():
+                await self.app(scope, receive, send_with_id)
+        finally:
+            # Shielded: a disconnected client must not leave the profiler busy.
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(complete)
@@ -1,25 +1,177 @@
 from __future__ import annotations
 
+import hashlib
+import io
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 
-from .analysis import SUPPORTED_EXTENSIONS
+from .geometry import TeapotGeometry, teapot_geometry
+from .images import (
+    IMAGE_FORMATS,
+    LATEST_PROTOTYPE_STEM,
+    SUPPORTED_EXTENSIONS,
+)
+from .mesh import build_teapot_mesh
+from .metrics import stage, track_worker_caches
 from .models import Blueprint
+from .raster import Shading, render_isometric
+from .store import ContentStore
+from .thumbnails import ThumbnailCache, shared_thumbnail_cache
+
+CANVAS_SIZE = (1860, 1120)
+REFERENCE_SLOTS = 6
+REFERENCE_TILE_SIZE = (236, 156)
+# x, y, width, height of the shaded isometric view in full-sheet pixels
+ISOMETRIC_BOX = (1570, 800, 240, 236)
+ISOMETRIC_SHADING = Shading(color=(176, 196, 206), ambient=0.34, diffuse=0.66)
+
+
+@dataclass(frozen=True)
+class ImageEncoding:
+    """Output format for prototype sheets; ``quality`` applies to WebP/JPEG only."""
+
+    format: str = "png"
+    quality: int = 88
+    compress_level: int = 3
+
+    @classmethod
+    def parse(
+        cls,
+        file_format: str = "png",
+        quality: int | None = None,
+        compress_level: int | None = None,
+    ) -> ImageEncoding:
+        file_format = file_format.lower().strip()
+        if file_format == "jpg":
+            file_format = "jpeg"
+        if file_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {file_format}")
+        default = cls()
+        return cls(
+            format=file_format,
+            quality=default.quality if quality is None else max(1, min(100, quality)),
+            compress_level=default.compress_level if compress_level is None else max(0, min(9, compress_level)),
+        )
+
+    @property
+    def media_type(self) -> str:
+        return IMAGE_FORMATS[self.format][1]
+
+    @property
+    def suffix(self) -> str:
+        return IMAGE_FORMATS[self.format][2]
+
+    def encode(self, image: Image.Image) -> bytes:
+        pil_format = IMAGE_FORMATS[self.format][0]
+        if self.format == "png":
+            options = {"compress_level": self.compress_level}
+        elif self.format == "webp":
+            # method=0 is the fastest WebP effort; larger methods cost 3-4x for ~10% size.
+            options = {"quality": self.quality, "method": 0}
+        else:
+            options = {"quality": self.quality, "optimize": False}
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, **options)
+        return buffer.getvalue()
+
+
+DEFAULT_ENCODING = ImageEncoding()
+
+# Used when the caller does not share a persistent cache.
+_MEMORY_THUMBNAILS = ThumbnailCache(disk_dir=None, max_entries=REFERENCE_SLOTS * 2)
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
 
 
-def _fit_crop(path: Path, size: tuple[int, int]) -> Image.Image:
-    image = Image.open(path).convert("RGB")
-    return ImageOps.fit(image, size=size, method=Image.Resampling.LANCZOS)
+@lru_cache(maxsize=None)
+def _font(size: int) -> ImageFont.ImageFont:
+    return ImageFont.load_default(size=size)
+
+
+@dataclass(frozen=True)
+class RenderTier:
+    """Resolution, resampling filter, default encoding and persistence of one render quality."""
+
+    name: str
+    scale: float
+    resample: int
+    encoding: ImageEncoding
+    persist: bool
+    mesh_supersample: int = 2
+
+
+RENDER_TIERS = {
+    "full": RenderTier("full", 1.0, Image.Resampling.LANCZOS, DEFAULT_ENCODING, persist=True),
+    "preview": RenderTier(
+        "preview",
+        0.5,
+        Image.Resampling.BILINEAR,
+        ImageEncoding(format="jpeg", quality=80),
+        persist=False,
+        mesh_supersample=1,
+    ),
+}
+FULL_TIER = RENDER_TIERS["full"]
+
+
+class _SheetDraw:
+    """ImageDraw facade: callers lay out in full-sheet pixels, drawing happens at ``scale``."""
+
+    def __init__(self, canvas: Image.Image, scale: float = 1.0) -> None:
+        self.canvas = canvas
+        self.scale = scale
+        self._draw = ImageDraw.Draw(canvas)
+
+    def _xy(self, xy):
+        if self.scale == 1.0:
+            return xy
+        s = self.scale
+        if isinstance(xy[0], (tuple, list)):
+            return [(x * s, y * s) for x, y in xy]
+        return tuple(v * s for v in xy)
+
+    def _width(self, width: int) -> int:
+        return width if self.scale == 1.0 else max(1, round(width * self.scale))
+
+    def _font(self, font: ImageFont.FreeTypeFont) -> ImageFont.FreeTypeFont:
+        return font if self.scale == 1.0 else _font(max(6, round(font.size * self.scale)))
+
+    def line(self, xy, fill, width: int = 1) -> None:
+        self._draw.line(self._xy(xy), fill=fill, width=self._width(width))
+
+    def rectangle(self, xy, fill) -> None:
+        self._draw.rectangle(self._xy(xy), fill=fill)
+
+    def rounded_rectangle(self, xy, radius: int, fill=None, outline=None, width: int = 1) -> None:
+        self._draw.rounded_rectangle(
+            self._xy(xy),
+            radius=self._width(radius),
+            fill=fill,
+            outline=outline,
+            width=self._width(width),
+        )
+
+    def polygon(self, xy, fill=None, outline=None, width: int = 1) -> None:
+        self._draw.polygon(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def ellipse(self, xy, outline=None, width: int = 1) -> None:
+        self._draw.ellipse(self._xy(xy), outline=outline, width=self._width(width))
+
+    def text(self, xy, text: str, fill, font: ImageFont.FreeTypeFont) -> None:
+        self._draw.text(self._xy(xy), text, fill=fill, font=self._font(font))
+
+    def paste(self, image: Image.Image, xy: tuple[int, int], mask: Image.Image | None = None) -> None:
+        self.canvas.paste(image, (round(xy[0] * self.scale), round(xy[1] * self.scale)), mask)
 
 
 def _draw_dashed_line(
-    draw: ImageDraw.ImageDraw,
+    draw: _SheetDraw,
     start: tuple[float, float],
     end: tuple[float, float],
     dash: int = 8,
@@ -51,7 +203,7 @@ def _draw_dashed_line(
 
 
 def _draw_dimension(
-    draw: ImageDraw.ImageDraw,
+    draw: _SheetDraw,
     p1: tuple[float, float],
     p2: tuple[float, float],
     label: str,
@@ -68,37 +220,24 @@ def _draw_dimension(
 
 
 def _draw_prototype_views(
-    canvas: Image.Image,
+    draw: _SheetDraw,
     blueprint: Blueprint,
     origin_side: tuple[int, int],
     top_center: tuple[int, int],
     font_small: ImageFont.ImageFont,
     font_med: ImageFont.ImageFont,
 ) -> None:
-    draw = ImageDraw.Draw(canvas)
     d = blueprint.dimensions
+    geo = teapot_geometry(d)
 
-    max_width = max(d.head_top_diameter_mm, d.body_max_diameter_mm)
-    scale = min(2.2, 340 / max_width, 420 / max(d.overall_height_mm, 1.0))
+    scale = min(2.2, 340 / (geo.max_radius * 2.0), 420 / max(geo.overall_h, 1.0))
 
     side_ox, side_oy = origin_side
 
-    body_h = d.body_height_mm
-    overall_h = d.overall_height_mm
-
-    r_bottom = d.body_bottom_diameter_mm * 0.5
-    r_max = d.body_max_diameter_mm * 0.5
-    r_neck = d.neck_diameter_mm * 0.5
-    r_head = d.head_top_diameter_mm * 0.5
-
-    right = [
-        (r_bottom, 0.0),
-        (r_max, body_h * 0.30),
-        (r_max * 0.98, body_h * 0.68),
-        (r_neck, body_h),
-        (r_neck * 1.18, body_h + (overall_h - body_h) * 0.45),
-        (r_head, overall_h),
-    ]
+    overall_h = geo.overall_h
+    r_max = geo.r_max
+    r_head = geo.r_head
+    right = geo.outline
 
     def m(x_mm: float, y_mm: float) -> tuple[float, float]:
         return (side_ox + x_mm * scale, side_oy - y_mm * scale)
@@ -116,7 +255,7 @@ def _draw_prototype_views(
         draw,
         (m(-r_head - 22, 0)[0], m(-r_head - 22, 0)[1]),
         (m(-r_head - 22, overall_h)[0], m(-r_head - 22, overall_h)[1]),
-        f"H {overall_h:.1f} mm",
+        f"H {d.overall_height_mm:.1f} mm",
         font=font_small,
         text_offset=(6, -20),
     )
@@ -145,29 +284,66 @@ def _draw_prototype_views(
         r = radius_mm * scale
         draw.ellipse((top_cx - r, top_cy - r, top_cx + r, top_cy + r), outline=color, width=width)
 
-    draw_circle(r_head, (13, 84, 103), 4)
-    draw_circle(r_neck, (51, 100, 116), 3)
-    draw_circle(d.insert_outer_diameter_mm * 0.5, (80, 123, 138), 3)
-    draw_circle(d.insert_inner_diameter_mm * 0.5, (109, 145, 157), 2)
+    circle_styles = (((13, 84, 103), 4), ((51, 100, 116), 3), ((80, 123, 138), 3), ((109, 145, 157), 2))
+    for radius, (color, width) in zip(geo.top_circles, circle_styles):
+        draw_circle(radius, color, width)
 
     draw.text((top_cx - 52, top_cy + r_head * scale + 20), "Top View", fill=(17, 62, 79), font=font_med)
     draw.text((side_ox - 54, side_oy - overall_h * scale - 30), "Side View", fill=(17, 62, 79), font=font_med)
 
 
-def render_prototype_v1(
+@lru_cache(maxsize=32)
+def _isometric_tile(geo: TeapotGeometry, size: tuple[int, int], supersample: int) -> Image.Image:
+    vertices, faces = build_teapot_mesh(geo).to_arrays()
+    return render_isometric(vertices, faces, size, supersample=supersample, shading=ISOMETRIC_SHADING)
+
+
+def _draw_isometric_view(
+    draw: _SheetDraw,
     blueprint: Blueprint,
-    image_paths: list[Path],
-    save_dir: Path,
-) -> tuple[bytes, Path]:
-    width, height = 1860, 1120
-
-    canvas = Image.new("RGB", (width, height), (238, 243, 245))
-    draw = ImageDraw.Draw(canvas)
-    font_title = ImageFont.load_default(size=30)
-    font_sub = ImageFont.load_default(size=18)
-    font_med = ImageFont.load_default(size=17)
-    font_body = ImageFont.load_default(size=15)
-    font_small = ImageFont.load_default(size=14)
+    supersample: int,
+    font_med: ImageFont.ImageFont,
+) -> None:
+    x, y, w, h = ISOMETRIC_BOX
+    tile = _isometric_tile(teapot_geometry(blueprint.dimensions), _scaled_size((w, h), draw.scale), supersample)
+    draw.paste(tile, (x, y), mask=tile)
+    draw.text((x + w * 0.5 - 62, y + h + 4), "Isometric View", fill=(17, 62, 79), font=font_med)
+
+
+def _image_signature(image_paths: list[Path]) -> tuple[int, tuple[tuple[str, int, int], ...]]:
+    supported = [path for path in image_paths if path.suffix.lower() in SUPPORTED_EXTENSIONS]
+    shown = []
+    for path in supported[:REFERENCE_SLOTS]:
+        st = path.stat()
+        shown.append((str(path), st.st_mtime_ns, st.st_size))
+    return len(supported), tuple(shown)
+
+
+def _scaled_size(size: tuple[int, int], scale: float) -> tuple[int, int]:
+    return (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+
+
+@lru_cache(maxsize=8)
+def _background_layer(
+    signature: tuple[int, tuple[tuple[str, int, int], ...]],
+    thumbnails: ThumbnailCache,
+    tier: RenderTier,
+) -> Image.Image:
+    """Everything on the sheet that does not depend on the blueprint.
+
+    Keyed by the reference image set (path, mtime, size) and tier so edited or
+    added images rebuild it. Callers must copy the result before drawing on it.
+    """
+    width, height = CANVAS_SIZE
+    supported_count, shown = signature
+
+    canvas = Image.new("RGB", _scaled_size(CANVAS_SIZE, tier.scale), (238, 243, 245))
+    draw = _SheetDraw(canvas, tier.scale)
+    font_title = _font(30)
+    font_sub = _font(18)
+    font_med = _font(17)
+    font_body = _font(15)
+    font_small = _font(14)
 
     # Background accents
     draw.rectangle((0, 0, width, 190), fill=(20, 76, 96))
@@ -181,46 +357,79 @@ def render_prototype_v1(
         font=font_sub,
     )
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    draw.text((38, 118), f"Generated: {timestamp}", fill=(208, 230, 236), font=font_sub)
-
     # Left column: source image board
     draw.rounded_rectangle((28, 232, 560, 1080), radius=18, fill=(250, 252, 253), outline=(194, 208, 216), width=2)
     draw.text((52, 250), "Reference Images", fill=(28, 67, 82), font=font_med)
 
-    supported = [path for path in image_paths if path.suffix.lower() in SUPPORTED_EXTENSIONS]
-    shown = supported[:6]
-
-    thumb_w, thumb_h = 236, 156
+    thumb_w, thumb_h = REFERENCE_TILE_SIZE
+    tile_size = _scaled_size(REFERENCE_TILE_SIZE, tier.scale)
     x0, y0 = 52, 284
     col_gap, row_gap = 20, 18
 
-    for idx, path in enumerate(shown):
+    for idx, (path, _mtime, _size) in enumerate(shown):
         row = idx // 2
         col = idx % 2
         x = x0 + col * (thumb_w + col_gap)
         y = y0 + row * (thumb_h + row_gap)
-        thumb = _fit_crop(path, (thumb_w, thumb_h))
-        canvas.paste(thumb, (x, y))
+        thumb = thumbnails.get(Path(path), tile_size, resample=tier.resample)
+        draw.paste(thumb, (x, y))
         draw.rounded_rectangle((x - 1, y - 1, x + thumb_w + 1, y + thumb_h + 1), radius=9, outline=(162, 184, 195), width=2)
 
-    draw.text((52, 1020), f"Images used: {len(supported)}", fill=(60, 92, 106), font=font_small)
+    draw.text((52, 1020), f"Images used: {supported_count}", fill=(60, 92, 106), font=font_small)
 
     # Right board for prototype views + notes
     draw.rounded_rectangle((590, 232, 1828, 1080), radius=18, fill=(250, 252, 253), outline=(194, 208, 216), width=2)
 
+    draw.text((622, 268), "Prototype Materials", fill=(26, 73, 90), font=font_med)
+    draw.text((622, 580), "Target Specs", fill=(26, 73, 90), font=font_med)
+
+    draw.text((622, 790), "Assembly Note", fill=(26, 73, 90), font=font_med)
+    draw.text(
+        (622, 824),
+        "- Body shell and curved head are separate formed stainless parts.",
+        fill=(47, 78, 92),
+        font=font_body,
+    )
+    draw.text(
+        (622, 854),
+        "- Silicone gasket seats at neck interface before final locking.",
+        fill=(47, 78, 92),
+        font=font_body,
+    )
+    draw.text(
+        (622, 884),
+        "- Center insert/filter collar retained at top opening.",
+        fill=(47, 78, 92),
+        font=font_body,
+    )
+
+    return canvas
+
+
+def _draw_blueprint_layer(
+    draw: _SheetDraw,
+    blueprint: Blueprint,
+    timestamp: str,
+    mesh_supersample: int = 2,
+) -> None:
+    font_sub = _font(18)
+    font_med = _font(17)
+    font_body = _font(15)
+    font_small = _font(14)
+
+    draw.text((38, 118), f"Generated: {timestamp}", fill=(208, 230, 236), font=font_sub)
+
     _draw_prototype_views(
-        canvas,
+        draw,
         blueprint,
         origin_side=(1220, 860),
         top_center=(1490, 610),
         font_small=font_small,
         font_med=font_med,
     )
+    _draw_isometric_view(draw, blueprint, mesh_supersample, font_med)
 
     # Material summary
-    draw.text((622, 268), "Prototype Materials", fill=(26, 73, 90), font=font_med)
-
     y = 302
     for mat in blueprint.materials[:6]:
         selected = mat.selected or mat.recommended
@@ -232,7 +441,6 @@ def render_prototype_v1(
         y += 44
 
     d = blueprint.dimensions
-    draw.text((622, 580), "Target Specs", fill=(26, 73, 90), font=font_med)
     draw.text(
         (622, 614),
         f"- Capacity target: {d.capacity_target_ml:.1f} ml ({d.cups_target:.2f} cups)",
@@ -249,26 +457,6 @@ def render_prototype_v1(
         font=font_body,
     )
 
-    draw.text((622, 790), "Assembly Note", fill=(26, 73, 90), font=font_med)
-    draw.text(
-        (622, 824),
-        "- Body shell and curved head are separate formed stainless parts.",
-        fill=(47, 78, 92),
-        font=font_body,
-    )
-    draw.text(
-        (622, 854),
-        "- Silicone gasket seats at neck interface before final locking.",
-        fill=(47, 78, 92),
-        font=font_body,
-    )
-    draw.text(
-        (622, 884),
-        "- Center insert/filter collar retained at top opening.",
-        fill=(47, 78, 92),
-        font=font_body,
-    )
-
     if blueprint.analysis_notes:
         draw.text((622, 934), "Analysis Notes", fill=(26, 73, 90), font=font_med)
         ny = 964
@@ -276,12 +464,102 @@ def render_prototype_v1(
             draw.text((622, ny), f"- {note}", fill=(47, 78, 92), font=font_body)
             ny += 30
 
-    save_dir.mkdir(parents=True, exist_ok=True)
+
+def warm_prototype_layers(
+    blueprint: Blueprint,
+    image_paths: list[Path],
+    thumbnails: ThumbnailCache | None = None,
+) -> None:
+    """Prime the background layers, fonts and isometric tile of every tier without encoding or saving."""
+    signature = _image_signature(image_paths)
+    for tier in RENDER_TIERS.values():
+        canvas = _background_layer(
+            signature,
+            thumbnails if thumbnails is not None else _MEMORY_THUMBNAILS,
+            tier,
+        ).copy()
+        _draw_blueprint_layer(_SheetDraw(canvas, tier.scale), blueprint, "", mesh_supersample=tier.mesh_supersample)
+
+
+def render_prototype_sheet(
+    blueprint: Blueprint,
+    image_paths: list[Path],
+    thumbnails: ThumbnailCache | None = None,
+    encoding: ImageEncoding | None = None,
+    tier: RenderTier = FULL_TIER,
+) -> bytes:
+    """Render the sheet at ``tier`` quality and encode it once, without touching disk."""
+    encoding = encoding or tier.encoding
+    with stage(f"prototype.draw.{tier.name}"):
+        canvas = _background_layer(
+            _image_signature(image_paths),
+            thumbnails if thumbnails is not None else _MEMORY_THUMBNAILS,
+            tier,
+        ).copy()
+        _draw_blueprint_layer(
+            _SheetDraw(canvas, tier.scale),
+            blueprint,
+            datetime.now().strftime("%Y-%m-%d %H:%M"),
+            mesh_supersample=tier.mesh_supersample,
+        )
+    with stage(f"prototype.encode.{encoding.format}"):
+        return encoding.encode(canvas)
+
+
+def save_prototype(store: ContentStore, data: bytes, encoding: ImageEncoding) -> Path:
+    """Queue the timestamped copy and the latest alias; returns the path being written."""
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = save_dir / f"prototype_v1_{ts}.png"
-    canvas.save(output_path, format="PNG")
+    # The digest prefix keeps two renders in the same second from sharing a name.
+    name = f"prototype_v1_{ts}_{hashlib.sha256(data).hexdigest()[:12]}{encoding.suffix}"
+    store.put_async(data, name, aliases=(f"{LATEST_PROTOTYPE_STEM}{encoding.suffix}",))
+    return store.path_for(name)
+
+
+def render_prototype_v1(
+    blueprint: Blueprint,
+    image_paths: list[Path],
+    store: ContentStore,
+    thumbnails: ThumbnailCache | None = None,
+    encoding: ImageEncoding | None = None,
+    tier: RenderTier = FULL_TIER,
+) -> tuple[bytes, Path | None]:
+    """Render the sheet at ``tier`` quality and encode it once.
+
+    Persisting tiers queue the disk copies in the background and return the
+    path the timestamped copy is written to; other tiers return ``None``.
+    """
+    encoding = encoding or tier.encoding
+    data = render_prototype_sheet(blueprint, image_paths, thumbnails, encoding, tier)
+    if not tier.persist:
+        return data, None
+    return data, save_prototype(store, data, encoding)
+
+
+# Picklable entry points for the compute pool. Arguments are plain data, and
+# each worker process keeps its own layer and thumbnail caches between jobs.
+
+
+def render_prototype_job(
+    blueprint: Blueprint,
+    image_paths: list[Path],
+    thumbnails_dir: Path | None,
+    encoding: ImageEncoding,
+    tier_name: str,
+) -> bytes:
+    thumbnails = shared_thumbnail_cache(thumbnails_dir) if thumbnails_dir is not None else None
+    return render_prototype_sheet(blueprint, image_paths, thumbnails, encoding, RENDER_TIERS[tier_name])
+
+
+def warm_prototype_job(blueprint: Blueprint, image_paths: list[Path], thumbnails_dir: Path | None) -> None:
+    thumbnails = shared_thumbnail_cache(thumbnails_dir) if thumbnails_dir is not None else None
+    warm_prototype_layers(blueprint, image_paths, thumbnails)
+
 
-    latest = save_dir / "prototype_v1_latest.png"
-    canvas.save(latest, format="PNG")
+# Exposed for cache hit/miss metrics.
+LAYER_CACHES = {
+    "prototype_background": _background_layer,
+    "prototype_isometric": _isometric_tile,
+    "prototype_font": _font,
+}
 
-    return output_path.read_bytes(), output_path
+track_worker_caches(lambda: (LAYER_CACHES, {}))
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+# Camera angles for a true isometric projection.
+ISOMETRIC_AZIMUTH_DEG = 45.0
+ISOMETRIC_ELEVATION_DEG = math.degrees(math.atan(1.0 / math.sqrt(2.0)))
+
+# Upper bound on span pixels expanded per batch; keeps peak memory near 100 MB.
+_MAX_CANDIDATES = 2_000_000
+
+
+@dataclass(frozen=True)
+class Shading:
+    color: tuple[int, int, int] = (146, 168, 180)
+    ambient: float = 0.28
+    diffuse: float = 0.72
+    # Direction towards the light in view space (x right, y up, z towards viewer).
+    light: tuple[float, float, float] = (-0.45, 0.65, 0.62)
+
+
+def view_matrix(azimuth_deg: float, elevation_deg: float) -> np.ndarray:
+    """Rotation taking y-up model space to view space looking down -z."""
+    az = math.radians(azimuth_deg)
+    el = math.radians(elevation_deg)
+    yaw = np.array(
+        [
+            [math.cos(az), 0.0, -math.sin(az)],
+            [0.0, 1.0, 0.0],
+            [math.sin(az), 0.0, math.cos(az)],
+        ]
+    )
+    pitch = np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [0.0, math.cos(el), -math.sin(el)],
+            [0.0, math.sin(el), math.cos(el)],
+        ]
+    )
+    return pitch @ yaw
+
+
+def _project(
+    vertices: np.ndarray,
+    rotation: np.ndarray,
+    width: int,
+    height: int,
+    margin: float,
+) -> np.ndarray:
+    """Orthographic projection to pixel coordinates (x right, y down) plus view depth."""
+    view = vertices @ rotation.T
+    lo = view[:, :2].min(axis=0)
+    hi = view[:, :2].max(axis=0)
+    extent = np.maximum(hi - lo, 1e-9)
+    scale = min((width - 2 * margin) / extent[0], (height - 2 * margin) / extent[1])
+    center = (lo + hi) * 0.5
+
+    screen = np.empty_like(view)
+    screen[:, 0] = (view[:, 0] - center[0]) * scale + width * 0.5
+    screen[:, 1] = height * 0.5 - (view[:, 1] - center[1]) * scale
+    # Larger z is closer to the viewer; store distance so smaller wins.
+    screen[:, 2] = -view[:, 2]
+    return screen
+
+
+def _face_shades(view_tris: np.ndarray, shading: Shading) -> np.ndarray:
+    normals = np.cross(view_tris[:, 1] - view_tris[:, 0], view_tris[:, 2] - view_tris[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.maximum(lengths, 1e-12)[:, None]
+    light = np.asarray(shading.light, dtype=np.float64)
+    light /= np.linalg.norm(light)
+    # Two-sided: the lathe shells are open, so inner walls are visible too.
+    lambert = np.abs(normals @ light)
+    return np.clip(shading.ambient + shading.diffuse * lambert, 0.0, 1.0)
+
+
+def _row_spans(tris: np.ndarray, height: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Split triangles into scanline spans: (triangle, row, first pixel, end pixel)."""
+    ys = tris[:, :, 1]
+    y0 = np.clip(np.ceil(ys.min(axis=1) - 0.5), 0, height).astype(np.int64)
+    y1 = np.clip(np.ceil(ys.max(axis=1) - 0.5), 0, height).astype(np.int64)
+    rows_per_tri = np.maximum(y1 - y0, 0)
+
+    tri = np.repeat(np.arange(len(tris)), rows_per_tri)
+    starts = np.cumsum(rows_per_tri) - rows_per_tri
+    row = y0[tri] + (np.arange(len(tri)) - np.repeat(starts, rows_per_tri))
+    yc = row + 0.5
+
+    t = tris[tri]
+    x_left = np.full(len(tri), np.inf)
+    x_right = np.full(len(tri), -np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i, j in ((0, 1), (1, 2), (2, 0)):
+            px, py = t[:, i, 0], t[:, i, 1]
+            qx, qy = t[:, j, 0], t[:, j, 1]
+            # Half-open in y so a row through a shared vertex is counted once.
+            crosses = (yc >= np.minimum(py, qy)) & (yc < np.maximum(py, qy))
+            x = px + (yc - py) * (qx - px) / (qy - py)
+            x_left = np.where(crosses, np.minimum(x_left, x), x_left)
+            x_right = np.where(crosses, np.maximum(x_right, x), x_right)
+
+    valid = np.isfinite(x_left) & np.isfinite(x_right)
+    first = np.ceil(np.where(valid, x_left, 0.0) - 0.5)
+    last = np.ceil(np.where(valid, x_right, 0.0) - 0.5)
+    return tri, row, first, last
+
+
+def rasterize(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    size: tuple[int, int],
+    azimuth_deg: float = ISOMETRIC_AZIMUTH_DEG,
+    elevation_deg: float = ISOMETRIC_ELEVATION_DEG,
+    shading: Shading | None = None,
+    margin: float = 4.0,
+) -> Image.Image:
+    """Render a triangle mesh with a z-buffer and flat Lambert shading.
+
+    ``vertices`` is ``(N, 3)`` in y-up model space and ``faces`` is ``(M, 3)``
+    zero-based. Triangles are split into scanline spans and every covered
+    pixel is depth-tested in bulk. Returns an RGBA image, transparent where
+    nothing was drawn.
+    """
+    shading = shading or Shading()
+    width, height = size
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    rotation = view_matrix(azimuth_deg, elevation_deg)
+    screen = _project(vertices, rotation, width, height, margin)
+
+    tris = screen[faces]
+    shades = _face_shades(vertices[faces] @ rotation.T, shading)
+
+    # Depth plane z = a*x + b*y + c per triangle; degenerate triangles are dropped.
+    e1 = tris[:, 1] - tris[:, 0]
+    e2 = tris[:, 2] - tris[:, 0]
+    det = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    keep = np.abs(det) > 1e-12
+    tris, shades, e1, e2, det = tris[keep], shades[keep], e1[keep], e2[keep], det[keep]
+    za = (e1[:, 2] * e2[:, 1] - e2[:, 2] * e1[:, 1]) / det
+    zb = (e2[:, 2] * e1[:, 0] - e1[:, 2] * e2[:, 0]) / det
+    zc = tris[:, 0, 2] - za * tris[:, 0, 0] - zb * tris[:, 0, 1]
+
+    tri, row, first, last = _row_spans(tris, height)
+    first = np.clip(first, 0, width).astype(np.int64)
+    counts = np.maximum(np.clip(last, 0, width).astype(np.int64) - first, 0)
+
+    depth = np.full(width * height, np.inf)
+    owner = np.full(width * height, -1, dtype=np.int64)
+
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        # Expand as many spans as fit in the pixel budget (at least one).
+        base = cumulative[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cumulative, base + _MAX_CANDIDATES, side="right")), start + 1)
+        n = counts[start:stop]
+        span_tri = np.repeat(tri[start:stop], n)
+        offsets = np.cumsum(n) - n
+        px = np.repeat(first[start:stop], n) + (np.arange(len(span_tri)) - np.repeat(offsets, n))
+        py = np.repeat(row[start:stop], n)
+
+        z = za[span_tri] * (px + 0.5) + zb[span_tri] * (py + 0.5) + zc[span_tri]
+        pixel = py * width + px
+        np.minimum.at(depth, pixel, z)
+        winners = z <= depth[pixel]
+        owner[pixel[winners]] = span_tri[winners]
+        start = stop
+
+    covered = owner >= 0
+    rgba = np.zeros((width * height, 4), dtype=np.uint8)
+    color = np.asarray(shading.color, dtype=np.float64)
+    rgba[covered, :3] = np.clip(shades[owner[covered]][:, None] * color, 0, 255).astype(np.uint8)
+    rgba[covered, 3] = 255
+    return Image.fromarray(rgba.reshape(height, width, 4))
+
+
+def render_isometric(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    size: tuple[int, int],
+    supersample: int = 2,
+    shading: Shading | None = None,
+) -> Image.Image:
+    """Isometric view of a mesh, supersampled and box-filtered down to ``size``."""
+    factor = max(1, supersample)
+    big = rasterize(
+        vertices,
+        faces,
+        (size[0] * factor, size[1] * factor),
+        shading=shading,
+        margin=4.0 * factor,
+    )
+    if factor == 1:
+        return big
+    return big.resize(size, Image.Resampling.BOX)
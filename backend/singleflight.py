@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Generic, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    from .cache import LRUCache
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Collapse concurrent calls with the same key into one computation.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block on the same future and get its result or exception. With a
+    ``cache``, the leader checks it again and stores the result before the
+    flight ends, so a caller that just missed the cache cannot start a
+    duplicate. Without one, nothing outlives the call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future[T]] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T], cache: LRUCache[Hashable, T] | None = None) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            # ``in`` first so the re-check is not counted as a second miss.
+            result = cache.get(key) if cache is not None and key in cache else None
+            if result is None:
+                result = fn()
+                if cache is not None:
+                    cache.put(key, result)
+        except BaseException as exc:
+            # Also covers interpreter shutdown and thread cancellation, so
+            # waiters never hang on a leader that went away.
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .metrics import timed
+
+OBJECTS_DIR_NAME = "objects"
+# Names the store has linked, one "<unix time>\t<name>" line per put.
+NAMES_LOG_NAME = "names.log"
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    value = float(raw)
+    return value if value > 0 else None
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_age_seconds: float | None = 14 * 24 * 3600.0
+    max_count: int | None = 300
+    max_bytes: int | None = 256 * 1024 * 1024
+    # Objects younger than this are never collected, so a put() that has
+    # written its object but not yet linked a name cannot lose it.
+    grace_seconds: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> RetentionPolicy:
+        days = _env_float("TEAPOT_EXPORT_MAX_AGE_DAYS", 14.0)
+        count = _env_float("TEAPOT_EXPORT_MAX_FILES", 300.0)
+        megabytes = _env_float("TEAPOT_EXPORT_MAX_MB", 256.0)
+        return cls(
+            max_age_seconds=days * 24 * 3600.0 if days else None,
+            max_count=int(count) if count else None,
+            max_bytes=int(megabytes * 1024 * 1024) if megabytes else None,
+        )
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    digest: str
+    path: Path
+    object_path: Path
+    size: int
+    created: bool
+
+
+@dataclass
+class GCReport:
+    removed_names: list[str] = field(default_factory=list)
+    removed_objects: int = 0
+    freed_bytes: int = 0
+
+
+class ContentStore:
+    """Deduplicating file store with human-friendly names.
+
+    Payloads are written once to ``objects/<aa>/<sha256><suffix>``; every
+    name in the root directory is a hard link to its object (or a plain copy
+    where the filesystem cannot link). Aliases such as ``*_latest.png`` are
+    pinned and exempt from retention.
+
+    Retention only applies to names the store linked itself, as recorded in
+    ``objects/names.log``; other files in the root are never touched. A
+    name's age is the time it was last put: links share one mtime, so the
+    file's own would change whenever any alias of the object is refreshed.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        policy: RetentionPolicy | None = None,
+        pinned: tuple[str, ...] = (),
+    ) -> None:
+        self.root = root
+        self.objects_dir = root / OBJECTS_DIR_NAME
+        self.names_log = self.objects_dir / NAMES_LOG_NAME
+        self.policy = policy or RetentionPolicy()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pinned: set[str] = set(pinned)
+        self._gc_thread: threading.Thread | None = None
+        self._gc_stop = threading.Event()
+        self._writer: ThreadPoolExecutor | None = None
+
+    def _object_path(self, digest: str, suffix: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{suffix}"
+
+    def _link(self, source: Path, name: str) -> Path:
+        target = self.path_for(name)
+        try:
+            # rename() between two links to one inode is a no-op that would
+            # leave the temporary link behind.
+            if os.path.samefile(source, target):
+                return target
+        except OSError:
+            pass
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+        return target
+
+    @timed("store.write")
+    def put(self, data: bytes, name: str, aliases: tuple[str, ...] = ()) -> StoredObject:
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest, Path(name).suffix.lower())
+
+        with self._lock:
+            created = not object_path.exists()
+            if created:
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = object_path.with_name(f".{object_path.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, object_path)
+            else:
+                # Refresh mtime so the object is treated as recently used.
+                os.utime(object_path)
+
+            path = self._link(object_path, name)
+            with self.names_log.open("a", encoding="utf-8") as log:
+                log.write(f"{time.time():.3f}\t{path.name}\n")
+            for alias in aliases:
+                self._pinned.add(Path(alias).name)
+                self._link(object_path, alias)
+
+        return StoredObject(
+            digest=digest,
+            path=path,
+            object_path=object_path,
+            size=len(data),
+            created=created,
+        )
+
+    def path_for(self, name: str) -> Path:
+        return self.root / Path(name).name
+
+    def put_async(self, data: bytes, name: str, aliases: tuple[str, ...] = ()) -> Future[StoredObject]:
+        """Queue ``put`` on a single background writer so names are updated in call order."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-store-writer")
+            writer = self._writer
+        return writer.submit(self.put, data, name, aliases)
+
+    def flush(self) -> None:
+        """Wait for queued background writes to land on disk."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def usage(self) -> tuple[int, int]:
+        """Return (object count, object bytes) currently on disk."""
+        count = 0
+        total = 0
+        for path in self.objects_dir.glob("*/*"):
+            try:
+                total += path.stat().st_size
+                count += 1
+            except OSError:
+                continue
+        return count, total
+
+    def _read_names(self) -> dict[str, float]:
+        """Name -> time of its latest put, from the names log."""
+        names: dict[str, float] = {}
+        try:
+            lines = self.names_log.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return names
+        for line in lines:
+            stamp, sep, name = line.partition("\t")
+            try:
+                names[name] = max(float(stamp), names.get(name, 0.0))
+            except ValueError:
+                continue
+        return names
+
+    def collect_garbage(self, now: float | None = None) -> GCReport:
+        now = time.time() if now is None else now
+        policy = self.policy
+        report = GCReport()
+
+        with self._lock:
+            named: list[tuple[float, Path, os.stat_result]] = []
+            for name, stamp in self._read_names().items():
+                if name in self._pinned:
+                    continue
+                try:
+                    st = self.path_for(name).stat()
+                except OSError:
+                    continue
+                named.append((stamp, self.path_for(name), st))
+            named.sort(key=lambda item: item[0], reverse=True)
+
+            kept = 0
+            kept_bytes = 0
+            seen_inodes: set[tuple[int, int]] = set()
+            survivors: list[str] = []
+            for stamp, path, st in named:
+                inode = (st.st_dev, st.st_ino)
+                extra_bytes = 0 if inode in seen_inodes else st.st_size
+                expired = policy.max_age_seconds is not None and now - stamp > policy.max_age_seconds
+                over_count = policy.max_count is not None and kept >= policy.max_count
+                over_bytes = policy.max_bytes is not None and kept_bytes + extra_bytes > policy.max_bytes
+                if expired or over_count or over_bytes:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        continue
+                    report.removed_names.append(path.name)
+                    if st.st_nlink <= 1:
+                        report.freed_bytes += st.st_size
+                    continue
+                kept += 1
+                kept_bytes += extra_bytes
+                seen_inodes.add(inode)
+                survivors.append(f"{stamp:.3f}\t{path.name}\n")
+
+            # Compacted to the surviving names. Another process's put landing
+            # between the read and this replace is forgotten, so that name is
+            # kept for good rather than lost.
+            tmp = self.names_log.with_name(f".{NAMES_LOG_NAME}.{os.getpid()}.tmp")
+            tmp.write_text("".join(reversed(survivors)), encoding="utf-8")
+            os.replace(tmp, self.names_log)
+
+            for object_path in self.objects_dir.glob("*/*"):
+                try:
+                    st = object_path.stat()
+                except OSError:
+                    continue
+                if now - st.st_mtime < policy.grace_seconds:
+                    continue
+                # A link count of 1 means no name in the root refers to it.
+                if st.st_nlink <= 1:
+                    object_path.unlink(missing_ok=True)
+                    report.removed_objects += 1
+                    report.freed_bytes += st.st_size
+
+        return report
+
+    def start_gc(self, interval_seconds: float = 600.0) -> None:
+        if self._gc_thread is not None and self._gc_thread.is_alive():
+            return
+        self._gc_stop.clear()
+
+        def loop() -> None:
+            while True:
+                try:
+                    self.collect_garbage()
+                except OSError:
+                    pass
+                if self._gc_stop.wait(interval_seconds):
+                    return
+
+        self._gc_thread = threading.Thread(target=loop, name="export-store-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc(self) -> None:
+        self._gc_stop.set()
+        if self._gc_thread is not None:
+            self._gc_thread.join(timeout=5.0)
+            self._gc_thread = None
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from .dxf import LinearDimension, format_number
+from .geometry import Point2
+
+# Stroke widths and colours mirror the DXF layers so both drawings read alike.
+DEFAULT_STYLE = """
+.side{fill:rgba(15,116,140,0.06);stroke:#0d5162;stroke-width:0.6}
+.top{fill:none;stroke:#1f5fa8;stroke-width:0.45}
+.center{fill:none;stroke:#b03a2e;stroke-width:0.25;stroke-dasharray:6 1.5 1.5 1.5}
+.dim{fill:none;stroke:#2e7d32;stroke-width:0.25}
+.dim-text{fill:#2e7d32;font-size:3.2px}
+.annot{fill:#4a4a14;font-size:3.6px}
+.title{fill:#0d5162;font-size:5px;font-weight:bold}
+text{font-family:Helvetica,Arial,sans-serif}
+""".strip()
+
+
+class SvgWriter:
+    """Streaming SVG encoder working in millimetres with a y-up model space.
+
+    ``extents`` is ``(x0, y0, x1, y1)`` in model coordinates; y is flipped on
+    output so drawings share their coordinates with the DXF writer.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        extents: tuple[float, float, float, float],
+        precision: int = 2,
+    ) -> None:
+        self.stream = stream
+        self.extents = extents
+        self.precision = precision
+
+    def _n(self, value: float) -> str:
+        return format_number(value, self.precision)
+
+    def _xy(self, point: Point2) -> tuple[str, str]:
+        return self._n(point[0]), self._n(self.extents[3] - point[1])
+
+    def open(self, title: str = "", style: str = DEFAULT_STYLE) -> None:
+        x0, y0, x1, y1 = self.extents
+        width = self._n(x1 - x0)
+        height = self._n(y1 - y0)
+        self.stream.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}mm" height="{height}mm" '
+            f'viewBox="{self._n(x0)} 0 {width} {height}">\n'
+        )
+        if title:
+            self.stream.write(f"<title>{escape(title)}</title>\n")
+        self.stream.write(f"<style>{style}</style>\n")
+        self.stream.write(
+            f'<rect x="{self._n(x0)}" y="0" width="{width}" height="{height}" fill="#fff"/>\n'
+        )
+
+    @contextmanager
+    def group(self, css_class: str) -> Iterator[None]:
+        self.stream.write(f"<g class={quoteattr(css_class)}>\n")
+        yield
+        self.stream.write("</g>\n")
+
+    def line(self, start: Point2, end: Point2) -> None:
+        x1, y1 = self._xy(start)
+        x2, y2 = self._xy(end)
+        self.stream.write(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>\n')
+
+    def circle(self, center: Point2, radius: float) -> None:
+        cx, cy = self._xy(center)
+        self.stream.write(f'<circle cx="{cx}" cy="{cy}" r="{self._n(radius)}"/>\n')
+
+    def polyline(self, points: Iterable[Point2], closed: bool = False) -> None:
+        parts = []
+        for index, point in enumerate(points):
+            x, y = self._xy(point)
+            parts.append(f"{'L' if index else 'M'}{x} {y}")
+        if closed:
+            parts.append("Z")
+        self.stream.write(f'<path d="{"".join(parts)}"/>\n')
+
+    def text(
+        self,
+        insert: Point2,
+        value: str,
+        css_class: str = "annot",
+        anchor: str = "start",
+        angle_deg: float = 0.0,
+    ) -> None:
+        x, y = self._xy(insert)
+        rotate = f' transform="rotate({self._n(-angle_deg)} {x} {y})"' if angle_deg else ""
+        self.stream.write(
+            f'<text x="{x}" y="{y}" class="{css_class}" text-anchor="{anchor}"{rotate}>{escape(value)}</text>\n'
+        )
+
+    def dimension(self, dim: LinearDimension) -> None:
+        """Draw ``dim`` with the same extension lines, ticks and label as the DXF ``*D`` blocks."""
+        layout = dim.layout()
+        with self.group("dim"):
+            for start, end in layout.lines:
+                self.line(start, end)
+        self.text(layout.text_at, layout.label, "dim-text", "middle", layout.angle_deg)
+
+    def close(self) -> None:
+        self.stream.write("</svg>\n")
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from .cache import LRUCache
+from .metrics import track_worker_caches
+
+THUMBNAIL_CACHE_VERSION = "1"
+# Any size up to images.MAX_THUMBNAIL_EDGE can be requested, so the disk tier is bounded too.
+DISK_MAX_BYTES = int(float(os.environ.get("TEAPOT_THUMBNAIL_DISK_MB", "64")) * 1024 * 1024)
+DISK_MAX_ENTRIES = int(os.environ.get("TEAPOT_THUMBNAIL_DISK_FILES", "2048"))
+
+
+@dataclass(frozen=True)
+class ThumbnailKey:
+    """Source file identity plus everything that changes the resized pixels."""
+
+    path: str
+    mtime_ns: int
+    size_bytes: int
+    width: int
+    height: int
+    crop: bool
+    resample: int
+
+    @classmethod
+    def for_file(
+        cls,
+        path: Path,
+        size: tuple[int, int],
+        crop: bool = True,
+        resample: int = Image.Resampling.LANCZOS,
+    ) -> ThumbnailKey:
+        st = path.stat()
+        return cls(str(path.resolve()), st.st_mtime_ns, st.st_size, size[0], size[1], crop, int(resample))
+
+    @property
+    def digest(self) -> str:
+        material = (
+            f"{THUMBNAIL_CACHE_VERSION}:{self.path}:{self.mtime_ns}:{self.size_bytes}:"
+            f"{self.width}x{self.height}:{int(self.crop)}:{self.resample}"
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def resize_image(image: Image.Image, size: tuple[int, int], crop: bool, resample: int) -> Image.Image:
+    """Crop-to-fill ``size`` when ``crop`` is set, otherwise fit inside it keeping the aspect ratio."""
+    image = image.convert("RGB")
+    if crop:
+        return ImageOps.fit(image, size=size, method=resample)
+    image.thumbnail(size, resample=resample)
+    return image
+
+
+class ThumbnailCache:
+    """Resized source images: decoded tiles in a memory LRU, PNG files on disk.
+
+    Entries are keyed by path, mtime, file size, target size and filter, so an
+    edited source image simply misses and old files age out of the LRU. The
+    disk tier is an LRU as well, by file count and bytes; reads refresh a
+    file's mtime so the order survives restarts.
+    """
+
+    def __init__(
+        self,
+        disk_dir: Path | None,
+        max_entries: int = 128,
+        max_bytes: int = 48 * 1024 * 1024,
+        max_disk_entries: int = DISK_MAX_ENTRIES,
+        max_disk_bytes: int = DISK_MAX_BYTES,
+    ) -> None:
+        self.memory: LRUCache[str, Image.Image] = LRUCache(
+            maxsize=max_entries,
+            max_weight=max_bytes,
+            weigher=lambda image: image.width * image.height * len(image.getbands()),
+        )
+        self.encoded: LRUCache[str, bytes] = LRUCache(
+            maxsize=max_entries,
+            max_weight=max_bytes // 4,
+            weigher=len,
+        )
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        # digest -> file size, least recently used first.
+        self._disk_index: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def _scan_disk(self) -> None:
+        assert self.disk_dir is not None
+        entries = []
+        for path in self.disk_dir.glob("*/*.png"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.stem, st.st_size))
+        with self._disk_lock:
+            for _, digest, size in sorted(entries):
+                self._disk_index[digest] = size
+                self._disk_bytes += size
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        # Another process sharing the directory may already have removed a file.
+        while self._disk_index and (
+            len(self._disk_index) > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes
+        ):
+            digest, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self._disk_path(digest).unlink(missing_ok=True)
+
+    @property
+    def disk_usage(self) -> tuple[int, int]:
+        """(files, bytes) in the disk tier, as seen by this cache."""
+        return len(self._disk_index), self._disk_bytes
+
+    def _disk_path(self, digest: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / digest[:2] / f"{digest}.png"
+
+    def _load_encoded(self, key: ThumbnailKey) -> bytes:
+        digest = key.digest
+        data = self.encoded.get(digest)
+        if data is not None:
+            return data
+
+        if self.disk_dir is not None:
+            path = self._disk_path(digest)
+            try:
+                data = path.read_bytes()
+            except OSError:
+                data = None
+            else:
+                self.disk_hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                with self._disk_lock:
+                    if digest in self._disk_index:
+                        self._disk_index.move_to_end(digest)
+                    else:
+                        self._disk_index[digest] = len(data)
+                        self._disk_bytes += len(data)
+
+        if data is None:
+            with Image.open(key.path) as source:
+                tile = resize_image(source, (key.width, key.height), key.crop, key.resample)
+            buffer = io.BytesIO()
+            tile.save(buffer, format="PNG")
+            data = buffer.getvalue()
+            self.memory.put(digest, tile)
+            self._write_disk(digest, data)
+
+        self.encoded.put(digest, data)
+        return data
+
+    def _write_disk(self, digest: str, data: bytes) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(digest)
+        with self._disk_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._disk_bytes += len(data) - self._disk_index.pop(digest, 0)
+            self._disk_index[digest] = len(data)
+            self._prune_disk()
+
+    def get(
+        self,
+        path: Path,
+        size: tuple[int, int],
+        crop: bool = True,
+        resample: int = Image.Resampling.LANCZOS,
+    ) -> Image.Image:
+        """Return a decoded RGB tile. Treat it as read-only; copy before drawing on it."""
+        key = ThumbnailKey.for_file(path, size, crop, resample)
+        tile = self.memory.get(key.digest)
+        if tile is not None:
+            return tile
+
+        data = self._load_encoded(key)
+        tile = self.memory.get(key.digest)
+        if tile is None:
+            with Image.open(io.BytesIO(data)) as decoded:
+                tile = decoded.convert("RGB")
+            self.memory.put(key.digest, tile)
+        return tile
+
+    def get_png(
+        self,
+        path: Path,
+        size: tuple[int, int],
+        crop: bool = True,
+        resample: int = Image.Resampling.LANCZOS,
+    ) -> tuple[ThumbnailKey, bytes]:
+        key = ThumbnailKey.for_file(path, size, crop, resample)
+        return key, self._load_encoded(key)
+
+
+_SHARED: dict[Path, ThumbnailCache] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_thumbnail_cache(disk_dir: Path) -> ThumbnailCache:
+    """One cache per directory and process, so pool workers reuse decoded tiles across jobs."""
+    with _SHARED_LOCK:
+        cache = _SHARED.get(disk_dir)
+        if cache is None:
+            cache = _SHARED[disk_dir] = ThumbnailCache(disk_dir=disk_dir)
+        return cache
+
+
+def thumbnail_png_job(disk_dir: Path, path: Path, size: tuple[int, int], crop: bool) -> tuple[ThumbnailKey, bytes]:
+    return shared_thumbnail_cache(disk_dir).get_png(path, size, crop=crop)
+
+
+def _worker_caches() -> tuple[dict[str, object], dict[str, int]]:
+    with _SHARED_LOCK:
+        shared = list(_SHARED.values())
+    if not shared:
+        return {}, {}
+    # Workers only ever see the one thumbnail directory the app passes them.
+    cache = shared[0]
+    return {"thumbnail_tiles": cache.memory, "thumbnail_png": cache.encoded}, {"thumbnail": cache.disk_hits}
+
+
+track_worker_caches(_worker_caches)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    seconds: float | None = None
+    error: str | None = None
+
+
+class Warmup:
+    """Background cache priming with a readiness flag.
+
+    A failing step is recorded and skipped; the instance still becomes
+    ready, it just serves that path cold.
+    """
+
+    def __init__(self) -> None:
+        self.steps: list[WarmupStep] = []
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def run(self, steps: list[tuple[str, Callable[[], Any]]]) -> None:
+        self.started_at = time.monotonic()
+        try:
+            for name, fn in steps:
+                step = WarmupStep(name)
+                with self._lock:
+                    self.steps.append(step)
+                start = time.perf_counter()
+                try:
+                    fn()
+                except Exception as exc:
+                    step.error = f"{type(exc).__name__}: {exc}"
+                step.seconds = round(time.perf_counter() - start, 4)
+        finally:
+            self.finished_at = time.monotonic()
+            self._ready.set()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            steps = [
+                {"name": step.name, "seconds": step.seconds, "error": step.error}
+                for step in self.steps
+            ]
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 4)
+        return {"ready": self.ready, "elapsed_s": elapsed, "steps": steps}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time the backend hot paths and compare against a stored baseline.",
+    )
+    parser.add_argument("-k", "--filter", action="append", default=[], help="only cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer runs per case, for a smoke check")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="regression ratio, default 0.15 (15%%)")
+    parser.add_argument("--json", type=Path, help="also write this run's results to a file")
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    args = parser.parse_args()
+
+    # Benchmarks measure the code paths themselves, not the metrics timers wrapped around them.
+    os.environ.setdefault("TEAPOT_METRICS", "0")
+    from .cases import build_cases, temporary_workdir
+    from .harness import compare, environment, measure
+
+    with temporary_workdir() as workdir:
+        cases, store = build_cases(Path(workdir))
+        if args.filter:
+            cases = [case for case in cases if any(term in case.name for term in args.filter)]
+        if args.list:
+            print("\n".join(case.name for case in cases))
+            return 0
+
+        runs = {"min_runs": 2, "max_runs": 5, "min_time_s": 0.1} if args.quick else {}
+        results = []
+        print(f"{'case':<44} {'median ms':>10} {'p95 ms':>10} {'throughput':>16} {'peak KiB':>10}")
+        for case in cases:
+            result = measure(case, **runs)
+            results.append(result)
+            rate = f"{result.throughput_per_s:.1f} {result.unit}/s"
+            print(f"{case.name:<44} {result.median_ms:>10.3f} {result.p95_ms:>10.3f} {rate:>16} {result.peak_memory_kb:>10.1f}")
+        store.flush()
+
+    report = {"environment": environment(), "results": {r.name: r.to_json() for r in results}}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = False
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        rows = compare(results, baseline, args.threshold)
+        regressions = [row for row in rows if row["regressed"]]
+        print(f"\nCompared {len(rows)} cases with {args.baseline} (threshold {args.threshold:.0%}).")
+        for row in regressions:
+            print(
+                f"  REGRESSION {row['name']}: {row['baseline_median_ms']:.3f} -> {row['median_ms']:.3f} ms "
+                f"(x{row['time_ratio']}, memory x{row['memory_ratio']})"
+            )
+        if baseline.get("environment", {}).get("machine") != report["environment"]["machine"]:
+            print("  note: the baseline was recorded on a different machine type")
+        failed = bool(regressions)
+    elif not args.save_baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+
+    if args.save_baseline:
+        if args.filter and args.baseline.exists():
+            # Partial runs update their cases and keep the rest of the baseline.
+            merged = json.loads(args.baseline.read_text(encoding="utf-8"))
+            merged["environment"] = report["environment"]
+            merged.setdefault("results", {}).update(report["results"])
+            report = merged
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from backend.analysis import _analyze_single_image, analyze_images
+from backend.blueprint import build_blueprint, refresh_blueprint
+from backend.exporters import (
+    export_dxf_bytes,
+    export_json_bytes,
+    export_obj_bytes,
+    export_pptx_bytes,
+    export_svg_bytes,
+)
+from backend.geometry import GEOMETRY_CACHE, teapot_geometry
+from backend.mesh import MeshBuilder, build_viewer_parts, encode_mesh_parts
+from backend.prototype import LAYER_CACHES, RENDER_TIERS, render_prototype_v1
+from backend.store import ContentStore
+from backend.thumbnails import ThumbnailCache
+
+from .harness import Case
+
+# Synthetic photo sizes: phone thumbnail, 1080p and a 12 MP camera frame.
+IMAGE_SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+# Design scale stands in for model complexity: the exporters' tessellation is fixed.
+CUPS_LEVELS = (1.0, 4.0, 12.0)
+LATHE_SEGMENTS = (32, 64, 128, 256)
+EXPORTERS = {
+    "json": export_json_bytes,
+    "dxf": export_dxf_bytes,
+    "svg": export_svg_bytes,
+    "obj": export_obj_bytes,
+    "pptx": export_pptx_bytes,
+}
+
+
+def _synthetic_image(path: Path, size: tuple[int, int], seed: int) -> Path:
+    """Smooth gradients plus noise, so JPEG decode cost resembles a real photo."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack(
+        [
+            128 + 100 * np.sin(x / (width / 6.0)),
+            128 + 90 * np.cos(y / (height / 5.0)),
+            96 + 80 * np.sin((x + y) / (width / 4.0)),
+        ],
+        axis=-1,
+    )
+    noisy = base + rng.normal(0.0, 18.0, base.shape)
+    Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).save(path, quality=90)
+    return path
+
+
+def _clear_design_caches() -> None:
+    # A new design misses the geometry cache, so the export cases pay for it every call.
+    GEOMETRY_CACHE.cache_clear()
+
+
+def _clear_render_caches() -> None:
+    for cache in LAYER_CACHES.values():
+        cache.cache_clear()
+    _clear_design_caches()
+
+
+def build_cases(workdir: Path) -> tuple[list[Case], ContentStore]:
+    """All cases, plus the export store the render cases write to (flush it before ``workdir`` goes)."""
+    cases: list[Case] = []
+
+    images = [
+        _synthetic_image(workdir / f"synthetic_{w}x{h}.jpg", (w, h), seed)
+        for seed, (w, h) in enumerate(IMAGE_SIZES)
+    ]
+    for path, (w, h) in zip(images, IMAGE_SIZES):
+        cases.append(
+            Case(
+                f"analysis.single_image[{w}x{h}]",
+                lambda p=path: _analyze_single_image(p),
+                unit="image",
+                group="analysis",
+            )
+        )
+    cases.append(
+        Case(
+            f"analysis.analyze_images[{len(images)} images]",
+            lambda: analyze_images(images),
+            items=len(images),
+            unit="image",
+            group="analysis",
+        )
+    )
+
+    for cups in CUPS_LEVELS:
+        cases.append(Case(f"blueprint.build[{cups:g} cups]", lambda c=cups: build_blueprint(cups=c), group="blueprint"))
+    default = build_blueprint(cups=4.0)
+    cases.append(Case("blueprint.refresh", lambda: refresh_blueprint(default), group="blueprint"))
+
+    for cups in CUPS_LEVELS:
+        blueprint = build_blueprint(cups=cups)
+        for fmt, exporter in EXPORTERS.items():
+            cases.append(
+                Case(
+                    f"export.{fmt}[{cups:g} cups]",
+                    lambda b=blueprint, e=exporter: e(b),
+                    setup=_clear_design_caches,
+                    unit="export",
+                    group="export",
+                )
+            )
+        cases.append(
+            Case(
+                f"export.viewer_mesh[{cups:g} cups]",
+                lambda b=blueprint: encode_mesh_parts(build_viewer_parts(teapot_geometry(b.dimensions))),
+                setup=_clear_design_caches,
+                unit="export",
+                group="export",
+            )
+        )
+
+    body_profile = list(teapot_geometry(default.dimensions).body_profile)
+    for segments in LATHE_SEGMENTS:
+
+        def lathe(n: int = segments) -> None:
+            mesh = MeshBuilder()
+            mesh.add_lathe(body_profile, segments=n, close_bottom=True)
+            mesh.vertex_normals()
+
+        cases.append(Case(f"mesh.lathe_normals[{segments} segments]", lathe, group="mesh"))
+
+    store = ContentStore(workdir / "exports")
+    image_set = images[:2]
+    cold = {"thumbnails": ThumbnailCache(disk_dir=None)}
+
+    def cold_start() -> None:
+        # Fresh layers, isometric tile, fonts and source thumbnails.
+        _clear_render_caches()
+        cold["thumbnails"] = ThumbnailCache(disk_dir=None)
+
+    warm_thumbnails = ThumbnailCache(disk_dir=None)
+    for tier_name, tier in RENDER_TIERS.items():
+        cases.append(
+            Case(
+                f"prototype.render_v1[{tier_name}, warm layers]",
+                lambda t=tier: render_prototype_v1(default, image_set, store, warm_thumbnails, tier=t),
+                unit="sheet",
+                group="prototype",
+            )
+        )
+        cases.append(
+            Case(
+                f"prototype.render_v1[{tier_name}, cold]",
+                lambda t=tier: render_prototype_v1(default, image_set, store, cold["thumbnails"], tier=t),
+                setup=cold_start,
+                unit="sheet",
+                group="prototype",
+            )
+        )
+    return cases, store
+
+
+def temporary_workdir() -> tempfile.TemporaryDirectory:
+    return tempfile.TemporaryDirectory(prefix="teapot-bench-")
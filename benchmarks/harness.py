@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import gc
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+
+@dataclass
+class Case:
+    """One benchmark: ``run`` is timed; ``setup`` runs before every call, untimed.
+
+    ``items`` is the amount of work one call does (images, exports, ...) and
+    drives the throughput figure.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+    items: int = 1
+    unit: str = "call"
+    group: str = ""
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    runs: int
+    mean_ms: float
+    median_ms: float
+    min_ms: float
+    p95_ms: float
+    stdev_ms: float
+    throughput_per_s: float
+    unit: str
+    peak_memory_kb: float
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(case: Case, min_runs: int = 5, max_runs: int = 200, min_time_s: float = 1.0) -> Result:
+    """Time ``case`` until both ``min_runs`` and ``min_time_s`` are reached, then once more under tracemalloc."""
+    if case.setup:
+        case.setup()
+    case.run()  # warm imports and lazy state
+
+    samples: list[float] = []
+    spent = 0.0
+    while len(samples) < max_runs and (len(samples) < min_runs or spent < min_time_s):
+        if case.setup:
+            case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        case.run()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        spent += elapsed
+
+    # Separate pass: tracemalloc slows allocation-heavy code, so it must not skew the timings.
+    if case.setup:
+        case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.fmean(samples)
+    return Result(
+        name=case.name,
+        group=case.group,
+        runs=len(samples),
+        mean_ms=round(mean * 1000.0, 4),
+        median_ms=round(statistics.median(samples) * 1000.0, 4),
+        min_ms=round(min(samples) * 1000.0, 4),
+        p95_ms=round(_percentile(samples, 0.95) * 1000.0, 4),
+        stdev_ms=round(statistics.stdev(samples) * 1000.0, 4) if len(samples) > 1 else 0.0,
+        throughput_per_s=round(case.items / mean, 3) if mean > 0 else 0.0,
+        unit=case.unit,
+        peak_memory_kb=round(peak / 1024.0, 1),
+    )
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, Any],
+    threshold: float,
+    memory_floor_kb: float = 256.0,
+) -> list[dict[str, Any]]:
+    """Rows for every case in both runs; ``regressed`` marks median time or peak memory over the threshold."""
+    previous = baseline.get("results", {})
+    rows = []
+    for result in results:
+        before = previous.get(result.name)
+        if before is None:
+            continue
+        time_ratio = result.median_ms / before["median_ms"] if before["median_ms"] else 1.0
+        memory_ratio = result.peak_memory_kb / before["peak_memory_kb"] if before["peak_memory_kb"] else 1.0
+        # Tiny allocations jitter by whole pages; ignore memory drift below the floor.
+        memory_regressed = (
+            memory_ratio > 1.0 + threshold
+            and result.peak_memory_kb - before["peak_memory_kb"] > memory_floor_kb
+        )
+        rows.append(
+            {
+                "name": result.name,
+                "baseline_median_ms": before["median_ms"],
+                "median_ms": result.median_ms,
+                "time_ratio": round(time_ratio, 3),
+                "memory_ratio": round(memory_ratio, 3),
+                "regressed": time_ratio > 1.0 + threshold or memory_regressed,
+            }
+        )
+    return rows
@@ -9,6 +9,18 @@ const state = {
   backendChecked: false,
   prototypeUrl: "",
   teapotGroup: null,
+  meshUrl: "",
+  serverMesh: null,
+  serverMeshRequest: "",
+  designId: null,
+  designSnapshot: "",
+  live: {
+    socket: null,
+    open: false,
+    seq: 0,
+    synced: null,
+    waiters: [],
+  },
   recomputeTimer: null,
   playgroundTimer: null,
   playground: {
@@ -1154,6 +1166,125 @@ async function apiPost(path, body = null) {
   return response;
 }
 
+function rememberDesign(designId) {
+  state.designId = designId || null;
+  state.designSnapshot = designId ? JSON.stringify(state.blueprint) : "";
+}
+
+function designReference() {
+  // Reference the stored version instead of re-uploading it, unless edited since.
+  if (state.designId && state.designSnapshot === JSON.stringify(state.blueprint)) {
+    return { design_id: state.designId };
+  }
+  return { blueprint: state.blueprint };
+}
+
+function materialSelections(materials) {
+  return Object.fromEntries((materials || []).map((m) => [m.part_key, m.selected || m.recommended]));
+}
+
+function materialShape(materials) {
+  // Everything except the selection, which travels as a field edit.
+  return JSON.stringify((materials || []).map(({ selected, ...rest }) => rest));
+}
+
+function liveSnapshot(blueprint) {
+  return {
+    dimensions: { ...blueprint.dimensions },
+    materials: materialSelections(blueprint.materials),
+    materialShape: materialShape(blueprint.materials),
+  };
+}
+
+function settleLiveWaiters(seq, error = null) {
+  const live = state.live;
+  live.waiters = live.waiters.filter((waiter) => {
+    if (waiter.seq > seq) {
+      return true;
+    }
+    if (error) {
+      waiter.reject(error);
+    } else {
+      waiter.resolve(waiter.seq);
+    }
+    return false;
+  });
+}
+
+function onLiveMessage(message) {
+  const live = state.live;
+  if (message.type === "error") {
+    // Server state is unchanged; resend the full design on the next edit.
+    live.synced = null;
+    settleLiveWaiters(message.seq ?? live.seq, new Error(message.message));
+    return;
+  }
+
+  if (message.type === "ready" || message.type === "snapshot") {
+    state.blueprint = message.blueprint;
+    live.synced = liveSnapshot(message.blueprint);
+  } else if (message.type === "delta" && state.blueprint) {
+    const changes = message.changes || {};
+    Object.assign(state.blueprint.dimensions, changes.dimensions || {});
+    Object.assign(live.synced?.dimensions || {}, changes.dimensions || {});
+    for (const item of changes.bom || []) {
+      const index = state.blueprint.bom.findIndex((entry) => entry.part_key === item.part_key);
+      if (index >= 0) {
+        state.blueprint.bom[index] = item;
+      }
+    }
+  }
+  state.meshUrl = message.mesh_url || state.meshUrl;
+  if (message.seq === live.seq) {
+    rememberDesign(message.design_id);
+  }
+  settleLiveWaiters(message.seq);
+}
+
+function connectLiveChannel() {
+  const live = state.live;
+  if (state.localMode || live.socket || typeof WebSocket === "undefined") {
+    return;
+  }
+  const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+  const socket = new WebSocket(`${protocol}//${window.location.host}/api/ws/blueprint`);
+  live.socket = socket;
+  socket.addEventListener("open", () => {
+    live.open = true;
+  });
+  socket.addEventListener("message", (event) => onLiveMessage(JSON.parse(event.data)));
+  socket.addEventListener("close", () => {
+    live.socket = null;
+    live.open = false;
+    live.synced = null;
+    settleLiveWaiters(Number.POSITIVE_INFINITY, new Error("Live channel closed"));
+  });
+}
+
+function sendLiveUpdate() {
+  const live = state.live;
+  const blueprint = state.blueprint;
+  const seq = ++live.seq;
+  let message;
+
+  if (!live.synced || live.synced.materialShape !== materialShape(blueprint.materials)) {
+    message = { type: "init", seq, ...designReference() };
+  } else {
+    const diff = (next, previous) =>
+      Object.fromEntries(Object.entries(next).filter(([key, value]) => previous[key] !== value));
+    message = {
+      type: "set",
+      seq,
+      dimensions: diff(blueprint.dimensions, live.synced.dimensions),
+      materials: diff(materialSelections(blueprint.materials), live.synced.materials),
+    };
+  }
+
+  live.synced = liveSnapshot(blueprint);
+  live.socket.send(JSON.stringify(message));
+  return new Promise((resolve, reject) => live.waiters.push({ seq, resolve, reject }));
+}
+
 function renderImages() {
   els.imageStrip.innerHTML = "";
   els.imageCountBadge.textContent = `${state.images.length} files`;
@@ -1842,9 +1973,82 @@ function drawPartPrints() {
   addText(28, 18, "DETACHED PART PRINTS - mm", 12, "#1d4d5c");
 }
 
+const MESH_MAGIC = 0x314d5054; // "TPM1", little-endian
+
+function parseMeshPayload(buffer) {
+  const view = new DataView(buffer);
+  if (view.getUint32(0, true) !== MESH_MAGIC) {
+    throw new Error("Unexpected mesh payload");
+  }
+  const headerLength = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+  const floatsPerVertex = header.stride / 4;
+
+  const parts = {};
+  for (const part of header.parts) {
+    // Views straight into the response buffer; offsets are 4-byte aligned.
+    const vertices = new Float32Array(buffer, part.vertex_offset, part.vertex_count * floatsPerVertex);
+    const interleaved = new THREE.InterleavedBuffer(vertices, floatsPerVertex);
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute("position", new THREE.InterleavedBufferAttribute(interleaved, 3, 0));
+    geometry.setAttribute("normal", new THREE.InterleavedBufferAttribute(interleaved, 3, 3));
+    geometry.setIndex(new THREE.BufferAttribute(new Uint32Array(buffer, part.index_offset, part.index_count), 1));
+    parts[part.name] = geometry;
+  }
+  return parts;
+}
+
+function serverMeshUrl() {
+  if (!state.meshUrl) {
+    return "";
+  }
+  const pct = Math.round(getHeadCurvatureScale() * 100);
+  return pct === 100 ? state.meshUrl : `${state.meshUrl}?curvature=${pct}`;
+}
+
+async function loadServerMesh() {
+  const url = serverMeshUrl();
+  if (!url || state.localMode || state.serverMesh?.url === url || state.serverMeshRequest === url) {
+    return;
+  }
+  state.serverMeshRequest = url;
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`GET ${url} failed: ${response.status}`);
+    }
+    const parts = parseMeshPayload(await response.arrayBuffer());
+    if (serverMeshUrl() !== url) {
+      return;
+    }
+    state.serverMesh = { url, parts };
+    renderThreeModel();
+  } catch (error) {
+    // Without the server the viewer falls back to the local lathe.
+    if (serverMeshUrl() === url) {
+      state.serverMesh = null;
+      renderThreeModel();
+    }
+  } finally {
+    if (state.serverMeshRequest === url) {
+      state.serverMeshRequest = "";
+    }
+  }
+}
+
+function getServerMeshParts() {
+  // The server builds the viewer geometry. While a newer mesh loads the last one
+  // stays on screen; the local lathe is only for local mode or a failed fetch.
+  if (state.localMode || !state.serverMesh) {
+    return null;
+  }
+  return state.serverMesh.parts;
+}
+
 function buildTeapotGroup(dim) {
   const group = new THREE.Group();
   const palette = resolveThreeMaterialPalette();
+  const serverParts = getServerMeshParts();
 
   const steel = new THREE.MeshStandardMaterial({
     color: new THREE.Color(palette.primaryColor),
@@ -1872,6 +2076,15 @@ function buildTeapotGroup(dim) {
     roughness: 0.88,
   });
 
+  if (serverParts) {
+    // Server buffers mix lathe and tube winding, so render both faces.
+    for (const material of [steel, steelDark, handleMat, gasketMat]) {
+      material.side = THREE.DoubleSide;
+    }
+  }
+  // Local builders are the offline fallback; normally every part is a server buffer.
+  const partGeometry = (name, build) => serverParts?.[name] || build();
+
   const bodyH = dim.body_height_mm;
   const overallH = dim.overall_height_mm;
   const profileOptions = getProfileOptions();
@@ -1879,8 +2092,10 @@ function buildTeapotGroup(dim) {
   const rHead = dim.head_top_diameter_mm * 0.5;
   const rNeck = dim.neck_diameter_mm * 0.5;
 
-  const bodyProfile = toLatheProfile(buildBodyProfilePoints(dim, 52));
-  const bodyGeo = new THREE.LatheGeometry(bodyProfile, 96);
+  const bodyGeo = partGeometry(
+    "body_shell",
+    () => new THREE.LatheGeometry(toLatheProfile(buildBodyProfilePoints(dim, 52)), 96),
+  );
   const bodyMesh = new THREE.Mesh(bodyGeo, steel);
   bodyMesh.castShadow = true;
   bodyMesh.receiveShadow = true;
@@ -1888,8 +2103,10 @@ function buildTeapotGroup(dim) {
   group.add(bodyMesh);
 
   const headStart = bodyH - dim.head_neck_overlap_mm;
-  const headProfile = toLatheProfile(buildHeadProfilePoints(dim, 34, headStart, profileOptions));
-  const headGeo = new THREE.LatheGeometry(headProfile, 96);
+  const headGeo = partGeometry(
+    "curved_head",
+    () => new THREE.LatheGeometry(toLatheProfile(buildHeadProfilePoints(dim, 34, headStart, profileOptions)), 96),
+  );
   const headMesh = new THREE.Mesh(headGeo, steel);
   headMesh.castShadow = true;
   headMesh.name = "curved_head";
@@ -1905,31 +2122,37 @@ function buildTeapotGroup(dim) {
     new THREE.Vector2(insertInner, overallH - insertH),
     new THREE.Vector2(insertInner, overallH),
   ];
-  const insertGeo = new THREE.LatheGeometry(insertProfile, 64);
+  const insertGeo = partGeometry("insert_filter", () => new THREE.LatheGeometry(insertProfile, 64));
   const insertMesh = new THREE.Mesh(insertGeo, steelDark);
   insertMesh.name = "insert_filter";
   group.add(insertMesh);
 
-  const gasketGeo = new THREE.TorusGeometry(
-    rNeck,
-    Math.max(dim.gasket_cross_section_mm * 0.5, 1),
-    16,
-    90,
+  const gasketGeo = partGeometry(
+    "gasket",
+    () => new THREE.TorusGeometry(rNeck, Math.max(dim.gasket_cross_section_mm * 0.5, 1), 16, 90),
   );
   const gasketMesh = new THREE.Mesh(gasketGeo, gasketMat);
-  gasketMesh.rotation.x = Math.PI / 2;
-  gasketMesh.position.y = bodyH + 1;
+  if (!serverParts?.gasket) {
+    gasketMesh.rotation.x = Math.PI / 2;
+    gasketMesh.position.y = bodyH + 1;
+  }
   gasketMesh.name = "gasket";
   group.add(gasketMesh);
 
-  const baseGeo = new THREE.CylinderGeometry(
-    dim.base_cap_diameter_mm * 0.5,
-    dim.base_cap_diameter_mm * 0.5,
-    dim.base_cap_height_mm,
-    60,
+  const baseGeo = partGeometry(
+    "base_cap",
+    () =>
+      new THREE.CylinderGeometry(
+        dim.base_cap_diameter_mm * 0.5,
+        dim.base_cap_diameter_mm * 0.5,
+        dim.base_cap_height_mm,
+        60,
+      ),
   );
   const baseMesh = new THREE.Mesh(baseGeo, steelDark);
-  baseMesh.position.y = dim.base_cap_height_mm * 0.5;
+  if (!serverParts?.base_cap) {
+    baseMesh.position.y = dim.base_cap_height_mm * 0.5;
+  }
   baseMesh.name = "base_cap";
   group.add(baseMesh);
 
@@ -1945,12 +2168,9 @@ function buildTeapotGroup(dim) {
     ),
   ]);
 
-  const handleGeo = new THREE.TubeGeometry(
-    curve,
-    48,
-    Math.max(dim.handle_thickness_mm * 0.5, 2),
-    16,
-    false,
+  const handleGeo = partGeometry(
+    "handle",
+    () => new THREE.TubeGeometry(curve, 48, Math.max(dim.handle_thickness_mm * 0.5, 2), 16, false),
   );
   const handleMesh = new THREE.Mesh(handleGeo, handleMat);
   handleMesh.castShadow = true;
@@ -2107,14 +2327,37 @@ function renderAll() {
   }
 }
 
+async function recomputeBlueprintHttp() {
+  const parent = state.designId ? `?parent_id=${encodeURIComponent(state.designId)}` : "";
+  const response = await apiPost(`/api/blueprint/recompute${parent}`, state.blueprint);
+  const data = await response.json();
+  state.blueprint = data.blueprint;
+  state.meshUrl = data.mesh_url || "";
+  rememberDesign(data.design_id);
+}
+
 async function recomputeBlueprint(statusMessage = "Blueprint recomputed.") {
   if (!state.blueprint) {
     return;
   }
-  const response = await apiPost("/api/blueprint/recompute", state.blueprint);
-  const data = await response.json();
-  state.blueprint = data.blueprint;
+  if (state.live.open) {
+    try {
+      const seq = await sendLiveUpdate();
+      if (seq !== state.live.seq) {
+        // A newer edit is in flight; its reply renders the final state.
+        return;
+      }
+    } catch (error) {
+      if (state.live.open) {
+        throw error;
+      }
+      await recomputeBlueprintHttp();
+    }
+  } else {
+    await recomputeBlueprintHttp();
+  }
   renderAll();
+  loadServerMesh();
   if (statusMessage) {
     setStatus(statusMessage, "ok");
   }
@@ -2138,7 +2381,8 @@ function queueRecompute(immediate = false) {
     }
   };
 
-  if (immediate) {
+  // The live channel coalesces bursts on the server, so no debounce there.
+  if (immediate || state.live.open) {
     run();
   } else {
     state.recomputeTimer = window.setTimeout(run, 360);
@@ -2158,9 +2402,13 @@ async function loadDefaultBlueprint() {
   const payload = await apiGet(`/api/blueprint/default?cups=${encodeURIComponent(cups)}`);
   state.blueprint = payload.blueprint;
   state.analysis = payload.analysis;
+  state.meshUrl = payload.mesh_url || "";
+  rememberDesign(payload.design_id);
+  connectLiveChannel();
   initPlaygroundFromBlueprint();
   resetThreeFormControls();
   renderAll();
+  loadServerMesh();
   await generatePrototype();
   setStatus("Blueprint baseline loaded from image analysis.", "ok");
 }
@@ -2739,23 +2987,40 @@ async function generatePrototype() {
     }
   }
 
-  try {
-    const response = await fetch("/api/prototype/v1", {
+  const requestPrototype = async (tier) => {
+    const response = await fetch(`/api/prototype/v1?tier=${tier}`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ blueprint: state.blueprint }),
+      body: JSON.stringify(designReference()),
     });
-
     if (!response.ok) {
       throw new Error(`Prototype generation failed: ${response.status}`);
     }
+    return response;
+  };
 
+  const showPrototype = async (response) => {
     const blob = await response.blob();
     if (state.prototypeUrl) {
       URL.revokeObjectURL(state.prototypeUrl);
     }
     state.prototypeUrl = URL.createObjectURL(blob);
     els.prototypeImage.src = state.prototypeUrl;
+  };
+
+  try {
+    // A reduced-scale preview lands first; the full sheet replaces it when ready.
+    const fullRequest = requestPrototype("full");
+    fullRequest.catch(() => {});
+    try {
+      await showPrototype(await requestPrototype("preview"));
+      els.prototypeMeta.textContent = "Preview ready. Rendering full-quality sheet...";
+    } catch (error) {
+      // The full render below reports failures.
+    }
+
+    const response = await fullRequest;
+    await showPrototype(response);
 
     const path = response.headers.get("X-Prototype-Path") || "exports folder";
     els.prototypeMeta.textContent = `Prototype generated from image set. Saved at ${path}`;
@@ -2821,7 +3086,7 @@ async function exportBlueprint(format) {
     const response = await fetch(`/api/export/${format}`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ blueprint: state.blueprint, options: {} }),
+      body: JSON.stringify({ ...designReference(), options: {} }),
     });
 
     if (!response.ok) {
@@ -2941,6 +3206,7 @@ function bindEvents() {
     drawBlueprint();
     drawPartPrints();
     renderThreeModel();
+    loadServerMesh();
   };
 
   if (els.threeHeadCurvature) {
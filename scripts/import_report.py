@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# Dependencies that should stay out of start-up; see backend/lazy.py.
+DEFERRED_PACKAGES = ("numpy", "PIL", "pptx", "lxml")
+HEALTH_CHECK = """
+import asyncio, inspect
+import {module} as app
+result = app.health()
+if inspect.isawaitable(result):
+    result = asyncio.run(result)
+assert result["status"] == "ok", result
+"""
+
+
+def _run(code: str, *flags: str) -> tuple[float, str]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR), TEAPOT_WARMUP="0")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, proc.stderr
+
+
+def parse_importtime(stderr: str) -> list[dict[str, object]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        rows.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000.0,
+                "cumulative_ms": int(cumulative_us) / 1000.0,
+            }
+        )
+    return rows
+
+
+def build_report(module: str, top: int) -> dict[str, object]:
+    _, stderr = _run(f"import {module}", "-X", "importtime")
+    rows = parse_importtime(stderr)
+    top_level = [row for row in rows if row["depth"] == 0]
+    packages = {str(row["module"]).split(".")[0] for row in rows}
+
+    # Wall clock for a fresh interpreter to import the app and answer a health check.
+    # The handler may be async; a warning such as a never-awaited coroutine means it did not run.
+    cold_start, stderr = _run(HEALTH_CHECK.format(module=module))
+    if "Warning:" in stderr:
+        raise RuntimeError(f"The health check did not run cleanly:\n{stderr}")
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "total_import_ms": round(sum(float(row["cumulative_ms"]) for row in top_level), 1),
+        "cold_start_to_health_ms": round(cold_start * 1000.0, 1),
+        "deferred_packages_loaded": sorted(p for p in DEFERRED_PACKAGES if p in packages),
+        "top_cumulative": sorted(
+            (row for row in rows if row["depth"] <= 1),
+            key=lambda row: row["cumulative_ms"],
+            reverse=True,
+        )[:top],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Summarise python -X importtime for the backend.")
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    parser.add_argument("--budget-ms", type=float, help="exit 1 if the cold start exceeds this")
+    args = parser.parse_args()
+
+    report = build_report(args.module, args.top)
+    print(f"{report['module']} on Python {report['python']}")
+    print(f"  import total:          {report['total_import_ms']:8.1f} ms")
+    print(f"  cold start to health:  {report['cold_start_to_health_ms']:8.1f} ms")
+    print(f"  deferred deps loaded:  {', '.join(report['deferred_packages_loaded']) or 'none'}")
+    print("  slowest imports (cumulative):")
+    for row in report["top_cumulative"]:
+        print(f"    {row['cumulative_ms']:8.1f} ms  {'  ' * int(row['depth'])}{row['module']}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = False
+    if report["deferred_packages_loaded"]:
+        print("Error: heavy dependencies are imported at start-up")
+        failed = True
+    if args.budget_ms is not None and report["cold_start_to_health_ms"] > args.budget_ms:
+        print(f"Error: cold start exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
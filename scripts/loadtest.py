@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from backend.blueprint import build_blueprint  # noqa: E402
+
+EXPORT_FORMATS = ("json", "dxf", "svg", "obj", "pptx")
+DEFAULT_MIX = "recompute=50,default=20,export=20,prototype=10"
+# A slider drag sends a short run of recomputes with a slowly changing value.
+SLIDER_BURST = 6
+SLIDER_FIELDS = (
+    "body_height_mm",
+    "body_max_diameter_mm",
+    "head_height_mm",
+    "head_top_diameter_mm",
+    "handle_length_mm",
+)
+
+Request = tuple[str, str, str, bytes | None]  # (label, method, path, JSON body)
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered) + self.errors
+
+        def pct(fraction: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000.0, 2)
+
+        failed = self.errors + sum(n for status, n in self.statuses.items() if status >= 500)
+        return {
+            "requests": count,
+            "rps": round(count / seconds, 2) if seconds else 0.0,
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] * 1000.0, 2) if ordered else None,
+            "error_rate": round(failed / count, 4) if count else 0.0,
+            "rejected_503": self.statuses.get(503, 0),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class TrafficMix:
+    """Weighted scenarios that each yield one or more requests built from real blueprints."""
+
+    def __init__(self, weights: dict[str, float], rng: random.Random, designs: int = 8) -> None:
+        unknown = set(weights) - set(self.scenarios)
+        if unknown:
+            raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.rng = rng
+        # A small pool of designs, so repeated exports exercise the caches as real users do.
+        self.blueprints = [
+            json.loads(build_blueprint(cups=rng.choice((2.0, 3.0, 4.0, 6.0, 8.0))).model_dump_json())
+            for _ in range(designs)
+        ]
+
+    @property
+    def scenarios(self) -> dict[str, Callable[[], list[Request]]]:
+        return {
+            "recompute": self._recompute_burst,
+            "default": self._default,
+            "export": self._export,
+            "prototype": self._prototype,
+        }
+
+    def _body(self, blueprint: dict[str, Any]) -> bytes:
+        return json.dumps(blueprint).encode("utf-8")
+
+    def _recompute_burst(self) -> list[Request]:
+        blueprint = json.loads(json.dumps(self.rng.choice(self.blueprints)))
+        name = self.rng.choice(SLIDER_FIELDS)
+        step = self.rng.choice((-1.0, 1.0)) * self.rng.uniform(0.5, 2.0)
+        requests = []
+        for _ in range(SLIDER_BURST):
+            blueprint["dimensions"][name] = round(blueprint["dimensions"][name] + step, 2)
+            requests.append(("recompute", "POST", "/api/blueprint/recompute", self._body(blueprint)))
+        return requests
+
+    def _default(self) -> list[Request]:
+        cups = self.rng.choice((2, 4, 6, 8))
+        return [("default", "GET", f"/api/blueprint/default?cups={cups}", None)]
+
+    def _export(self) -> list[Request]:
+        fmt = self.rng.choice(EXPORT_FORMATS)
+        body = self._body({"blueprint": self.rng.choice(self.blueprints)})
+        return [(f"export.{fmt}", "POST", f"/api/export/{fmt}", body)]
+
+    def _prototype(self) -> list[Request]:
+        tier = self.rng.choice(("preview", "preview", "full"))
+        body = self._body({"blueprint": self.rng.choice(self.blueprints)})
+        return [(f"prototype.{tier}", "POST", f"/api/prototype/v1?tier={tier}", body)]
+
+    def next(self) -> list[Request]:
+        return self.scenarios[self.rng.choices(self.names, self.weights)[0]]()
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    weights = {}
+    for part in raw.split(","):
+        if part.strip():
+            name, _, weight = part.partition("=")
+            weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def _worker(
+    host: str,
+    port: int,
+    mix: TrafficMix,
+    deadline: float,
+    stats: dict[str, EndpointStats],
+    lock: threading.Lock,
+) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    local: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    while time.perf_counter() < deadline:
+        for label, method, path, body in mix.next():
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                local[label].errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=120)
+                continue
+            local[label].latencies.append(time.perf_counter() - start)
+            local[label].statuses[status] += 1
+    conn.close()
+    with lock:
+        for label, item in local.items():
+            merged = stats[label]
+            merged.latencies += item.latencies
+            merged.errors += item.errors
+            for status, n in item.statuses.items():
+                merged.statuses[status] += n
+
+
+def run_level(host: str, port: int, concurrency: int, duration: float, weights: dict[str, float], seed: int) -> dict:
+    stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    lock = threading.Lock()
+    mixes = [TrafficMix(weights, random.Random(seed + i)) for i in range(concurrency)]
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(host, port, mix, deadline, stats, lock))
+        for mix in mixes
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Workers finish their in-flight scenario after the deadline; count the real elapsed time.
+    elapsed = time.perf_counter() - start
+
+    total = EndpointStats()
+    for item in stats.values():
+        total.latencies += item.latencies
+        total.errors += item.errors
+        for status, n in item.statuses.items():
+            total.statuses[status] += n
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "total": total.summary(elapsed),
+        "endpoints": {label: stats[label].summary(elapsed) for label in sorted(stats)},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(workdir: Path) -> tuple[str, int, Callable[[], None]]:
+    """Serve the app with uvicorn on a background thread, writing exports and caches to ``workdir``."""
+    os.environ.setdefault("TEAPOT_EXPORT_DIR", str(workdir / "exports"))
+    os.environ.setdefault("TEAPOT_CACHE_DIR", str(workdir / "cache"))
+    import uvicorn
+
+    from backend.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="loadtest-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.05)
+
+    def stop() -> None:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+    return "127.0.0.1", port, stop
+
+
+def wait_ready(host: str, port: int, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        try:
+            conn.request("GET", "/api/health/ready")
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.25)
+    raise RuntimeError("server did not become ready")
+
+
+def _print_level(level: dict) -> None:
+    total = level["total"]
+    print(
+        f"\nconcurrency {level['concurrency']}: {total['requests']} requests in {level['seconds']} s, "
+        f"{total['rps']} req/s, p50 {total['p50_ms']} ms, p99 {total['p99_ms']} ms, errors {total['error_rate']:.2%}"
+    )
+    print(f"  {'endpoint':<20} {'reqs':>6} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'err':>7} {'503':>5}")
+    for label, row in level["endpoints"].items():
+        print(
+            f"  {label:<20} {row['requests']:>6} {row['rps']:>8.2f} {row['p50_ms'] or 0:>9.2f} "
+            f"{row['p90_ms'] or 0:>9.2f} {row['p99_ms'] or 0:>9.2f} {row['error_rate']:>7.2%} {row['rejected_503']:>5}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a realistic API traffic mix at rising concurrency.")
+    parser.add_argument("--url", help="target server, e.g. http://127.0.0.1:8000 (default: start one in-process)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    TrafficMix(weights, random.Random(args.seed), designs=1)  # validate scenario names early
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="teapot-load-") as workdir:
+        stop: Callable[[], None] = lambda: None
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname or "127.0.0.1", parts.port or 80
+        else:
+            # Client and server share one interpreter here; use --url for numbers that size an instance.
+            host, port, stop = start_local_server(Path(workdir))
+        try:
+            wait_ready(host, port)
+            print(f"target http://{host}:{port}, mix {weights}, {args.duration:g} s per level")
+            report = {"target": f"http://{host}:{port}", "mix": weights, "levels": []}
+            for concurrency in levels:
+                level = run_level(host, port, concurrency, args.duration, weights, args.seed)
+                report["levels"].append(level)
+                _print_level(level)
+        finally:
+            stop()
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# backend.main reads its directories and switches at import time.
+_WORKDIR = Path(tempfile.mkdtemp(prefix="teapot-tests-"))
+os.environ.setdefault("TEAPOT_EXPORT_DIR", str(_WORKDIR / "exports"))
+os.environ.setdefault("TEAPOT_CACHE_DIR", str(_WORKDIR / "cache"))
+os.environ.setdefault("TEAPOT_WARMUP", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def blueprint_json() -> dict:
+    from backend.blueprint import build_blueprint
+
+    return build_blueprint(cups=4.0).model_dump(mode="json")
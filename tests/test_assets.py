@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+from backend.assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, AssetPipeline
+
+PADDING = "// " + "x" * 600 + "\n"
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "frontend"
+    (root / "js").mkdir(parents=True)
+    (root / "js" / "util.js").write_text(f"export const n = 1;\n{PADDING}", encoding="utf-8")
+    (root / "js" / "app.js").write_text(f'import {{ n }} from "./util.js";\n{PADDING}', encoding="utf-8")
+    (root / "style.css").write_text("body { background: url(/assets/logo.png); }\n", encoding="utf-8")
+    (root / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    (root / "index.html").write_text(
+        '<html><head>\n  </head><body><script type="module" src="/assets/js/app.js"></script></body></html>',
+        encoding="utf-8",
+    )
+    return root
+
+
+def test_references_are_rewritten_to_hashed_names(source, tmp_path):
+    pipeline = AssetPipeline(source, tmp_path / "cache")
+    util, _ = pipeline.lookup("js/util.js")
+    app, immutable = pipeline.lookup("js/app.js")
+    logo, _ = pipeline.lookup("logo.png")
+    css, _ = pipeline.lookup("style.css")
+
+    assert not immutable
+    assert pipeline.lookup(app.hashed_path) == (app, True)
+    assert f'"./{util.hashed_path.split("/")[-1]}"' in app.variants["identity"].decode()
+    assert logo.url.encode() in css.variants["identity"]
+    assert app.module_deps == ("js/util.js",)
+
+    page = pipeline.page().variants["identity"].decode()
+    assert f'src="{app.url}"' in page
+    assert f'<link rel="modulepreload" href="{util.url}" />' in page
+
+
+def test_a_dependency_change_renames_its_importers(source, tmp_path):
+    before = AssetPipeline(source, None)
+    app_before = before.lookup("js/app.js")[0].hashed_path
+    (source / "js" / "util.js").write_text(f"export const n = 2;\n{PADDING}", encoding="utf-8")
+    after = AssetPipeline(source, None)
+    assert after.lookup("js/app.js")[0].hashed_path != app_before
+
+
+def test_text_assets_are_precompressed_and_cached_on_disk(source, tmp_path):
+    cache_dir = tmp_path / "cache"
+    app = AssetPipeline(source, cache_dir).lookup("js/app.js")[0]
+    assert gzip.decompress(app.variants["gzip"]) == app.variants["identity"]
+    assert (cache_dir / f"{app.digest}.gzip").exists()
+    assert "gzip" not in AssetPipeline(source, cache_dir).lookup("logo.png")[0].variants
+
+
+def test_assets_are_served_by_coding_with_cache_headers(client):
+    page = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert page.headers["vary"] == "Accept-Encoding"
+
+    from backend.main import ASSETS
+
+    asset = next(a for a in ASSETS.build().assets.values() if "gzip" in a.variants)
+    hashed = client.get(asset.url, headers={"Accept-Encoding": "gzip"})
+    assert hashed.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert hashed.headers["content-encoding"] == "gzip"
+    assert hashed.headers["etag"] == asset.etag("gzip")
+    assert hashed.content == asset.variants["identity"]
+
+    revalidated = client.get(asset.url, headers={"Accept-Encoding": "gzip", "If-None-Match": asset.etag("gzip")})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["vary"] == "Accept-Encoding"
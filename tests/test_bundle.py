@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.bundle import iter_zip_bundle
+
+
+def _archive(chunks) -> zipfile.ZipFile:
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    return archive
+
+
+def test_bundle_streams_members_and_manifest():
+    jobs = {
+        "svg": lambda: ("drawing.svg", b"<svg/>" * 100),
+        "png": lambda: ("render.png", b"\x89PNG" + bytes(100)),
+    }
+    with ThreadPoolExecutor(2) as pool:
+        archive = _archive(iter_zip_bundle(jobs, pool, manifest={"title": "Teapot"}))
+
+    assert sorted(archive.namelist()) == ["drawing.svg", "manifest.json", "render.png"]
+    assert archive.getinfo("render.png").compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo("drawing.svg").compress_type == zipfile.ZIP_DEFLATED
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["title"] == "Teapot"
+    assert manifest["complete"] is True
+    assert {item["label"] for item in manifest["files"]} == {"svg", "png"}
+
+
+def test_failed_job_is_reported_and_archive_is_finished():
+    def broken() -> tuple[str, bytes]:
+        raise RuntimeError("renderer crashed")
+
+    jobs = {"json": lambda: ("design.json", b"{}"), "prototype": broken}
+    with ThreadPoolExecutor(2) as pool:
+        archive = _archive(iter_zip_bundle(jobs, pool))
+
+    assert sorted(archive.namelist()) == ["design.json", "manifest.json"]
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["complete"] is False
+    assert manifest["errors"] == [{"label": "prototype", "error": "RuntimeError: renderer crashed"}]
+
+
+def test_bundle_endpoint_returns_a_valid_zip(client, blueprint_json):
+    from backend.main import COMPUTE_POOL
+
+    submitted = COMPUTE_POOL.submitted
+    response = client.post(
+        "/api/export/bundle",
+        json={"blueprint": blueprint_json, "options": {"formats": ["json", "svg"], "include_prototype": True}},
+    )
+    assert response.status_code == 200
+    archive = _archive([response.content])
+    names = archive.namelist()
+    assert any(name.endswith(".json") and name != "manifest.json" for name in names)
+    assert any(name.endswith(".svg") for name in names)
+    assert any(name.startswith("prototype_v1_") for name in names)
+    assert json.loads(archive.read("manifest.json"))["complete"] is True
+    # The prototype render is admitted to and run on the compute pool.
+    assert COMPUTE_POOL.submitted == submitted + 1
+    assert COMPUTE_POOL.stats()["admitted"] == 0
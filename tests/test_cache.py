@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+
+from backend.cache import CachedExport, ExportCache, LRUCache, etag_matches, export_key, strong_etag
+
+
+def test_etag_matching_is_weak_and_handles_lists():
+    etag = strong_etag("abc")
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"other", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
+    assert etag_matches('"abc"', 'W/"abc"')
+
+
+def test_export_key_depends_on_design_format_and_options():
+    base = export_key("hash", "pptx")
+    assert base == export_key("hash", "pptx", {})
+    assert base != export_key("hash", "svg")
+    assert base != export_key("other", "pptx")
+    assert export_key("hash", "pptx", {"a": 1, "b": 2}) == export_key("hash", "pptx", {"b": 2, "a": 1})
+
+
+def test_lru_evicts_by_count_and_weight():
+    cache: LRUCache[str, bytes] = LRUCache(maxsize=3, max_weight=10, weigher=len)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_export_cache_reads_back_from_disk(tmp_path):
+    entry = CachedExport(key="k1", data=b"payload", media_type="text/plain", file_name="a.obj", export_path="/x")
+    ExportCache(disk_dir=tmp_path).put(entry)
+
+    fresh = ExportCache(disk_dir=tmp_path)
+    assert fresh.get("k1") == entry
+    assert fresh.disk_hits == 1
+    assert fresh.get("missing") is None
+
+
+def _export(key: str, data: bytes = b"x") -> CachedExport:
+    return CachedExport(key=key, data=data, media_type="text/plain", file_name="a.txt")
+
+
+def test_export_cache_prunes_disk_entries(tmp_path):
+    cache = ExportCache(disk_dir=tmp_path, max_disk_entries=2)
+    for index in range(4):
+        cache.put(_export(f"k{index}"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["k2.bin", "k2.json", "k3.bin", "k3.json"]
+    assert cache.disk_usage == (2, 2)
+
+
+def test_export_cache_disk_tier_is_lru_by_count_and_bytes(tmp_path):
+    writer = ExportCache(disk_dir=tmp_path)
+    for index in range(3):
+        writer.put(_export(f"k{index}", b"x" * 10))
+        os.utime(tmp_path / f"k{index}.bin", (1000 + index, 1000 + index))
+
+    # A fresh cache indexes existing files by mtime; a disk hit makes k0 the newest.
+    cache = ExportCache(disk_dir=tmp_path, max_entries=1, max_disk_entries=3, max_disk_bytes=30)
+    assert cache.disk_usage == (3, 30)
+    assert cache.get("k0") is not None
+    assert (tmp_path / "k0.bin").stat().st_mtime > 1002
+
+    cache.put(_export("k3", b"y" * 15))
+    assert sorted(p.stem for p in tmp_path.glob("*.bin")) == ["k0", "k3"]
+    assert cache.disk_usage == (2, 25)
+    assert ExportCache(disk_dir=tmp_path).get("k0").data == b"x" * 10
+
+
+def test_export_answers_if_none_match_with_304(client, blueprint_json):
+    first = client.post("/api/export/dxf", json={"blueprint": blueprint_json})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.post("/api/export/dxf", json={"blueprint": blueprint_json}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    changed = dict(blueprint_json, title="Another teapot")
+    assert client.post("/api/export/dxf", json={"blueprint": changed}, headers={"If-None-Match": etag}).status_code == 200
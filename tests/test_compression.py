@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.compression import CompressionMiddleware, negotiate, weak_etag
+
+TEXT = b'{"rows": [' + b",".join(b'{"part": "body", "mm": 120.5}' for _ in range(200)) + b"]}"
+
+
+def test_negotiate_honours_q_values_and_server_preference():
+    available = ("gzip", "br")
+    assert negotiate(None, available) == "identity"
+    assert negotiate("gzip, br", available) == "br"
+    assert negotiate("gzip;q=1, br;q=0.5", available) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0", available) == "identity"
+    assert negotiate("*", ("gzip",)) == "gzip"
+    assert negotiate("br", ("gzip",)) == "identity"
+
+
+def test_weak_etag_is_idempotent():
+    assert weak_etag('"abc"') == 'W/"abc"'
+    assert weak_etag('W/"abc"') == 'W/"abc"'
+
+
+def _middleware_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/json")
+    def large_json() -> Response:
+        return Response(TEXT, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small_json() -> Response:
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/png")
+    def png() -> Response:
+        return Response(TEXT, media_type="image/png")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter([TEXT[:500], TEXT[500:]]), media_type="model/obj")
+
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+
+def test_middleware_compresses_text_and_weakens_its_etag():
+    client = _middleware_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert response.content == TEXT
+
+    with client.stream("GET", "/json", headers={"Accept-Encoding": "br"}) as raw:
+        assert raw.headers["content-encoding"] == "br"
+        assert brotli.decompress(b"".join(raw.iter_raw())) == TEXT
+
+
+def test_middleware_skips_small_and_binary_bodies():
+    client = _middleware_client()
+    for path in ("/small", "/png"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip, br"})
+        assert "content-encoding" not in response.headers
+
+
+def test_middleware_compresses_streamed_bodies_chunk_by_chunk():
+    response = _middleware_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == TEXT
+
+
+def test_encoded_export_is_cached_and_revalidates_with_the_same_headers(client, blueprint_json):
+    body = {"blueprint": blueprint_json}
+    first = client.post("/api/export/dxf", json=body, headers={"Accept-Encoding": "br"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "br"
+    assert first.headers["etag"].startswith('W/"')
+    assert first.headers["vary"] == "Accept-Encoding"
+
+    plain = client.post("/api/export/dxf", json=body, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert first.content == plain.content
+    assert first.headers["etag"] == weak_etag(plain.headers["etag"])
+
+    with client.stream("POST", "/api/export/dxf", json=body, headers={"Accept-Encoding": "gzip"}) as gzipped:
+        assert gzip.decompress(b"".join(gzipped.iter_raw())) == plain.content
+
+    revalidated = client.post(
+        "/api/export/dxf",
+        json=body,
+        headers={"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in revalidated.headers
+
+
+def test_hash_addressed_drawing_revalidates_with_the_encoded_validator(client, blueprint_json):
+    design_id = client.post("/api/designs", json=blueprint_json).json()["design_id"]
+    url = f"/api/drawing/{design_id}.svg"
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+
+    revalidated = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+    assert revalidated.headers["cache-control"] == first.headers["cache-control"]
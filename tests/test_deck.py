@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import io
+
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+from backend.blueprint import build_blueprint
+from backend.deck import build_deck, deck_template
+
+
+def _png(size: tuple[int, int]) -> bytes:
+    stream = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(stream, format="PNG")
+    return stream.getvalue()
+
+
+def _texts(slide) -> str:
+    return "\n".join(shape.text_frame.text for shape in slide.shapes if shape.has_text_frame)
+
+
+def test_template_is_built_once_and_never_mutated():
+    deck_template.cache_clear()
+    blueprint = build_blueprint(cups=4.0)
+    first = build_deck(blueprint)
+    build_deck(build_blueprint(cups=6.0))
+
+    info = deck_template.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    # Filling works on copies: the same design gives the same deck again.
+    assert build_deck(blueprint) == first
+
+
+def test_deck_opens_with_the_expected_slides():
+    blueprint = build_blueprint(cups=4.0)
+    prs = Presentation(io.BytesIO(build_deck(blueprint)))
+
+    slides = list(prs.slides)
+    assert len(slides) == 3
+    assert "Curved-Head Teapot Blueprint" in _texts(slides[0])
+    assert f"{blueprint.dimensions.estimated_capacity_ml:.0f} ml" in _texts(slides[0])
+    tables = [shape.table for shape in slides[2].shapes if shape.has_table]
+    part_names = {tables[0].cell(row, 0).text for row in range(1, len(tables[0].rows))}
+    assert {item.part_name for item in blueprint.bom} <= part_names
+
+
+def test_deck_embeds_the_prototype_render():
+    render = _png((400, 240))
+    prs = Presentation(io.BytesIO(build_deck(build_blueprint(cups=4.0), prototype_png=render, include_drawing=False)))
+
+    slides = list(prs.slides)
+    assert len(slides) == 4
+    pictures = [shape for shape in slides[3].shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+    assert len(pictures) == 1
+    assert pictures[0].image.blob == render
+    assert pictures[0].width * 240 == pictures[0].height * 400
+
+
+def test_pptx_export_renders_on_the_compute_pool_without_saving_a_prototype(client, blueprint_json):
+    from backend.main import COMPUTE_POOL, EXPORT_DIR
+
+    before = set(EXPORT_DIR.glob("prototype_v1_*"))
+    submitted = COMPUTE_POOL.submitted
+    response = client.post(
+        "/api/export/pptx",
+        json={"blueprint": blueprint_json, "options": {"include_prototype": True}},
+    )
+
+    assert response.status_code == 200
+    assert COMPUTE_POOL.submitted == submitted + 1
+    assert set(EXPORT_DIR.glob("prototype_v1_*")) == before
+    assert len(Presentation(io.BytesIO(response.content)).slides) == 4
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+from backend.blueprint import build_blueprint
+from backend.designs import DesignStore
+
+
+def _rows(db_path) -> int:
+    with sqlite3.connect(db_path) as db:
+        return db.execute("SELECT COUNT(*) FROM designs").fetchone()[0]
+
+
+def test_save_queues_rows_until_flush(tmp_path):
+    db_path = tmp_path / "designs.sqlite3"
+    store = DesignStore(db_path)
+    first = store.save(build_blueprint(cups=4.0))
+    child = store.save(build_blueprint(cups=6.0), parent_id=first.design_id)
+
+    assert _rows(db_path) == 0
+    assert store.get(child.design_id) is child
+    assert store.flush() == 2
+    assert _rows(db_path) == 2
+    assert store.flush() == 0
+    store.close()
+
+
+def test_versions_and_history_survive_a_restart(tmp_path):
+    db_path = tmp_path / "designs.sqlite3"
+    store = DesignStore(db_path)
+    first = store.save(build_blueprint(cups=4.0))
+    child = store.save(build_blueprint(cups=6.0), parent_id=first.design_id)
+    store.close()
+
+    reopened = DesignStore(db_path)
+    history = reopened.history(child.design_id)
+    assert [r.design_id for r in history] == [child.design_id, first.design_id]
+    assert reopened.disk_hits == 2
+    reopened.close()
+
+
+def test_queued_version_is_found_after_memory_eviction(tmp_path):
+    store = DesignStore(tmp_path / "designs.sqlite3", max_entries=1)
+    first = store.save(build_blueprint(cups=4.0))
+    store.save(build_blueprint(cups=6.0))
+
+    assert store.get(first.design_id).design_id == first.design_id
+    store.close()
+
+
+def test_collect_expired_keeps_recently_used_rows(tmp_path):
+    db_path = tmp_path / "designs.sqlite3"
+    store = DesignStore(db_path, disk_ttl_seconds=60)
+    record = store.save(build_blueprint(cups=4.0))
+    store.flush()
+
+    # A memory hit refreshes the row's last use at the next flush.
+    assert store.collect_expired(now=time.time() + 30) == 0
+    assert store.get(record.design_id) is not None
+    assert store.collect_expired(now=time.time() + 3600) == 1
+    assert _rows(db_path) == 0
+    store.close()
+
+
+def test_maintenance_thread_flushes_in_the_background(tmp_path):
+    db_path = tmp_path / "designs.sqlite3"
+    store = DesignStore(db_path)
+    store.start_maintenance(flush_interval_s=0.01, expire_interval_s=3600)
+    store.save(build_blueprint(cups=4.0))
+
+    deadline = time.monotonic() + 5.0
+    while _rows(db_path) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _rows(db_path) == 1
+    store.close()
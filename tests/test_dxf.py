@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from backend.blueprint import build_blueprint
+from backend.dxf import DXF_VERSION, DxfWriter, encode_dxf, format_number
+from backend.exporters import drawing_layout, export_dxf_bytes
+from backend.geometry import teapot_geometry
+
+
+def _pairs(data: bytes) -> list[tuple[int, str]]:
+    lines = data.decode("ascii").splitlines()
+    return [(int(lines[i]), lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+
+def test_format_number_is_short_and_stable():
+    assert format_number(12.5) == "12.5"
+    assert format_number(3.0) == "3"
+    assert format_number(-0.00001) == "0"
+    assert format_number(1.23456789) == "1.2346"
+
+
+def test_output_is_plain_r12():
+    pairs = _pairs(export_dxf_bytes(build_blueprint(cups=4.0)))
+    assert pairs[:4] == [(0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, DXF_VERSION)]
+    assert pairs[-1] == (0, "EOF")
+    # R12 has no handles, owner links or subclass markers to get wrong.
+    assert not {code for code, _ in pairs} & {5, 100, 105, 330}
+    sections = [value for (code, value), prev in zip(pairs[1:], pairs) if code == 2 and prev == (0, "SECTION")]
+    assert sections == ["HEADER", "TABLES", "BLOCKS", "ENTITIES"]
+
+
+def test_streaming_writer_polyline_is_closed_sequence():
+    stream = io.StringIO()
+    DxfWriter(stream).polyline([(0, 0), (1, 0), (1, 1)], "SIDE", closed=True)
+    kinds = [value for code, value in _pairs(stream.getvalue().encode()) if code == 0]
+    assert kinds == ["POLYLINE", "VERTEX", "VERTEX", "VERTEX", "SEQEND"]
+
+
+def test_round_trips_through_ezdxf_without_audit_errors(tmp_path):
+    ezdxf = pytest.importorskip("ezdxf")
+    blueprint = build_blueprint(cups=4.0)
+    path = tmp_path / "teapot.dxf"
+    path.write_bytes(export_dxf_bytes(blueprint))
+
+    doc = ezdxf.readfile(path)
+    auditor = doc.audit()
+    assert doc.dxfversion == DXF_VERSION
+    assert not auditor.errors
+    assert not auditor.fixes
+
+    msp = doc.modelspace()
+    layout = drawing_layout(teapot_geometry(blueprint.dimensions))
+    (silhouette,) = msp.query("POLYLINE")
+    assert silhouette.is_closed
+    assert len(list(silhouette.vertices)) == len(layout.silhouette)
+    assert len(msp.query("DIMENSION")) == len(layout.dimensions)
+    for dimension in msp.query("DIMENSION"):
+        assert dimension.dxf.geometry in doc.blocks
+
+
+def test_non_ascii_text_is_escaped_not_dropped():
+    stream = io.StringIO()
+    DxfWriter(stream).text((0, 0), "Ø 80 mm · 90° \U0001fad6")
+    code, value = _pairs(encode_dxf(stream.getvalue()))[-1]
+    assert (code, value) == (1, "\\U+00D8 80 mm \\U+00B7 90\\U+00B0 ?")
+
+    ezdxf = pytest.importorskip("ezdxf")
+    assert ezdxf.decode_dxf_unicode(value) == "Ø 80 mm · 90° ?"
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from backend.blueprint import build_blueprint, refresh_blueprint
+from backend.geometry import GEOMETRY_CACHE, GEOMETRY_FIELDS, dimensions_key, teapot_geometry
+from backend.models import Dimensions
+
+
+def test_geometry_reads_only_its_key_fields():
+    # Every field outside the key can change without changing the geometry.
+    base = Dimensions()
+    other = base.model_copy(
+        update={
+            name: getattr(base, name) + 1.0
+            for name in Dimensions.model_fields
+            if name not in GEOMETRY_FIELDS
+        }
+    )
+    assert dimensions_key(other) == dimensions_key(base)
+    assert teapot_geometry(other) == teapot_geometry(base)
+
+
+def test_refresh_with_a_stale_capacity_computes_geometry_once():
+    blueprint = build_blueprint(cups=5.0)
+    blueprint.dimensions.body_height_mm += 7.5
+    blueprint.dimensions.estimated_capacity_ml = 100.0
+    GEOMETRY_CACHE.cache_clear()
+
+    refreshed = refresh_blueprint(blueprint)
+
+    info = GEOMETRY_CACHE.cache_info()
+    assert info.misses == 1
+    assert info.hits >= 1
+    assert refreshed.dimensions.estimated_capacity_ml != 100.0
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import warnings
+
+from scripts.import_report import build_report
+
+
+def test_report_answers_the_health_check_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        report = build_report("backend.main", top=5)
+
+    assert report["cold_start_to_health_ms"] > 0
+    assert report["deferred_packages_loaded"] == []
+    assert report["top_cumulative"]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from backend.blueprint import build_blueprint
+from backend.live import LiveEditError, LiveSession, PendingEdits
+
+
+def test_apply_returns_only_changed_derived_values():
+    session = LiveSession(build_blueprint(cups=4.0))
+    before = session.blueprint
+
+    changes = session.apply({"body_height_mm": before.dimensions.body_height_mm + 10.0}, {})
+
+    assert set(changes["dimensions"]) == {"overall_height_mm", "estimated_capacity_ml"}
+    assert changes["dimensions"]["overall_height_mm"] == pytest.approx(before.dimensions.overall_height_mm + 10.0)
+    assert changes.get("bom")
+    # Edits to derived fields are ignored; a no-op edit changes nothing.
+    assert session.apply({"overall_height_mm": 1.0}, {}) == {}
+
+
+def test_rejected_edit_leaves_the_state_unchanged():
+    session = LiveSession(build_blueprint(cups=4.0))
+    before = session.blueprint
+    with pytest.raises(LiveEditError):
+        session.apply({"no_such_field": 1.0}, {})
+    with pytest.raises(LiveEditError):
+        session.apply({}, {"no_such_part": "steel"})
+    assert session.blueprint is before
+
+
+def test_pending_set_messages_merge_into_one_edit():
+    async def run() -> list[dict]:
+        pending = PendingEdits()
+        pending.add({"type": "set", "seq": 1, "dimensions": {"body_height_mm": 100.0}})
+        pending.add({"type": "set", "seq": 2, "dimensions": {"body_height_mm": 110.0, "head_height_mm": 40.0}})
+        pending.add({"type": "snapshot", "seq": 3})
+        pending.add({"type": "set", "seq": 4, "materials": {"lid": "oak"}})
+        return pending.take()
+
+    messages = asyncio.run(run())
+    assert [m["seq"] for m in messages] == [2, 3, 4]
+    assert messages[0]["merged"] == 2
+    assert messages[0]["dimensions"] == {"body_height_mm": 110.0, "head_height_mm": 40.0}
+
+
+def test_websocket_protocol(client, blueprint_json):
+    with client.websocket_connect("/api/ws/blueprint") as ws:
+        ws.send_json({"type": "set", "seq": 0, "dimensions": {}})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "init", "seq": 1, "blueprint": blueprint_json})
+        ready = ws.receive_json()
+        assert ready["type"] == "ready" and ready["seq"] == 1
+        first_id = ready["design_id"]
+
+        height = ready["blueprint"]["dimensions"]["body_height_mm"]
+        ws.send_json({"type": "set", "seq": 2, "dimensions": {"body_height_mm": height + 5.0}, "materials": {}})
+        delta = ws.receive_json()
+        assert delta["type"] == "delta" and delta["seq"] == 2
+        assert "overall_height_mm" in delta["changes"]["dimensions"]
+        assert delta["design_id"] != first_id
+
+        ws.send_json({"type": "bogus", "seq": 3})
+        assert ws.receive_json() == {"type": "error", "seq": 3, "message": "Unknown message type: 'bogus'"}
+
+    # Each state is a stored version whose parent is the one it replaced.
+    history = client.get(f"/api/designs/{delta['design_id']}/history").json()
+    assert [entry["design_id"] for entry in history["versions"]][:2] == [delta["design_id"], first_id]
+
+
+def test_updates_are_recomputed_on_the_compute_pool(client, blueprint_json):
+    from backend.main import COMPUTE_POOL
+    from backend.pools import PoolSaturated
+
+    with client.websocket_connect("/api/ws/blueprint") as ws:
+        submitted = COMPUTE_POOL.submitted
+        ws.send_json({"type": "init", "seq": 1, "blueprint": blueprint_json})
+        ready = ws.receive_json()
+        assert COMPUTE_POOL.submitted == submitted + 1
+
+        height = ready["blueprint"]["dimensions"]["body_height_mm"]
+        releases = []
+        try:
+            while True:
+                try:
+                    releases.append(COMPUTE_POOL.reserve())
+                except PoolSaturated:
+                    break
+            ws.send_json({"type": "set", "seq": 2, "dimensions": {"body_height_mm": height + 5.0}, "materials": {}})
+            busy = ws.receive_json()
+        finally:
+            for release in releases:
+                release()
+        assert busy["type"] == "error" and "busy" in busy["message"]
+
+        # The rejected edit left the session as it was.
+        ws.send_json({"type": "snapshot", "seq": 3})
+        assert ws.receive_json()["blueprint"]["dimensions"]["body_height_mm"] == height
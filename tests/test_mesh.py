@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.blueprint import build_blueprint
+from backend.geometry import teapot_geometry
+from backend.mesh import (
+    MESH_MAGIC,
+    MESH_VERTEX_STRIDE,
+    VIEWER_BODY_SAMPLES,
+    VIEWER_HEAD_SAMPLES,
+    VIEWER_LATHE_SEGMENTS,
+    build_viewer_parts,
+    encode_mesh_parts,
+    viewer_body_profile,
+    viewer_head_profile,
+)
+
+APP_JS = Path(__file__).resolve().parent.parent / "frontend" / "app.js"
+
+# Pulls the drawing profile functions out of app.js and prints their output for the given dimensions.
+JS_PROFILES = r"""
+const fs = require("fs");
+const src = fs.readFileSync(process.argv[1], "utf8");
+const grab = (name) => {
+  const i = src.indexOf(`function ${name}(`);
+  let depth = 0, j = src.indexOf(") {", i) + 2;
+  for (;; j++) {
+    if (src[j] === "{") depth++;
+    else if (src[j] === "}" && --depth === 0) break;
+  }
+  return src.slice(i, j + 1);
+};
+const code = ["clamp", "lerp", "smoothstep01", "buildBodyProfilePoints", "buildHeadProfilePoints"].map(grab).join("\n");
+const f = new Function("getHeadCurvatureScale", `${code}; return { buildBodyProfilePoints, buildHeadProfilePoints };`)(() => 1);
+const [dim, bodySamples, headSamples, curvatureScale] = JSON.parse(process.argv[2]);
+const start = dim.body_height_mm - dim.head_neck_overlap_mm;
+console.log(JSON.stringify({
+  body: f.buildBodyProfilePoints(dim, bodySamples),
+  head: f.buildHeadProfilePoints(dim, headSamples, start, { curvatureScale }),
+}));
+"""
+
+
+def _decode(payload: bytes) -> tuple[dict, dict[str, tuple[np.ndarray, np.ndarray]]]:
+    assert payload[:4] == MESH_MAGIC
+    (header_length,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8 : 8 + header_length])
+    floats = header["stride"] // 4
+    parts = {}
+    for part in header["parts"]:
+        assert part["vertex_offset"] % 4 == 0 and part["index_offset"] % 4 == 0
+        vertices = np.frombuffer(payload, "<f4", part["vertex_count"] * floats, part["vertex_offset"])
+        indices = np.frombuffer(payload, "<u4", part["index_count"], part["index_offset"])
+        parts[part["name"]] = (vertices.reshape(-1, floats), indices)
+    return header, parts
+
+
+def test_encoded_mesh_round_trips():
+    geo = teapot_geometry(build_blueprint(cups=4.0).dimensions)
+    parts = build_viewer_parts(geo)
+    header, decoded = _decode(encode_mesh_parts(parts, {"blueprint_hash": "abc"}))
+
+    assert header["stride"] == MESH_VERTEX_STRIDE
+    assert header["blueprint_hash"] == "abc"
+    assert list(decoded) == list(parts)
+    for name, (vertices, indices) in decoded.items():
+        expected, faces = parts[name].to_arrays()
+        np.testing.assert_allclose(vertices[:, :3], expected, rtol=1e-6, atol=1e-4)
+        np.testing.assert_allclose(np.linalg.norm(vertices[:, 3:], axis=1), 1.0, atol=1e-4)
+        assert indices.max() < len(vertices)
+        np.testing.assert_array_equal(indices.reshape(-1, 3), faces)
+
+
+def test_viewer_lathes_use_the_smooth_profiles():
+    geo = teapot_geometry(build_blueprint(cups=4.0).dimensions)
+    parts = build_viewer_parts(geo)
+    body, head = viewer_body_profile(geo), viewer_head_profile(geo)
+
+    assert len(body) == VIEWER_BODY_SAMPLES + 1
+    assert len(head) == VIEWER_HEAD_SAMPLES + 1
+    assert body[0] == (geo.r_bottom, 0.0)
+    assert head[-1][1] == pytest.approx(geo.overall_h)
+    # One ring per profile sample, plus the bottom cap centre.
+    assert len(parts["body_shell"].vertices) == len(body) * VIEWER_LATHE_SEGMENTS + 1
+    assert len(parts["curved_head"].vertices) == len(head) * VIEWER_LATHE_SEGMENTS
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize(("cups", "curvature"), [(1.0, 1.0), (4.0, 0.4), (12.0, 1.7)])
+def test_drawing_profiles_match_the_viewer_mesh(cups, curvature):
+    dim = build_blueprint(cups=cups).dimensions
+    args = [dim.model_dump(), VIEWER_BODY_SAMPLES, VIEWER_HEAD_SAMPLES, curvature]
+    output = subprocess.check_output(["node", "-e", JS_PROFILES, str(APP_JS), json.dumps(args)])
+    expected = json.loads(output)
+    geo = teapot_geometry(dim)
+    np.testing.assert_allclose(viewer_body_profile(geo), expected["body"], atol=1e-9)
+    np.testing.assert_allclose(viewer_head_profile(geo, curvature_scale=curvature), expected["head"], atol=1e-9)
+
+
+def test_mesh_endpoint_applies_the_head_curvature(client, blueprint_json):
+    mesh_url = client.post("/api/blueprint/recompute", json=blueprint_json).json()["mesh_url"]
+    default = client.get(mesh_url)
+    assert client.get(f"{mesh_url}?curvature=100").headers["etag"] == default.headers["etag"]
+
+    flared = client.get(f"{mesh_url}?curvature=150")
+    assert flared.headers["etag"] != default.headers["etag"]
+    head, flared_head = _decode(default.content)[1]["curved_head"], _decode(flared.content)[1]["curved_head"]
+    assert not np.allclose(head[0], flared_head[0])
+    np.testing.assert_array_equal(_decode(default.content)[1]["handle"][0], _decode(flared.content)[1]["handle"][0])
+    assert client.get(f"{mesh_url}?curvature=200").status_code == 422
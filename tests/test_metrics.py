@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from backend.metrics import Registry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: the compute pool kind is fixed when backend.main is imported.
+SCRAPE_AFTER_PROCESS_RENDER = """
+from fastapi.testclient import TestClient
+from backend.main import COMPUTE_POOL, app
+
+assert COMPUTE_POOL.kind == "process", COMPUTE_POOL.kind
+with TestClient(app) as client:
+    for _ in range(2):
+        response = client.post("/api/prototype/v1?tier=preview", json={})
+        assert response.status_code == 200, response.text
+    print(client.get("/api/metrics").text)
+"""
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not in metrics")
+
+
+def test_drained_series_merge_into_another_registry():
+    worker, parent = Registry(), Registry()
+    for registry in (worker, parent):
+        registry.histogram("stage_seconds", "", ("stage",))
+        registry.counter("jobs_total", "")
+    worker_stage, worker_jobs = worker._metrics
+    worker_stage.observe(0.2, "draw")
+    worker_jobs.inc()
+    parent._metrics[0].observe(0.2, "draw")
+
+    parent.merge(worker.drain())
+
+    assert worker.drain() == {}
+    text = parent.render()
+    assert 'stage_seconds_count{stage="draw"} 2' in text
+    assert "jobs_total 1" in text
+
+
+def test_process_pool_render_is_visible_in_metrics(tmp_path):
+    env = {
+        **os.environ,
+        "TEAPOT_COMPUTE_POOL": "process",
+        "TEAPOT_COMPUTE_WORKERS": "1",
+        "TEAPOT_WARMUP": "0",
+        "TEAPOT_EXPORT_DIR": str(tmp_path / "exports"),
+        "TEAPOT_CACHE_DIR": str(tmp_path / "cache"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRAPE_AFTER_PROCESS_RENDER],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    text = result.stdout
+
+    assert _sample(text, 'teapot_stage_seconds_count{stage="prototype.draw.preview"}') == 2
+    assert _sample(text, 'teapot_stage_seconds_count{stage="prototype.encode.jpeg"}') == 2
+    # The second render reuses the worker's background layer.
+    assert _sample(text, 'teapot_cache_requests_total{cache="prototype_background",result="hit"}') >= 1
+    assert _sample(text, 'teapot_cache_requests_total{cache="prototype_background",result="miss"}') >= 1
+    assert _sample(text, 'teapot_cache_entries{cache="prototype_background"}') >= 1
+    assert _sample(text, 'teapot_cache_requests_total{cache="thumbnail_tiles",result="miss"}') >= 1
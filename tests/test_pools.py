@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.pools import PoolSaturated, WorkloadPool, resolve_pool_kind
+
+
+def test_resolve_pool_kind():
+    assert resolve_pool_kind("auto", cpu_count=1) == "thread"
+    assert resolve_pool_kind("", cpu_count=4) == "process"
+    assert resolve_pool_kind(" Thread ") == "thread"
+    with pytest.raises(ValueError):
+        resolve_pool_kind("fibers")
+
+
+def test_admission_is_bounded_reentrant_and_released():
+    pool = WorkloadPool("test", max_workers=1, max_queue=1)
+    try:
+        release = pool.reserve()
+        with pool.admit():
+            # The same thread is not counted twice.
+            with pool.admit():
+                assert pool.stats()["admitted"] == 2
+            with pytest.raises(PoolSaturated) as caught:
+                pool.reserve()
+        assert caught.value.pool == "test" and caught.value.retry_after >= 1
+        release()
+        release()
+        assert pool.stats()["admitted"] == 0
+        assert pool.stats()["rejected"] == 1
+        assert pool.call(sum, [1, 2, 3]) == 6
+        assert pool.stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_answers_503_with_retry_after(client):
+    from backend.main import COMPUTE_POOL
+
+    releases = []
+    try:
+        while True:
+            try:
+                releases.append(COMPUTE_POOL.reserve())
+            except PoolSaturated:
+                break
+        response = client.post("/api/prototype/v1?tier=preview", json={})
+    finally:
+        for release in releases:
+            release()
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["pool"] == "compute"
+    assert client.post("/api/prototype/v1?tier=preview", json={}).status_code == 200
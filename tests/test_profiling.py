@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.pools import WorkloadPool, threads_only
+from backend.profiling import Profiler, ProfilingMiddleware
+
+TOKEN = "secret"
+
+
+def test_profiled_request_runs_process_pool_jobs_on_threads(tmp_path):
+    pool = WorkloadPool("profiled", max_workers=1, max_queue=0, kind="process")
+    app = FastAPI()
+
+    @app.get("/api/pid")
+    def worker_pid() -> dict:
+        return {"pid": pool.submit(os.getpid).result()}
+
+    app.add_middleware(ProfilingMiddleware, profiler=Profiler(tmp_path, token=TOKEN, interval_s=0.001))
+    try:
+        with TestClient(app) as client:
+            plain = client.get("/api/pid")
+            profiled = client.get("/api/pid", headers={"X-Profile": TOKEN})
+    finally:
+        pool.shutdown()
+
+    assert plain.json()["pid"] != os.getpid()
+    assert "x-profile-id" not in plain.headers
+    assert profiled.json()["pid"] == os.getpid()
+    profile_id = profiled.headers["x-profile-id"]
+    assert (tmp_path / f"{profile_id}.json").exists()
+    assert (tmp_path / f"{profile_id}.collapsed").exists()
+
+
+def test_threads_only_follows_jobs_that_submit_jobs():
+    outer = WorkloadPool("outer", max_workers=1, max_queue=0)
+    inner = WorkloadPool("inner", max_workers=1, max_queue=0, kind="process")
+    try:
+        with threads_only():
+            pid = outer.submit(lambda: inner.submit(os.getpid).result()).result()
+    finally:
+        outer.shutdown()
+        inner.shutdown()
+    assert pid == os.getpid()
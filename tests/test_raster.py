@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+
+from backend.raster import Shading, rasterize, render_isometric
+
+SIZE = 64
+MARGIN = 4
+
+
+def _square(half: float, z, offset: int) -> tuple[np.ndarray, np.ndarray]:
+    corners = [(-half, -half), (half, -half), (half, half), (-half, half)]
+    vertices = np.array([(x, y, z(x, y)) for x, y in corners], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [0, 2, 3]]) + offset
+    return vertices, faces
+
+
+def _cube() -> tuple[np.ndarray, np.ndarray]:
+    vertices = np.array(list(itertools.product((0.0, 1.0), repeat=3)))
+    faces = []
+    for axis in range(3):
+        for side in (0.0, 1.0):
+            quad = [i for i, v in enumerate(vertices) if v[axis] == side]
+            a, b, c, d = quad
+            faces += [[a, b, d], [a, d, c]]
+    return vertices, np.array(faces)
+
+
+@pytest.mark.parametrize("near_first", [True, False])
+def test_nearer_triangles_win_regardless_of_draw_order(near_first):
+    # Straight-on view: a flat square behind a smaller, tilted one, so the two shade differently.
+    far = _square(1.0, lambda x, y: -1.0, 0)
+    near = _square(0.5, lambda x, y: 1.0 + 0.6 * x, 4)
+    vertices = np.vstack([far[0], near[0]])
+    faces = np.vstack([near[1], far[1]] if near_first else [far[1], near[1]])
+    pixels = np.asarray(rasterize(vertices, faces, (SIZE, SIZE), azimuth_deg=0.0, elevation_deg=0.0, margin=MARGIN))
+
+    centre, edge = pixels[SIZE // 2, SIZE // 2], pixels[MARGIN + 2, MARGIN + 2]
+    assert centre[3] == edge[3] == 255
+    assert tuple(centre) != tuple(edge)
+    # The whole near square shows its own shade, the rest of the far square its shade.
+    assert (pixels[22:42, 22:42] == centre).all()
+    ring = np.ones((SIZE, SIZE), dtype=bool)
+    ring[:MARGIN, :] = ring[-MARGIN:, :] = ring[:, :MARGIN] = ring[:, -MARGIN:] = False
+    ring[18:46, 18:46] = False
+    assert (pixels[ring] == edge).all()
+
+
+def test_coverage_fills_the_projection_and_nothing_else():
+    vertices, faces = _square(1.0, lambda x, y: 0.0, 0)
+    pixels = np.asarray(rasterize(vertices, faces, (SIZE, SIZE), azimuth_deg=0.0, elevation_deg=0.0, margin=MARGIN))
+    alpha = pixels[:, :, 3]
+
+    # Pixel centres inside [margin, size - margin) are covered exactly once; the margin stays clear.
+    inside = SIZE - 2 * MARGIN
+    assert (alpha[MARGIN:-MARGIN, MARGIN:-MARGIN] == 255).all()
+    assert int((alpha == 255).sum()) == inside * inside
+    # The shared diagonal leaves no cracks and no double-shaded seam.
+    assert len({tuple(p) for p in pixels[alpha == 255]}) == 1
+
+
+def test_isometric_cube_shows_three_faces():
+    vertices, faces = _cube()
+    shading = Shading(color=(200, 200, 200))
+    image = render_isometric(vertices, faces, (96, 96), supersample=1, shading=shading)
+    pixels = np.asarray(image)
+
+    assert image.size == (96, 96) and image.mode == "RGBA"
+    assert pixels[0, 0, 3] == pixels[-1, -1, 3] == 0
+    shades = {tuple(p) for p in pixels[pixels[:, :, 3] == 255]}
+    assert len(shades) == 3
+    # Light comes from above, so the top face (centre of the upper half) is the brightest.
+    top = tuple(pixels[30, 48])
+    assert top == max(shades, key=sum)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.cache import LRUCache
+from backend.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def test_concurrent_calls_share_one_computation():
+    flight: SingleFlight[int] = SingleFlight()
+    release = threading.Event()
+    calls = 0
+
+    def compute() -> int:
+        nonlocal calls
+        calls += 1
+        release.wait(5.0)
+        return 42
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(flight.do, "key", compute) for _ in range(CALLERS)]
+        while flight.leaders + flight.shared < CALLERS:
+            threading.Event().wait(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [42] * CALLERS
+    assert calls == 1
+    assert (flight.leaders, flight.shared) == (1, CALLERS - 1)
+    assert flight.in_flight() == 0
+
+
+def test_followers_get_the_leaders_exception_and_nothing_is_cached():
+    flight: SingleFlight[int] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail() -> int:
+        started.set()
+        release.wait(5.0)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "key", fail)
+        started.wait(5.0)
+        follower = pool.submit(flight.do, "key", lambda: 0)
+        while flight.shared < 1:
+            threading.Event().wait(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+    assert flight.do("key", lambda: 7) == 7
+
+
+def test_the_leader_fills_the_cache_before_the_flight_ends():
+    flight: SingleFlight[int] = SingleFlight()
+    cache: LRUCache[str, int] = LRUCache(maxsize=4)
+
+    def compute() -> int:
+        assert flight.in_flight() == 1
+        return 42
+
+    assert flight.do("key", compute, cache=cache) == 42
+    assert cache.get("key") == 42
+    # A caller that missed the cache just before that flight ended gets the stored result.
+    assert flight.do("key", lambda: 0, cache=cache) == 42
+    assert (cache.hits, cache.misses) == (2, 0)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from backend.store import ContentStore, RetentionPolicy
+
+NO_LIMITS = RetentionPolicy(max_age_seconds=None, max_count=None, max_bytes=None, grace_seconds=0.0)
+
+
+def _age(path: Path, seconds: float) -> None:
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_identical_payloads_share_one_object(tmp_path):
+    store = ContentStore(tmp_path, policy=NO_LIMITS)
+    first = store.put(b"payload", "a.json")
+    second = store.put(b"payload", "b.json")
+    again = store.put(b"payload", "a.json")
+
+    assert first.created and not second.created and not again.created
+    assert first.object_path == second.object_path
+    assert os.path.samefile(first.path, second.path)
+    assert store.usage() == (1, len(b"payload"))
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_gc_prunes_by_age_and_drops_orphaned_objects(tmp_path):
+    store = ContentStore(tmp_path, policy=RetentionPolicy(max_age_seconds=60, max_count=None, max_bytes=None, grace_seconds=0.0))
+    old = store.put(b"old", "old.txt")
+    store.put(b"new", "new.txt")
+
+    assert store.collect_garbage(now=time.time() + 30).removed_names == []
+    report = store.collect_garbage(now=time.time() + 3600)
+    assert sorted(report.removed_names) == ["new.txt", "old.txt"]
+    assert report.removed_objects == 2
+    assert not old.object_path.exists()
+
+
+def test_gc_ages_each_name_separately(tmp_path, monkeypatch):
+    store = ContentStore(tmp_path, policy=RetentionPolicy(max_age_seconds=60, max_count=None, max_bytes=None, grace_seconds=0.0))
+    start = time.time()
+    store.put(b"same", "first.txt")
+    # A later put of the same payload shares the inode, and with it the mtime.
+    monkeypatch.setattr(time, "time", lambda: start + 120)
+    store.put(b"same", "second.txt")
+    monkeypatch.undo()
+
+    report = store.collect_garbage(now=start + 150)
+
+    assert report.removed_names == ["first.txt"]
+    assert (tmp_path / "second.txt").exists()
+
+
+def test_gc_keeps_newest_names_within_count_and_bytes(tmp_path):
+    store = ContentStore(tmp_path, policy=RetentionPolicy(max_age_seconds=None, max_count=2, max_bytes=None, grace_seconds=0.0))
+    for index in range(4):
+        store.put(f"payload {index}".encode(), f"export_{index}.txt")
+        time.sleep(0.002)
+
+    store.collect_garbage()
+    assert sorted(p.name for p in tmp_path.glob("*.txt")) == ["export_2.txt", "export_3.txt"]
+
+    store.policy = RetentionPolicy(max_age_seconds=None, max_count=None, max_bytes=10, grace_seconds=0.0)
+    store.collect_garbage()
+    assert [p.name for p in tmp_path.glob("*.txt")] == ["export_3.txt"]
+
+
+def test_gc_leaves_files_it_did_not_create(tmp_path):
+    (tmp_path / "notes.txt").write_text("mine")
+    _age(tmp_path / "notes.txt", 10 * 24 * 3600)
+    store = ContentStore(tmp_path, policy=RetentionPolicy(max_age_seconds=1, max_count=0, max_bytes=None, grace_seconds=0.0))
+    store.put(b"export", "export.txt")
+
+    report = store.collect_garbage(now=time.time() + 3600)
+
+    assert report.removed_names == ["export.txt"]
+    assert (tmp_path / "notes.txt").read_text() == "mine"
+
+
+def test_gc_spares_pinned_aliases_and_young_objects(tmp_path):
+    store = ContentStore(tmp_path, policy=RetentionPolicy(max_age_seconds=1, max_count=None, max_bytes=None, grace_seconds=3600.0))
+    store.put(b"render", "render_1.png", aliases=("latest.png",))
+    (tmp_path / "render_1.png").unlink()
+    orphan = store.put(b"orphan", "orphan.png")
+    orphan.path.unlink()
+
+    report = store.collect_garbage(now=time.time() + 60)
+
+    assert (tmp_path / "latest.png").exists()
+    assert report.removed_objects == 0
+    assert orphan.object_path.exists()
+
+
+def test_export_path_is_relinked_after_gc(client, blueprint_json):
+    from backend.main import EXPORT_STORE
+
+    first = client.post("/api/export/json", json={"blueprint": blueprint_json})
+    path = Path(first.headers["X-Export-Path"])
+    assert path.exists()
+
+    path.unlink()
+    EXPORT_STORE.collect_garbage(now=time.time() + 3600)
+
+    second = client.post("/api/export/json", json={"blueprint": blueprint_json})
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert Path(second.headers["X-Export-Path"]).exists()
+    assert Path(second.headers["X-Export-Path"]).read_bytes() == first.content
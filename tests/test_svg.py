@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+from backend.blueprint import build_blueprint
+from backend.dxf import LinearDimension
+from backend.exporters import drawing_layout, export_svg_bytes
+from backend.geometry import teapot_geometry
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_dimension_layout_is_shared_geometry():
+    layout = LinearDimension((0.0, 0.0), (40.0, 0.0), (0.0, -10.0)).layout()
+    (start, end), *rest = layout.lines
+    assert (start, end) == ((0.0, -10.0), (40.0, -10.0))
+    # Two extension lines and two ticks.
+    assert len(rest) == 4
+    assert layout.label == "40"
+    assert layout.text_at == (20.0, -8.5)
+
+
+def test_svg_is_well_formed_and_matches_the_drawing_layout():
+    blueprint = build_blueprint(cups=4.0)
+    root = ET.fromstring(export_svg_bytes(blueprint))
+    layout = drawing_layout(teapot_geometry(blueprint.dimensions))
+
+    assert root.tag == f"{SVG}svg"
+    assert root.get("width", "").endswith("mm")
+    labels = [text.text for text in root.iter(f"{SVG}text") if text.get("class") == "dim-text"]
+    assert labels == [dim.layout().label for dim in layout.dimensions]
+
+
+def test_drawing_endpoint_is_cacheable(client):
+    design_id = client.get("/api/blueprint/default").json()["design_id"]
+    first = client.get(f"/api/drawing/{design_id}.svg", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("image/svg+xml")
+    assert "max-age" in first.headers["cache-control"]
+    again = client.get(f"/api/drawing/{design_id}.svg", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
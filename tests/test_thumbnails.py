@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.thumbnails import ThumbnailCache
+
+
+def _image(path, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    Image.fromarray(rng.integers(0, 255, (96, 128, 3), dtype=np.uint8)).save(path)
+    return path
+
+
+def test_tiles_are_cached_in_memory_and_on_disk(tmp_path):
+    source = _image(tmp_path / "teapot.png")
+    cache = ThumbnailCache(disk_dir=tmp_path / "thumbs")
+    key, data = cache.get_png(source, (32, 24))
+    assert Image.open(source).size == (128, 96)
+    assert cache.get(source, (32, 24)).size == (32, 24)
+
+    fresh = ThumbnailCache(disk_dir=tmp_path / "thumbs")
+    assert fresh.get_png(source, (32, 24)) == (key, data)
+    assert fresh.disk_hits == 1
+
+
+def test_disk_tier_is_bounded_lru(tmp_path):
+    source = _image(tmp_path / "teapot.png")
+    cache = ThumbnailCache(disk_dir=tmp_path / "thumbs", max_disk_entries=3)
+    keys = [cache.get_png(source, (size, size))[0] for size in range(10, 14)]
+    assert cache.disk_usage[0] == 3
+    assert len(list((tmp_path / "thumbs").glob("*/*.png"))) == 3
+    assert not cache._disk_path(keys[0].digest).exists()
+
+    # A disk hit refreshes recency, so the next write evicts keys[2] instead of keys[1].
+    fresh = ThumbnailCache(disk_dir=tmp_path / "thumbs", max_disk_entries=3)
+    fresh.get_png(source, (11, 11))
+    fresh.get_png(source, (20, 20))
+    assert fresh._disk_path(keys[1].digest).exists()
+    assert not fresh._disk_path(keys[2].digest).exists()
+
+
+def test_disk_tier_respects_byte_budget(tmp_path):
+    source = _image(tmp_path / "teapot.png")
+    cache = ThumbnailCache(disk_dir=tmp_path / "thumbs", max_disk_bytes=40_000)
+    for size in range(40, 120, 10):
+        cache.get_png(source, (size, size))
+    files, total = cache.disk_usage
+    assert total <= 40_000
+    assert total == sum(p.stat().st_size for p in (tmp_path / "thumbs").glob("*/*.png"))
+    assert files == len(list((tmp_path / "thumbs").glob("*/*.png")))
+
+
+def test_resized_image_endpoint_resizes_on_the_pool_and_revalidates(client):
+    from backend.main import COMPUTE_POOL
+
+    files = client.get("/api/images").json()["files"]
+    if not files:
+        pytest.skip("no reference images in the project root")
+    url = files[0]["url"]
+    submitted = COMPUTE_POOL.submitted
+    first = client.get(f"{url}?w=64&h=48")
+    assert first.status_code == 200
+    assert Image.open(io.BytesIO(first.content)).size == (64, 48)
+    assert COMPUTE_POOL.submitted == submitted + 1
+    # A revalidation is answered from the file's stat, without resizing.
+    assert client.get(f"{url}?w=64&h=48", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert COMPUTE_POOL.submitted == submitted + 1
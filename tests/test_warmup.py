@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from backend.warmup import Warmup
+
+
+def test_failing_step_is_recorded_and_warmup_still_finishes():
+    warmup = Warmup()
+    assert not warmup.ready
+    ran = []
+
+    def broken() -> None:
+        raise OSError("disk gone")
+
+    warmup.run([("first", lambda: ran.append("first")), ("broken", broken), ("last", lambda: ran.append("last"))])
+
+    status = warmup.status()
+    assert ran == ["first", "last"]
+    assert status["ready"] and warmup.wait(0)
+    assert [step["name"] for step in status["steps"]] == ["first", "broken", "last"]
+    assert status["steps"][1]["error"] == "OSError: disk gone"
+    assert status["steps"][0]["error"] is None
+
+
+def test_readiness_probe_reports_ready_once_warm(client):
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True